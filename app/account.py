@@ -0,0 +1,229 @@
+import logging
+import threading
+import time
+from .backend import mt5
+from .config import ACCOUNT_REFRESH_SECONDS, SYMBOL_INFO_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class _PositionMark:
+    """Snapshot of one position used for incremental P&L estimates"""
+    __slots__ = ('ticket', 'direction', 'volume', 'price')
+
+    def __init__(self, ticket, direction, volume, price):
+        self.ticket = ticket
+        self.direction = direction
+        self.volume = volume
+        self.price = price  # Closing price (bid for longs, ask for shorts) at snapshot time
+
+
+class AccountCache:
+    """
+    Account snapshot refreshed in the background and estimated from ticks in between
+
+    Every ACCOUNT_REFRESH_SECONDS one account_info() and one positions_get() call refresh the
+    snapshot. Between refreshes, each tick of a symbol with open positions updates the floating
+    P&L of that symbol from the price move since the snapshot, using the cached
+    trade_tick_value/trade_tick_size. Readers never call the terminal.
+    """
+    def __init__(self, tick_feed, refresh_seconds=ACCOUNT_REFRESH_SECONDS,
+                 symbol_info_ttl=SYMBOL_INFO_TTL_SECONDS):
+        self.tick_feed = tick_feed
+        self.refresh_seconds = refresh_seconds
+        self.symbol_info_ttl = symbol_info_ttl
+
+        self._account = None
+        self._positions = []
+        self._marks = {}  # symbol -> [_PositionMark]
+        self._deltas = {}  # symbol -> floating P&L change since the snapshot
+        self._symbol_info = {}  # symbol -> (symbol_info, loaded_at)
+        self._refreshed_at = None
+        self._last_tick_at = None
+        self._lock = threading.Lock()
+        self._refresh_now = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+        tick_feed.add_listener(self._on_tick)
+
+    def start(self):
+        """Load the first snapshot and start the background refresh thread"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="account-cache", daemon=True)
+        self.refresh()
+        self._thread.start()
+
+    def add_listener(self, callback):
+        """
+        Register a function called with every new positions snapshot
+
+        Args:
+            callback (callable): callback(positions, taken_at) where taken_at is the time.time()
+                just before the snapshot was requested
+        """
+        self._listeners.append(callback)
+
+    def request_refresh(self):
+        """Ask the background thread to refresh as soon as possible (e.g. after an order)"""
+        self._refresh_now.set()
+
+    def _run(self):
+        """Refresh loop"""
+        while True:
+            self._refresh_now.wait(self.refresh_seconds)
+            self._refresh_now.clear()
+            self.refresh()
+
+    def refresh(self):
+        """
+        Reload the account and positions snapshot from the terminal
+
+        Returns:
+            bool: True if the snapshot was refreshed
+        """
+        taken_at = time.time()
+        try:
+            account = mt5.account_info()
+            positions = mt5.positions_get()
+        except Exception as e:
+            logger.error(f"Account refresh failed: {str(e)}")
+            account = positions = None
+        if account is None or positions is None:
+            self.refresh_failures += 1
+            return False
+
+        marks = {}
+        for position in positions:
+            direction = 1 if position.type == mt5.POSITION_TYPE_BUY else -1
+            marks.setdefault(position.symbol, []).append(
+                _PositionMark(position.ticket, direction, position.volume, position.price_current))
+        for symbol in marks:
+            self._load_symbol_info(symbol)
+
+        with self._lock:
+            old_symbols = set(self._marks)
+            self._account = account
+            self._positions = list(positions)
+            self._marks = marks
+            self._deltas = {}
+            self._refreshed_at = time.time()
+            self.refreshes += 1
+
+        # Follow ticks only for symbols with open positions
+        new_symbols = set(marks)
+        for symbol in new_symbols - old_symbols:
+            self.tick_feed.subscribe(symbol)
+        for symbol in old_symbols - new_symbols:
+            self.tick_feed.unsubscribe(symbol)
+
+        for callback in self._listeners:
+            try:
+                callback(positions, taken_at)
+            except Exception as e:
+                logger.error(f"Positions snapshot listener failed: {str(e)}", exc_info=True)
+        return True
+
+    def _load_symbol_info(self, symbol):
+        """Cache symbol_info() for tick value conversions"""
+        cached = self._symbol_info.get(symbol)
+        if cached is not None and time.time() - cached[1] < self.symbol_info_ttl:
+            return cached[0]
+        info = mt5.symbol_info(symbol)
+        if info is not None:
+            self._symbol_info[symbol] = (info, time.time())
+        return info
+
+    def symbol_info(self, symbol):
+        """
+        Cached symbol_info() of a symbol, loaded on first use
+
+        Args:
+            symbol (str): Broker symbol
+
+        Returns:
+            SymbolInfo or None: Cached symbol information
+        """
+        return self._load_symbol_info(symbol)
+
+    def _on_tick(self, symbol, tick):
+        """Re-estimate the floating P&L of a symbol from a new tick"""
+        marks = self._marks.get(symbol)
+        if not marks:
+            return
+        cached = self._symbol_info.get(symbol)
+        if cached is None or not cached[0].trade_tick_size:
+            return
+        info = cached[0]
+        value_per_price = info.trade_tick_value / info.trade_tick_size
+
+        delta = 0.0
+        for mark in marks:
+            price = tick.bid if mark.direction > 0 else tick.ask
+            delta += mark.direction * (price - mark.price) * value_per_price * mark.volume
+        with self._lock:
+            if self._marks.get(symbol) is marks:
+                self._deltas[symbol] = delta
+                self._last_tick_at = time.time()
+
+    def get(self):
+        """
+        Get the current account estimate without calling the terminal
+
+        Returns:
+            dict or None: Account figures with staleness information, or None before the
+                first successful refresh
+        """
+        if self._thread is None:
+            self.start()
+        with self._lock:
+            account = self._account
+            if account is None:
+                return None
+            delta = sum(self._deltas.values())
+            refreshed_at = self._refreshed_at
+            last_tick_at = self._last_tick_at
+            position_count = len(self._positions)
+
+        now = time.time()
+        equity = account.equity + delta
+        margin_level = equity / account.margin * 100.0 if account.margin else 0.0
+        return {
+            "login": account.login,
+            "currency": account.currency,
+            "leverage": account.leverage,
+            "margin_mode": account.margin_mode,
+            "balance": account.balance,
+            "profit": round(account.profit + delta, 2),
+            "equity": round(equity, 2),
+            "margin": account.margin,
+            "margin_free": round(account.margin_free + delta, 2),
+            "margin_level": round(margin_level, 2),
+            "positions": position_count,
+            "estimated": delta != 0.0,
+            "snapshot_age_seconds": round(now - refreshed_at, 3),
+            "tick_age_seconds": round(now - last_tick_at, 3) if last_tick_at and last_tick_at > refreshed_at else None,
+        }
+
+    def positions(self):
+        """
+        Positions from the latest snapshot
+
+        Returns:
+            list: Position records from the last refresh
+        """
+        with self._lock:
+            return list(self._positions)
+
+    def get_stats(self):
+        """Refresh counters for /metrics"""
+        return {
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "snapshot_age_seconds": round(time.time() - self._refreshed_at, 3) if self._refreshed_at else None,
+        }
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from .metrics import LatencyWindow
+from .config import TRADE_MAX_IN_FLIGHT, TRADE_DEADLINE_MS, ALERT_MAX_AGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Bounded in-flight limit and per-alert deadlines for /trade
+
+    At most TRADE_MAX_IN_FLIGHT requests are processed at once; further requests are rejected
+    immediately instead of piling up behind a slow terminal. Every admitted alert gets a
+    deadline (time.monotonic()) of TRADE_DEADLINE_MS after arrival, tightened to the moment it
+    becomes stale when it carries its alert time. Work whose deadline has passed is dropped
+    before order_send().
+    """
+    def __init__(self, max_in_flight=TRADE_MAX_IN_FLIGHT, deadline_ms=TRADE_DEADLINE_MS,
+                 max_age_seconds=ALERT_MAX_AGE_SECONDS):
+        self.max_in_flight = max_in_flight
+        self.deadline_ms = deadline_ms
+        self.max_age_seconds = max_age_seconds
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.queue_latency = LatencyWindow()
+
+        self.admitted = 0
+        self.shed_overload = 0
+        self.shed_deadline = 0
+
+    def try_acquire(self):
+        """
+        Admit a request if the in-flight limit allows it
+
+        Returns:
+            bool: True if admitted; release() must be called when it is done
+        """
+        with self._lock:
+            if self.max_in_flight > 0 and self._in_flight >= self.max_in_flight:
+                self.shed_overload += 1
+                return False
+            self._in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self):
+        """Mark an admitted request as done"""
+        with self._lock:
+            self._in_flight -= 1
+
+    def deadline(self, admitted_at, received_at, alert_time=0.0):
+        """
+        Deadline of an alert
+
+        Args:
+            admitted_at (float): time.monotonic() when the request was admitted
+            received_at (float): time.time() when the request was received
+            alert_time (float): Epoch seconds the alert fired, 0 if unknown
+
+        Returns:
+            float: time.monotonic() value after which the alert must not be sent
+        """
+        deadline = admitted_at + self.deadline_ms / 1000.0
+        if alert_time and self.max_age_seconds > 0:
+            deadline = min(deadline, admitted_at + (alert_time + self.max_age_seconds - received_at))
+        return deadline
+
+    def record_expired(self):
+        """Count an alert dropped because its deadline passed"""
+        with self._lock:
+            self.shed_deadline += 1
+
+    def get_stats(self):
+        """
+        Get admission counters and queue latency
+
+        Returns:
+            dict: In-flight count, limits, shed counts and queue latency summary
+        """
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "deadline_ms": self.deadline_ms,
+                "admitted": self.admitted,
+                "shed_overload": self.shed_overload,
+                "shed_deadline": self.shed_deadline,
+                "queue_ms": self.queue_latency.summary(),
+            }
@@ -0,0 +1,121 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from .metrics import LatencyWindow
+from .config import ALERT_MAX_AGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Stages of an alert's life, from TradingView firing it to order_send() returning
+STAGES = ('alert_to_receive', 'receive_to_send', 'send_to_fill', 'receive_to_fill', 'alert_to_fill')
+
+
+def parse_alert_time(value):
+    """
+    Convert an alert timestamp to epoch seconds
+
+    Accepts TradingView's {{timenow}} (ISO 8601 UTC, e.g. 2024-05-01T12:30:00Z) and epoch
+    seconds or milliseconds.
+
+    Args:
+        value (str or float): Timestamp from the alert
+
+    Returns:
+        float: Epoch seconds
+    """
+    if isinstance(value, (int, float)) or str(value).strip().replace('.', '', 1).isdigit():
+        seconds = float(value)
+        return seconds / 1000.0 if seconds > 1e11 else seconds
+    text = str(value).strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class AlertLatencyTracker:
+    """
+    Stale-signal guard and per-stage latency percentiles of alerts
+
+    Alerts that carry their firing time (alert_time) and are older than ALERT_MAX_AGE_SECONDS
+    on arrival are rejected. For executed alerts the alert, receive, pre-send and fill times
+    are turned into stage latencies. The fill time is the local time at which order_send()
+    returned, because the order result carries no broker timestamp. alert_to_* stages compare
+    TradingView's clock with the local one and include any clock skew.
+    """
+    def __init__(self, max_age_seconds=ALERT_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._stages = {stage: LatencyWindow() for stage in STAGES}
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.rejected_stale = 0
+        self.without_time = 0
+
+    def check(self, alert_time, received_at):
+        """
+        Check an alert's age on arrival
+
+        Args:
+            alert_time (float): Epoch seconds the alert fired, 0 if the alert has no time
+            received_at (float): Epoch seconds the request was received
+
+        Returns:
+            str or None: Rejection message for a stale alert, None if it may be executed
+        """
+        with self._lock:
+            self.checked += 1
+            if not alert_time:
+                self.without_time += 1
+                return None
+        age = received_at - alert_time
+        if self.max_age_seconds > 0 and age > self.max_age_seconds:
+            with self._lock:
+                self.rejected_stale += 1
+            logger.warning(f"Rejecting stale alert: {age:.1f}s old (limit {self.max_age_seconds}s)")
+            return f"Alert is {age:.1f}s old (max {self.max_age_seconds}s)"
+        return None
+
+    def record(self, alert_time, received_at, execution):
+        """
+        Record the stage latencies of an executed alert
+
+        Args:
+            alert_time (float): Epoch seconds the alert fired, 0 if unknown
+            received_at (float): Epoch seconds the request was received
+            execution (dict): Execution details with sent_at and returned_at from the retry engine
+        """
+        sent_at = execution.get('sent_at')
+        returned_at = execution.get('returned_at')
+        if sent_at is None or returned_at is None:
+            return
+        stages = {
+            'receive_to_send': sent_at - received_at,
+            'send_to_fill': returned_at - sent_at,
+            'receive_to_fill': returned_at - received_at,
+        }
+        if alert_time:
+            stages['alert_to_receive'] = received_at - alert_time
+            stages['alert_to_fill'] = returned_at - alert_time
+        for stage, seconds in stages.items():
+            self._stages[stage].add(seconds * 1000.0)
+
+    def get_stats(self):
+        """
+        Get the stale-alert counters and per-stage latency percentiles
+
+        Returns:
+            dict: Counters and min/p50/p90/p99/max per stage in milliseconds
+        """
+        with self._lock:
+            counters = {
+                "checked": self.checked,
+                "rejected_stale": self.rejected_stale,
+                "without_time": self.without_time,
+            }
+        return {
+            "max_age_seconds": self.max_age_seconds,
+            **counters,
+            "stages_ms": {stage: window.summary() for stage, window in self._stages.items()},
+        }
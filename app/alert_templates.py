@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import re
+from .alert_latency import parse_alert_time
+from .config import (
+    ALERT_TEMPLATES_FILE, ALERT_TEMPLATE_KEY, ALERT_DEFAULT_TEXT_TEMPLATE,
+    DEFAULT_VOLUME, DEFAULT_STOP_LOSS, DEFAULT_TAKE_PROFIT
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('json', 'kv', 'regex')
+
+_SIDES = {'BUY', 'SELL', 'LONG', 'SHORT', 'REVERSE'}
+
+# Matches key=value or key: value pairs in plain-text alert bodies
+_KV_PATTERN = re.compile(r'([A-Za-z_][\w.]*)\s*[=:]\s*("[^"]*"|[^\s,;]+)')
+
+
+def _to_side(value):
+    side = str(value).strip().upper()
+    if side not in _SIDES:
+        raise ValueError(f"Invalid side: {side}")
+    return side
+
+
+def _to_symbol(value):
+    # Mapping to the broker's name is done by MT5Handler.broker_symbol()
+    symbol = str(value).strip()
+    if not symbol:
+        raise ValueError("Empty symbol")
+    return symbol
+
+
+def _to_risk(value):
+    risk = float(value)
+    if risk < 0 or risk > 100:
+        raise ValueError(f"Invalid risk_pct: {risk}")
+    return risk
+
+
+def _to_points(value):
+    points = float(value)
+    if points < 0:
+        raise ValueError(f"Invalid distance: {points}")
+    return points
+
+
+# Canonical alert fields: name -> (converter, default). A default of None means required.
+FIELDS = {
+    'symbol': (_to_symbol, None),
+    'side': (_to_side, None),
+    'volume': (float, DEFAULT_VOLUME),
+    'price': (float, 0.0),
+    'stop_loss': (float, DEFAULT_STOP_LOSS),
+    'take_profit': (float, DEFAULT_TAKE_PROFIT),
+    'comment': (str, 'TradingView Signal'),
+    'risk_pct': (_to_risk, 0.0),  # When > 0, volume is sized from equity and stop_loss
+    'strategy': (str, 'default'),  # Strategy id, mapped to a magic number
+    'alert_time': (parse_alert_time, 0.0),  # {{timenow}}: epoch seconds the alert fired, 0 if not sent
+}
+
+# Optional fields that are only present in the result when the alert sets them
+OPTIONAL_FIELDS = {
+    'trailing_stop': _to_points,
+    'trailing_step': _to_points,
+    'break_even': _to_points,
+    'break_even_offset': _to_points,
+}
+
+
+def compile_validator(defaults=None):
+    """
+    Build a function that converts canonical alert fields into trade parameters
+
+    The field table is resolved once here so the returned function only does a single
+    pass of lookups and conversions per alert.
+
+    Args:
+        defaults (dict, optional): Template-specific default values for canonical fields
+
+    Returns:
+        callable: validate(values) -> dict, raising ValueError on invalid alerts
+    """
+    defaults = defaults or {}
+    plan = []
+    for name, (converter, default) in FIELDS.items():
+        if name in defaults:
+            default = converter(defaults[name])
+        plan.append((name, converter, default))
+    optional = tuple(OPTIONAL_FIELDS.items())
+    optional_defaults = {name: OPTIONAL_FIELDS[name](value) for name, value in defaults.items()
+                         if name in OPTIONAL_FIELDS}
+    volume_default = 'volume' in defaults
+
+    def validate(values):
+        result = {}
+        for name, converter, default in plan:
+            value = values.get(name)
+            if value is None or value == '':
+                if default is None:
+                    raise ValueError(f"Missing required field: {name}")
+                result[name] = default
+                continue
+            try:
+                result[name] = converter(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {name}: {value}")
+
+        if result['volume'] <= 0:
+            raise ValueError(f"Invalid volume: {result['volume']}")
+        # Distinguishes a chosen volume from DEFAULT_VOLUME (a reverse otherwise mirrors the open volume)
+        result['volume_set'] = volume_default or values.get('volume') not in (None, '')
+        if result['risk_pct'] > 0 and result['stop_loss'] <= 0:
+            raise ValueError("risk_pct needs a stop_loss")
+
+        extra = dict(optional_defaults)
+        for name, converter in optional:
+            value = values.get(name)
+            if value is not None and value != '':
+                try:
+                    extra[name] = converter(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid {name}: {value}")
+
+        # Trailing parameters (in points) are only attached when something is to be trailed
+        if extra.get('trailing_stop', 0) > 0 or extra.get('break_even', 0) > 0:
+            result['trailing'] = {name: extra.get(name, 0.0) for name in OPTIONAL_FIELDS}
+        else:
+            result['trailing'] = None
+        return result
+
+    return validate
+
+
+def _compile_getter(path):
+    """Compile a dotted path ('strategy.order.action') into a dict lookup function"""
+    keys = tuple(path.split('.'))
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda data: data.get(key)
+
+    def getter(data):
+        for key in keys:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+    return getter
+
+
+def compile_template(name, spec):
+    """
+    Compile an alert template into a parser function
+
+    Template spec keys:
+        format: 'json' (default), 'kv' (key=value text) or 'regex' (text with named groups)
+        fields: mapping of canonical field name -> source key (dotted path for JSON, key for kv,
+                group name for regex). Unmapped canonical fields are read from their own name.
+        defaults: default values for canonical fields
+        pattern: regular expression for the 'regex' format
+        flags: 'i' for a case-insensitive pattern
+
+    Args:
+        name (str): Template name
+        spec (dict): Template spec
+
+    Returns:
+        callable: parse(payload) -> trade parameters, where payload is a dict for JSON
+            templates and a string for text templates
+    """
+    fmt = spec.get('format', 'json')
+    if fmt not in FORMATS:
+        raise ValueError(f"Template {name}: unknown format {fmt}")
+
+    mapping = {field: field for field in list(FIELDS) + list(OPTIONAL_FIELDS)}
+    for field, source in spec.get('fields', {}).items():
+        if field not in mapping:
+            raise ValueError(f"Template {name}: unknown field {field}")
+        mapping[field] = source
+    validate = compile_validator(spec.get('defaults'))
+
+    if fmt == 'json':
+        getters = tuple((field, _compile_getter(source)) for field, source in mapping.items())
+
+        def parse(payload):
+            if not isinstance(payload, dict):
+                raise ValueError(f"Template {name} expects a JSON object")
+            return validate({field: get(payload) for field, get in getters})
+
+    elif fmt == 'kv':
+        pairs = tuple(mapping.items())
+
+        def parse(payload):
+            if not isinstance(payload, str):
+                raise ValueError(f"Template {name} expects a text body")
+            found = {key.lower(): value.strip('"') for key, value in _KV_PATTERN.findall(payload)}
+            return validate({field: found.get(source.lower()) for field, source in pairs})
+
+    else:
+        if 'pattern' not in spec:
+            raise ValueError(f"Template {name}: regex format needs a pattern")
+        flags = re.IGNORECASE if 'i' in spec.get('flags', '') else 0
+        pattern = re.compile(spec['pattern'], flags)
+        groups = set(pattern.groupindex)
+        pairs = tuple((field, source) for field, source in mapping.items() if source in groups)
+
+        def parse(payload):
+            if not isinstance(payload, str):
+                raise ValueError(f"Template {name} expects a text body")
+            match = pattern.search(payload)
+            if match is None:
+                raise ValueError(f"Alert does not match template {name}")
+            return validate({field: match.group(source) for field, source in pairs})
+
+    parse.format = fmt
+    parse.template_name = name
+    return parse
+
+
+class AlertTemplateRegistry:
+    """
+    Named alert templates, compiled once at startup
+
+    The built-in 'default' template is the original JSON alert shape. More templates are
+    loaded from ALERT_TEMPLATES_FILE and selected per route (/trade/<template>) or by the
+    ALERT_TEMPLATE_KEY field of a JSON alert.
+    """
+    def __init__(self, templates=None):
+        self._parsers = {'default': compile_template('default', {'format': 'json'})}
+        for name, spec in (templates or {}).items():
+            self._parsers[name] = compile_template(name, spec)
+
+    @classmethod
+    def from_file(cls, path=ALERT_TEMPLATES_FILE):
+        """
+        Load and compile templates from a JSON file
+
+        Args:
+            path (str): Path of the templates file. A missing file yields only the default template.
+
+        Returns:
+            AlertTemplateRegistry: Compiled registry
+        """
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            templates = json.load(f)
+        registry = cls(templates)
+        logger.info(f"Loaded alert templates from {path}: {registry.names()}")
+        return registry
+
+    def names(self):
+        """List the available template names"""
+        return list(self._parsers)
+
+    def parse(self, payload, template=None):
+        """
+        Parse an alert with the selected template
+
+        Args:
+            payload (dict or str): Parsed JSON object or raw text body
+            template (str, optional): Template name. Defaults to the JSON template key,
+                then 'default' for JSON and ALERT_DEFAULT_TEXT_TEMPLATE for text.
+
+        Returns:
+            dict: Validated trade parameters
+        """
+        if template is None:
+            if isinstance(payload, dict):
+                template = payload.get(ALERT_TEMPLATE_KEY) or 'default'
+            else:
+                template = ALERT_DEFAULT_TEXT_TEMPLATE
+                if not template:
+                    raise ValueError("Text alerts need a template (use /trade/<template>)")
+        parser = self._parsers.get(template)
+        if parser is None:
+            raise ValueError(f"Unknown alert template: {template}")
+        return parser(payload)
@@ -0,0 +1,13 @@
+"""
+Selects the MetaTrader 5 API implementation
+
+Modules import `mt5` from here instead of importing MetaTrader5 directly so that
+MT5_BACKEND=sim can swap in the simulated terminal from app/sim_backend.py.
+"""
+
+from .config import MT5_BACKEND
+
+if MT5_BACKEND == 'sim':
+    from . import sim_backend as mt5
+else:
+    import MetaTrader5 as mt5
@@ -9,15 +9,99 @@ MT5_ACCOUNT = int(os.getenv('MT5_ACCOUNT', 12345678))
 MT5_PASSWORD = os.getenv('MT5_PASSWORD', 'your-password')
 MT5_SERVER = os.getenv('MT5_SERVER', 'your-broker-server')
 MT5_PATH = os.getenv('MT5_PATH', r"C:\Program Files\MetaTrader 5\terminal64.exe")
+MT5_BACKEND = os.getenv('MT5_BACKEND', 'mt5')  # 'sim' uses the simulated terminal (app/sim_backend.py)
 
 # MT5 Symbol Settings
 MT5_DEFAULT_SUFFIX = os.getenv('MT5_DEFAULT_SUFFIX', '')  # For brokers that use suffixes like '.r'
+SYMBOL_ALIASES_FILE = os.getenv('SYMBOL_ALIASES_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'symbol_aliases.json'))
+
+# Strategies (magic numbers)
+MT5_MAGIC = int(os.getenv('MT5_MAGIC', 234000))  # Magic number of alerts without a strategy id
+STRATEGIES_FILE = os.getenv('STRATEGIES_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'strategies.json'))
+STRATEGY_MAGIC_BASE = int(os.getenv('STRATEGY_MAGIC_BASE', 300000))  # Derived magics are base + crc32(id) % range
+STRATEGY_MAGIC_RANGE = int(os.getenv('STRATEGY_MAGIC_RANGE', 100000))
 
 # Trading Parameters
 DEFAULT_VOLUME = float(os.getenv('DEFAULT_VOLUME', 0.01))
 DEFAULT_STOP_LOSS = float(os.getenv('DEFAULT_STOP_LOSS', 100))
 DEFAULT_TAKE_PROFIT = float(os.getenv('DEFAULT_TAKE_PROFIT', 200))
 
+# Alert Templates
+ALERT_TEMPLATES_FILE = os.getenv('ALERT_TEMPLATES_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'alert_templates.json'))
+ALERT_TEMPLATE_KEY = os.getenv('ALERT_TEMPLATE_KEY', 'template')  # JSON field that selects a template
+ALERT_DEFAULT_TEXT_TEMPLATE = os.getenv('ALERT_DEFAULT_TEXT_TEMPLATE', '')  # Template for plain-text bodies on /trade
+
+# Stale-signal guard
+ALERT_MAX_AGE_SECONDS = float(os.getenv('ALERT_MAX_AGE_SECONDS', 30))  # Reject older alerts (0 disables)
+
+# Admission Control (/trade)
+TRADE_MAX_IN_FLIGHT = int(os.getenv('TRADE_MAX_IN_FLIGHT', 32))  # Further requests get 429 (0 disables)
+TRADE_DEADLINE_MS = int(os.getenv('TRADE_DEADLINE_MS', 5000))  # Alerts not sent by then are dropped
+
+# Equity Curve (/equity)
+EQUITY_RECORDER_ENABLED = os.getenv('EQUITY_RECORDER_ENABLED', 'False').lower() in ('true', '1', 't')
+EQUITY_FILE = os.getenv('EQUITY_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'equity.ring'))
+EQUITY_CAPACITY = int(os.getenv('EQUITY_CAPACITY', 31 * 86400))  # Samples kept: 31 days at 1/s (~107 MB), no downsampling; oldest overwritten
+EQUITY_SAMPLE_SECONDS = float(os.getenv('EQUITY_SAMPLE_SECONDS', 1))
+EQUITY_MAX_POINTS = int(os.getenv('EQUITY_MAX_POINTS', 2000))  # Buckets returned when no resolution is given
+
+# Order Journal
+ORDER_JOURNAL_ENABLED = os.getenv('ORDER_JOURNAL_ENABLED', 'False').lower() in ('true', '1', 't')
+ORDER_JOURNAL_FILE = os.getenv('ORDER_JOURNAL_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'orders.jsonl'))
+ORDER_JOURNAL_FSYNC = os.getenv('ORDER_JOURNAL_FSYNC', 'False').lower() in ('true', '1', 't')  # fsync every record
+ORDER_JOURNAL_MAX_BYTES = int(os.getenv('ORDER_JOURNAL_MAX_BYTES', 64 * 1024 * 1024))  # Rotated to <file>.1 at this size, 0 never
+
+# Active/Passive Failover
+FAILOVER_ENABLED = os.getenv('FAILOVER_ENABLED', 'False').lower() in ('true', '1', 't')
+FAILOVER_LEASE_FILE = os.getenv('FAILOVER_LEASE_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'failover.lease'))
+FAILOVER_LEASE_SECONDS = float(os.getenv('FAILOVER_LEASE_SECONDS', 3))  # A standby takes over after this long without renewal
+FAILOVER_POLL_SECONDS = float(os.getenv('FAILOVER_POLL_SECONDS', 0.5))  # Lease renewal and journal follow interval
+FAILOVER_NODE_ID = os.getenv('FAILOVER_NODE_ID', '')  # Defaults to hostname:port
+
+# Order Execution (retry engine)
+ORDER_MAX_ATTEMPTS = int(os.getenv('ORDER_MAX_ATTEMPTS', 5))
+ORDER_RETRY_DEADLINE_MS = int(os.getenv('ORDER_RETRY_DEADLINE_MS', 2000))  # Give up retrying after this long
+ORDER_RETRY_BACKOFF_MS = int(os.getenv('ORDER_RETRY_BACKOFF_MS', 25))
+ORDER_BASE_DEVIATION = int(os.getenv('ORDER_BASE_DEVIATION', 30))  # Starting deviation in points
+ORDER_MAX_DEVIATION = int(os.getenv('ORDER_MAX_DEVIATION', 200))
+
+# Execution Quality (/execution-quality)
+EXECUTION_QUALITY_CAPACITY = int(os.getenv('EXECUTION_QUALITY_CAPACITY', 1024))  # Orders kept per symbol
+EXECUTION_QUALITY_MAX_SYMBOLS = int(os.getenv('EXECUTION_QUALITY_MAX_SYMBOLS', 64))  # Later symbols share one ring
+
+# Order Pipeline
+ORDER_PIPELINE_WORKERS = int(os.getenv('ORDER_PIPELINE_WORKERS', min(4, os.cpu_count() or 1)))  # Orders on different symbols run in parallel
+
+# Tick Feed
+TICK_POLL_INTERVAL_MS = int(os.getenv('TICK_POLL_INTERVAL_MS', 100))
+
+# Account Snapshot (/account)
+ACCOUNT_REFRESH_SECONDS = float(os.getenv('ACCOUNT_REFRESH_SECONDS', 2))  # account_info()/positions_get() interval
+SYMBOL_INFO_TTL_SECONDS = float(os.getenv('SYMBOL_INFO_TTL_SECONDS', 60))  # How long symbol_info() results are reused
+
+# Trailing Stops
+TRAILING_MAX_MODIFY_PER_SEC = float(os.getenv('TRAILING_MAX_MODIFY_PER_SEC', 5))  # Rate limit for SL moves
+TRAILING_SYNC_SECONDS = float(os.getenv('TRAILING_SYNC_SECONDS', 5))  # How often closed positions are dropped
+TRAILING_STATE_FILE = os.getenv('TRAILING_STATE_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'trailing.json'))  # Parameters of trailed positions, resumed on restart ('' disables)
+
+# Symbol Catalog (/symbols)
+SYMBOLS_CHECK_SECONDS = float(os.getenv('SYMBOLS_CHECK_SECONDS', 5))  # How often symbols_total() is checked
+SYMBOLS_REBUILD_SECONDS = float(os.getenv('SYMBOLS_REBUILD_SECONDS', 300))  # Full reload even if the count is unchanged
+SYMBOLS_PAGE_SIZE = int(os.getenv('SYMBOLS_PAGE_SIZE', 500))  # Default page size when paginating
+SYMBOLS_MAX_PAGE_SIZE = int(os.getenv('SYMBOLS_MAX_PAGE_SIZE', 5000))
+
+# Event Stream (/stream)
+STREAM_CLIENT_QUEUE_SIZE = int(os.getenv('STREAM_CLIENT_QUEUE_SIZE', 1000))  # Slow clients are dropped when full
+STREAM_MAX_CLIENTS = int(os.getenv('STREAM_MAX_CLIENTS', 50))
+STREAM_KEEPALIVE_SECONDS = float(os.getenv('STREAM_KEEPALIVE_SECONDS', 15))
+
+# Debug Profiler (/debug/profile)
+DEBUG_PROFILE_ENABLED = os.getenv('DEBUG_PROFILE_ENABLED', 'False').lower() in ('true', '1', 't')
+DEBUG_PROFILE_TOKEN = os.getenv('DEBUG_PROFILE_TOKEN', '')  # Required X-Debug-Token header; the endpoint stays off without it
+DEBUG_PROFILE_MAX_SECONDS = float(os.getenv('DEBUG_PROFILE_MAX_SECONDS', 60))
+DEBUG_PROFILE_INTERVAL_MS = float(os.getenv('DEBUG_PROFILE_INTERVAL_MS', 5))  # Sampling interval
+DEBUG_PROFILE_MAX_TRACES = int(os.getenv('DEBUG_PROFILE_MAX_TRACES', 5))  # Slowest /trade cProfile traces kept
+
 # Server Configuration
 FLASK_HOST = os.getenv('FLASK_HOST', '0.0.0.0')
 FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
@@ -0,0 +1,257 @@
+import logging
+import os
+import threading
+import time
+import numpy as np
+from .config import EQUITY_FILE, EQUITY_CAPACITY, EQUITY_SAMPLE_SECONDS, EQUITY_MAX_POINTS
+
+logger = logging.getLogger(__name__)
+
+# Fixed-width record of one sample (40 bytes)
+RECORD_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('balance', '<f8'),
+    ('equity', '<f8'),
+    ('margin', '<f8'),
+    ('margin_free', '<f8'),
+])
+
+# File header: magic, version, capacity, record size, head (next slot), count; padded to 64 bytes
+_MAGIC = 0x45515249_4E473031  # "EQRING01"
+_VERSION = 1
+_HEADER_FIELDS = 8
+_HEADER_BYTES = _HEADER_FIELDS * 8
+_HEAD, _COUNT = 4, 5
+
+# Records processed per step when downsampling, bounding the temporary memory of a query
+_CHUNK = 1 << 18
+
+
+class EquityRecorder:
+    """
+    Equity curve recorded at EQUITY_SAMPLE_SECONDS into a memory-mapped ring file
+
+    Samples come from the AccountCache estimate, so recording adds no terminal calls. The file
+    holds a 64-byte header and EQUITY_CAPACITY fixed-width records; once full, the oldest
+    records are overwritten. The file is reopened after a restart, keeping its own capacity.
+    Queries without a running recorder (e.g. on a standby) map the file read-only and never
+    modify it. Queries binary-search the (time-ordered) ring segments and downsample in fixed-size
+    chunks with numpy, so memory use does not depend on the queried range.
+    """
+    def __init__(self, account, path=EQUITY_FILE, capacity=EQUITY_CAPACITY,
+                 sample_seconds=EQUITY_SAMPLE_SECONDS):
+        self.account = account
+        self.path = path
+        self.capacity = max(2, capacity)
+        self.sample_seconds = sample_seconds
+        self._header = None
+        self._records = None
+        self._writable = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.samples = 0
+        self.skipped = 0
+
+    def _existing_capacity(self):
+        """Capacity of a valid existing ring file, read without writing; None if missing or invalid"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < _HEADER_BYTES:
+            return None
+        header = np.memmap(self.path, dtype='<i8', mode='r', shape=(_HEADER_FIELDS,))
+        magic, version, capacity, record_size = (int(v) for v in header[:4])
+        del header
+        if (magic != _MAGIC or version != _VERSION or record_size != RECORD_DTYPE.itemsize or capacity < 2
+                or os.path.getsize(self.path) != _HEADER_BYTES + capacity * RECORD_DTYPE.itemsize):
+            return None
+        return capacity
+
+    def _open(self):
+        """Open the ring file for writing, creating it when missing or invalid"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        capacity = self._existing_capacity()
+        if capacity is not None:
+            if capacity != self.capacity:
+                logger.warning(f"Equity file {self.path} holds {capacity} records, not EQUITY_CAPACITY="
+                               f"{self.capacity}; keeping it (delete the file to resize)")
+                self.capacity = capacity
+            header = np.memmap(self.path, dtype='<i8', mode='r+', shape=(_HEADER_FIELDS,))
+        else:
+            if os.path.exists(self.path):
+                logger.warning(f"Equity file {self.path} is not a valid ring file, recreating it")
+            with open(self.path, 'wb') as f:
+                f.truncate(_HEADER_BYTES + self.capacity * RECORD_DTYPE.itemsize)  # Sparse on most filesystems
+            header = np.memmap(self.path, dtype='<i8', mode='r+', shape=(_HEADER_FIELDS,))
+            header[:] = [_MAGIC, _VERSION, self.capacity, RECORD_DTYPE.itemsize, 0, 0, 0, 0]
+            header.flush()
+
+        self._header = header
+        self._records = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r+', offset=_HEADER_BYTES,
+                                  shape=(self.capacity,))
+        self._writable = True
+        logger.info(f"Equity recorder using {self.path} ({int(header[_COUNT])} of {self.capacity} records)")
+
+    def start(self):
+        """Open the ring file and start sampling"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not self._writable:
+                self._open()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="equity-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and flush the file"""
+        self._stop.set()
+        with self._lock:
+            if self._writable:
+                self._records.flush()
+                self._header.flush()
+
+    def _run(self):
+        """Sampling loop, aligned to whole multiples of the sample interval"""
+        while not self._stop.is_set():
+            now = time.time()
+            self._stop.wait(self.sample_seconds - now % self.sample_seconds)
+            if self._stop.is_set():
+                break
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Equity sample failed: {str(e)}", exc_info=True)
+
+    def sample(self):
+        """
+        Append one sample from the cached account estimate
+
+        Returns:
+            bool: True if a sample was written
+        """
+        account = self.account.get()
+        if account is None:
+            self.skipped += 1
+            return False
+        record = (time.time(), account['balance'], account['equity'], account['margin'], account['margin_free'])
+        with self._lock:
+            head = int(self._header[_HEAD])
+            self._records[head] = record
+            self._header[_HEAD] = (head + 1) % self.capacity
+            self._header[_COUNT] = min(int(self._header[_COUNT]) + 1, self.capacity)
+        self.samples += 1
+        return True
+
+    def _segments(self):
+        """Time-ordered views of the ring: oldest part first"""
+        head = int(self._header[_HEAD])
+        count = int(self._header[_COUNT])
+        if count < len(self._records):
+            return [self._records[:count]]
+        return [self._records[head:], self._records[:head]]
+
+    def query(self, start, end, resolution=None, max_points=EQUITY_MAX_POINTS):
+        """
+        Equity OHLC per time bucket between two times
+
+        Args:
+            start (float): Epoch seconds, inclusive
+            end (float): Epoch seconds, exclusive
+            resolution (float, optional): Bucket size in seconds. Chosen so that at most
+                max_points buckets are returned when None.
+            max_points (int): Bucket limit used for the automatic resolution
+
+        Returns:
+            dict: Column arrays time (bucket start), open, high, low, close, balance and margin
+                (last value per bucket)
+        """
+        if resolution is None:
+            resolution = max(self.sample_seconds, (end - start) / max(max_points, 1))
+        resolution = max(float(resolution), self.sample_seconds)
+
+        columns = {name: [] for name in ('time', 'open', 'high', 'low', 'close', 'balance', 'margin')}
+        last_bucket = None
+        with self._lock:
+            if self._records is None:
+                self._open_readonly()
+            segments = self._segments() if self._records is not None else []
+            for segment in segments:
+                times = segment['time']
+                lo, hi = np.searchsorted(times, [start, end], side='left')
+                for offset in range(int(lo), int(hi), _CHUNK):
+                    chunk = segment[offset:min(offset + _CHUNK, int(hi))]
+                    last_bucket = _downsample(chunk, resolution, columns, last_bucket)
+
+        result = {name: np.concatenate(parts).tolist() if parts else [] for name, parts in columns.items()}
+        result['resolution'] = resolution
+        result['count'] = len(result['time'])
+        return result
+
+    def _open_readonly(self):
+        """Map an existing ring file read-only for queries when sampling is not running (lock held)"""
+        capacity = self._existing_capacity()
+        if capacity is None:
+            if os.path.exists(self.path):
+                logger.warning(f"Equity file {self.path} is not a valid ring file, not reading it")
+            return
+        self._header = np.memmap(self.path, dtype='<i8', mode='r', shape=(_HEADER_FIELDS,))
+        self._records = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', offset=_HEADER_BYTES,
+                                  shape=(capacity,))
+
+    def get_stats(self):
+        """Recorder counters for /metrics"""
+        count = int(self._header[_COUNT]) if self._header is not None else 0
+        capacity = len(self._records) if self._records is not None else self.capacity
+        return {
+            "running": self._thread is not None and not self._stop.is_set(),
+            "samples": self.samples,
+            "skipped": self.skipped,
+            "records": count,
+            "capacity": capacity,
+            "file_bytes": _HEADER_BYTES + capacity * RECORD_DTYPE.itemsize,
+        }
+
+
+def _downsample(chunk, resolution, columns, last_bucket):
+    """
+    Append the OHLC buckets of a time-ordered chunk to the column lists
+
+    A bucket that continues from the previous chunk is merged into the last appended bucket.
+
+    Returns:
+        float or None: Start time of the last bucket
+    """
+    if len(chunk) == 0:
+        return last_bucket
+    times = np.asarray(chunk['time'])
+    equity = np.asarray(chunk['equity'])
+    buckets = np.floor(times / resolution) * resolution
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+
+    bucket_time = buckets[starts]
+    opens = equity[starts]
+    highs = np.maximum.reduceat(equity, starts)
+    lows = np.minimum.reduceat(equity, starts)
+    closes = equity[ends]
+    balances = np.asarray(chunk['balance'])[ends]
+    margins = np.asarray(chunk['margin'])[ends]
+
+    if last_bucket is not None and bucket_time[0] == last_bucket:
+        # Merge the first bucket into the one the previous chunk ended with
+        columns['high'][-1][-1] = max(columns['high'][-1][-1], highs[0])
+        columns['low'][-1][-1] = min(columns['low'][-1][-1], lows[0])
+        columns['close'][-1][-1] = closes[0]
+        columns['balance'][-1][-1] = balances[0]
+        columns['margin'][-1][-1] = margins[0]
+        bucket_time, opens, highs, lows, closes, balances, margins = (
+            a[1:] for a in (bucket_time, opens, highs, lows, closes, balances, margins))
+        if len(bucket_time) == 0:
+            return last_bucket
+
+    for name, values in (('time', bucket_time), ('open', opens), ('high', highs), ('low', lows),
+                         ('close', closes), ('balance', balances), ('margin', margins)):
+        columns[name].append(values)
+    return float(bucket_time[-1])
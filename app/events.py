@@ -0,0 +1,205 @@
+import json
+import logging
+import queue
+import threading
+import time
+from .config import STREAM_CLIENT_QUEUE_SIZE, STREAM_MAX_CLIENTS, STREAM_KEEPALIVE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ('orders', 'positions', 'ticks')
+
+# Position fields whose change is reported as a 'modify' event
+_POSITION_FIELDS = ('volume', 'sl', 'tp')
+
+
+class Subscriber:
+    """
+    One connected stream client with its own bounded queue
+    """
+    def __init__(self, topics, symbols, queue_size):
+        self.topics = set(topics)
+        self.symbols = set(symbols)  # Broker symbols for tick events
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = False
+        self.connected_at = time.time()
+
+
+class EventBroker:
+    """
+    Fans order, position and tick events out to stream subscribers
+
+    Position events are diffed from the AccountCache snapshots (publish_positions() is one of
+    its listeners) and the shared tick feed supplies ticks, so streaming adds no terminal calls
+    however many clients are connected.
+    A client whose queue fills up is dropped instead of slowing everyone else down.
+    """
+    def __init__(self, tick_feed, queue_size=STREAM_CLIENT_QUEUE_SIZE, max_clients=STREAM_MAX_CLIENTS):
+        self.tick_feed = tick_feed
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._positions_lock = threading.Lock()  # Serializes snapshot diffs from concurrent refreshes
+        self._last_positions = None
+
+        self.events_published = 0
+        self.clients_dropped = 0
+
+        tick_feed.add_listener(self._on_tick)
+
+    def subscribe(self, topics=TOPICS, symbols=()):
+        """
+        Register a new stream client
+
+        Args:
+            topics (iterable): Topics to receive ('orders', 'positions', 'ticks')
+            symbols (iterable): Broker symbols to receive ticks for
+
+        Returns:
+            Subscriber or None: The subscriber, or None if the client limit is reached
+        """
+        subscriber = Subscriber(topics, symbols if 'ticks' in topics else (), self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                return None
+            self._subscribers.append(subscriber)
+        for symbol in subscriber.symbols:
+            self.tick_feed.subscribe(symbol)
+        logger.info(f"Stream client subscribed: topics={sorted(subscriber.topics)}, symbols={sorted(subscriber.symbols)}")
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a stream client and release its tick subscriptions"""
+        with self._lock:
+            if subscriber not in self._subscribers:
+                return
+            self._subscribers.remove(subscriber)
+        for symbol in subscriber.symbols:
+            self.tick_feed.unsubscribe(symbol)
+        logger.info("Stream client unsubscribed")
+
+    def publish(self, topic, event, data, symbol=None):
+        """
+        Queue an event for every interested subscriber
+
+        Args:
+            topic (str): One of TOPICS
+            event (str): Event name, e.g. 'open', 'close', 'modify', 'tick'
+            data (dict): Event payload
+            symbol (str, optional): Broker symbol, required for tick events
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+
+        message = None
+        for subscriber in subscribers:
+            if subscriber.dropped or topic not in subscriber.topics:
+                continue
+            if topic == 'ticks' and symbol not in subscriber.symbols:
+                continue
+            if message is None:
+                # Serialize once per event, not once per client
+                message = format_sse(event, data)
+            try:
+                subscriber.queue.put_nowait(message)
+            except queue.Full:
+                subscriber.dropped = True
+                with self._lock:
+                    self.clients_dropped += 1
+                logger.warning("Dropping slow stream client (queue full)")
+        if message is not None:
+            self.events_published += 1
+
+    def stream(self, subscriber, keepalive=STREAM_KEEPALIVE_SECONDS):
+        """
+        Generate the SSE byte stream of a subscriber until it disconnects or is dropped
+
+        Args:
+            subscriber (Subscriber): Client returned by subscribe()
+            keepalive (float): Seconds between keepalive comments when idle
+
+        Yields:
+            str: Server-Sent Events frames
+        """
+        try:
+            yield format_sse('hello', {"topics": sorted(subscriber.topics), "symbols": sorted(subscriber.symbols)})
+            while not subscriber.dropped:
+                try:
+                    yield subscriber.queue.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+            yield format_sse('dropped', {"reason": "client too slow"})
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _on_tick(self, symbol, tick):
+        """Tick feed listener"""
+        self.publish('ticks', 'tick', {
+            "symbol": symbol,
+            "bid": tick.bid,
+            "ask": tick.ask,
+            "time_msc": tick.time_msc
+        }, symbol=symbol)
+
+    def publish_positions(self, positions, taken_at=None):
+        """
+        Publish the differences between a positions snapshot and the previous one
+
+        Registered as an AccountCache listener, so it runs after every account refresh,
+        including the one requested right after each successful order.
+
+        Args:
+            positions (iterable): Position records from mt5.positions_get()
+            taken_at (float, optional): time.time() just before the snapshot was requested
+        """
+        current = {p.ticket: p for p in positions}
+        with self._positions_lock:
+            previous = self._last_positions
+            self._last_positions = current
+            if previous is None:
+                return
+
+            for ticket, position in current.items():
+                old = previous.get(ticket)
+                if old is None:
+                    self.publish('positions', 'open', position._asdict())
+                elif any(getattr(old, f) != getattr(position, f) for f in _POSITION_FIELDS):
+                    self.publish('positions', 'modify', position._asdict())
+            for ticket, position in previous.items():
+                if ticket not in current:
+                    self.publish('positions', 'close', position._asdict())
+
+    def get_stats(self):
+        """
+        Get stream statistics
+
+        Returns:
+            dict: Client count, queue depths and drop counters
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "clients": len(subscribers),
+            "queue_depths": [s.queue.qsize() for s in subscribers],
+            "events_published": self.events_published,
+            "clients_dropped": self.clients_dropped,
+            "tick_symbols": self.tick_feed.symbols(),
+        }
+
+
+def format_sse(event, data):
+    """
+    Format one Server-Sent Events frame
+
+    Args:
+        event (str): Event name
+        data (dict): JSON-serializable payload
+
+    Returns:
+        str: SSE frame
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,159 @@
+import logging
+import math
+import threading
+import time
+from array import array
+import numpy as np
+from .backend import mt5
+from .order_executor import classify_retcode, SUCCESS
+from .config import EXECUTION_QUALITY_CAPACITY, EXECUTION_QUALITY_MAX_SYMBOLS
+
+logger = logging.getLogger(__name__)
+
+# Symbols beyond EXECUTION_QUALITY_MAX_SYMBOLS share this ring
+OVERFLOW_KEY = '*'
+
+# Bytes per record: time, requested, filled, slippage, latency (double) + deviation, retcode (int)
+_RECORD_BYTES = 5 * 8 + 2 * 4
+
+
+class _OrderRing:
+    """Fixed-size ring of order records in preallocated typed arrays"""
+    __slots__ = ('capacity', 'size', 'next', 'total', 'times', 'requested', 'filled', 'slippage',
+                 'latency', 'deviation', 'retcode')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.size = 0
+        self.next = 0
+        self.total = 0
+        self.times = array('d', bytes(8 * capacity))
+        self.requested = array('d', bytes(8 * capacity))
+        self.filled = array('d', bytes(8 * capacity))
+        self.slippage = array('d', bytes(8 * capacity))  # Points, positive = worse than requested
+        self.latency = array('d', bytes(8 * capacity))  # Milliseconds
+        self.deviation = array('i', bytes(4 * capacity))
+        self.retcode = array('i', bytes(4 * capacity))
+
+    def append(self, at, requested, filled, slippage, latency_ms, deviation, retcode):
+        i = self.next
+        self.times[i] = at
+        self.requested[i] = requested
+        self.filled[i] = filled
+        self.slippage[i] = slippage
+        self.latency[i] = latency_ms
+        self.deviation[i] = deviation
+        self.retcode[i] = retcode
+        self.next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.total += 1
+
+    def view(self, name):
+        """Zero-copy numpy view of the filled part of a column"""
+        dtype = np.float64 if name not in ('deviation', 'retcode') else np.int32
+        return np.frombuffer(getattr(self, name), dtype=dtype)[:self.size]
+
+
+def _distribution(values):
+    """min/p50/p90/p99/max and mean of a numpy array"""
+    if values.size == 0:
+        return {"count": 0, "min": None, "p50": None, "p90": None, "p99": None, "max": None, "mean": None}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "count": int(values.size),
+        "min": round(float(values.min()), 3),
+        "p50": round(float(p50), 3),
+        "p90": round(float(p90), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values.max()), 3),
+        "mean": round(float(values.mean()), 3),
+    }
+
+
+class ExecutionQualityRecorder:
+    """
+    Per-symbol record of requested vs. filled price, deviation, retcode and latency
+
+    Each symbol gets a ring of EXECUTION_QUALITY_CAPACITY records stored in typed arrays that
+    are allocated once, and at most EXECUTION_QUALITY_MAX_SYMBOLS rings exist (later symbols
+    share one overflow ring), so memory stays fixed however much is traded. Distributions are
+    computed with numpy over zero-copy views of the arrays when they are requested.
+    """
+    def __init__(self, capacity=EXECUTION_QUALITY_CAPACITY, max_symbols=EXECUTION_QUALITY_MAX_SYMBOLS):
+        self.capacity = max(1, capacity)
+        self.max_symbols = max(1, max_symbols)
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    def record(self, symbol, request, result, latency_ms, point):
+        """
+        Record the outcome of one order
+
+        Args:
+            symbol (str): Broker symbol
+            request (dict): Last order request sent, None if nothing was sent
+            result: OrderSendResult of the last attempt, or None
+            latency_ms (float): Time from the first attempt to the final result
+            point (float): Symbol point size, used to express slippage in points
+        """
+        if request is None:
+            return
+        requested = request.get("price") or 0.0
+        filled = result.price if result is not None else 0.0
+        retcode = result.retcode if result is not None else 0
+        slippage = math.nan
+        if requested and filled and point and classify_retcode(retcode) == SUCCESS:
+            # Buys fill at the ask: paying more is worse. Sells are the other way around.
+            direction = 1 if request.get("type") == mt5.ORDER_TYPE_BUY else -1
+            slippage = direction * (filled - requested) / point
+
+        with self._lock:
+            ring = self._rings.get(symbol)
+            if ring is None:
+                if len(self._rings) < self.max_symbols:
+                    ring = self._rings[symbol] = _OrderRing(self.capacity)
+                else:
+                    ring = self._rings.get(OVERFLOW_KEY)
+                    if ring is None:
+                        ring = self._rings[OVERFLOW_KEY] = _OrderRing(self.capacity)
+            ring.append(time.time(), requested, filled, slippage, latency_ms,
+                        int(request.get("deviation", 0)), int(retcode))
+
+    def summary(self, symbol=None):
+        """
+        Slippage and latency distributions per symbol
+
+        Args:
+            symbol (str, optional): Only this broker symbol
+
+        Returns:
+            dict: Per-symbol distributions and the memory budget
+        """
+        with self._lock:
+            rings = {s: r for s, r in self._rings.items() if symbol is None or s == symbol}
+            symbols = {}
+            for name, ring in rings.items():
+                slippage = ring.view('slippage')
+                retcodes = ring.view('retcode')
+                codes, counts = np.unique(retcodes, return_counts=True)
+                # Fills are judged by retcode: rejects can still report a price
+                success = [c for c in codes.tolist() if classify_retcode(c) == SUCCESS]
+                filled = np.isin(retcodes, success)
+                symbols[name] = {
+                    "orders": ring.total,
+                    "window": ring.size,
+                    "fill_rate": round(float(filled.mean()), 4) if ring.size else None,
+                    "slippage_points": _distribution(slippage[~np.isnan(slippage)]),
+                    "latency_ms": _distribution(ring.view('latency')),
+                    "deviation": _distribution(ring.view('deviation')[filled].astype(np.float64)),
+                    "retcodes": {str(int(c)): int(n) for c, n in zip(codes, counts)},
+                }
+            allocated = len(self._rings)
+
+        return {
+            "capacity_per_symbol": self.capacity,
+            "max_symbols": self.max_symbols,
+            "memory_bytes": allocated * self.capacity * _RECORD_BYTES,
+            "memory_budget_bytes": (self.max_symbols + 1) * self.capacity * _RECORD_BYTES,
+            "symbols": symbols,
+        }
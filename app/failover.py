@@ -0,0 +1,354 @@
+import json
+import logging
+import os
+import threading
+import time
+from .backend import mt5
+from .config import (
+    FAILOVER_ENABLED, FAILOVER_LEASE_FILE, FAILOVER_LEASE_SECONDS, FAILOVER_POLL_SECONDS
+)
+from .strategies import DEFAULT_STRATEGY
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = 'active'
+STANDBY = 'standby'
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _lock_file(f):
+        """Block until this process holds an exclusive lock on the file"""
+        # Windows locks byte ranges; every instance locks the first byte
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(f):
+        """Block until this process holds an exclusive lock on the file"""
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class FileLease:
+    """
+    Time-limited lease on a local file, shared by the instances of one machine
+
+    The file holds the holder's node id and the wall-clock expiry. Reads and renewals happen
+    under an exclusive file lock (flock(), or msvcrt.locking() on Windows), so two instances
+    can never both acquire it. The holder renews
+    it every poll; a holder that stops renewing (crashed, hung or lost its disk) loses it
+    after FAILOVER_LEASE_SECONDS. held() is checked against a local deadline taken before
+    each renewal, so a holder that was paused past its expiry stops trading before a
+    successor can start.
+    """
+    def __init__(self, node, path=FAILOVER_LEASE_FILE, ttl=FAILOVER_LEASE_SECONDS):
+        self.node = node
+        self.path = path
+        self.ttl = ttl
+        self.holder = None
+        self.expires = 0.0
+        self._valid_until = 0.0  # time.monotonic()
+
+    def _update(self, acquire):
+        """Read the lease and take or renew it if allowed; returns the previous contents"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        started = time.monotonic()
+        with open(self.path, 'a+') as f:
+            _lock_file(f)
+            try:
+                f.seek(0)
+                try:
+                    current = json.loads(f.read() or '{}')
+                except ValueError:
+                    current = {}
+                now = time.time()
+                holder = current.get('node')
+                expires = current.get('expires', 0.0)
+                if acquire and (holder == self.node or expires <= now):
+                    expires = now + self.ttl
+                    self._write(f, expires)
+                    os.fsync(f.fileno())
+                    self._valid_until = started + self.ttl
+                    holder = self.node
+                elif not acquire and holder == self.node:
+                    # Release: expire it now so a standby does not wait out the ttl
+                    self._write(f, 0.0)
+                    self._valid_until = 0.0
+                    expires = 0.0
+                self.holder, self.expires = holder, expires
+            finally:
+                _unlock_file(f)
+        return current
+
+    def _write(self, f, expires):
+        """Replace the lease contents (file lock held)"""
+        f.seek(0)
+        f.truncate()
+        json.dump({"node": self.node, "expires": expires}, f)
+        f.flush()
+
+    def try_acquire(self):
+        """
+        Take or renew the lease
+
+        Returns:
+            tuple: (True if this node holds the lease, previous lease contents)
+        """
+        previous = self._update(acquire=True)
+        return self.holder == self.node, previous
+
+    def release(self):
+        """Give the lease up"""
+        self._update(acquire=False)
+
+    def held(self):
+        """True while the last renewal is guaranteed to be valid"""
+        return time.monotonic() < self._valid_until
+
+
+class FailoverManager:
+    """
+    Active/passive failover between instances sharing an order journal and a lease file
+
+    With FAILOVER_ENABLED every instance starts as standby and the one that gets the lease
+    becomes active. A standby keeps its own MT5 session and caches warm, follows the active
+    instance's order journal (remembering in-flight alerts and positions to trail) and rejects
+    trade requests. When the lease expires it takes over within FAILOVER_LEASE_SECONDS plus
+    one poll: it reads the rest of the journal, reconciles the alerts that were in flight
+    against the broker's positions and resumes trailing. In-flight alerts are never resent:
+    they are recorded as filled (a new position of their symbol and strategy appeared) or
+    not_found. Without FAILOVER_ENABLED the instance is always active.
+    """
+    def __init__(self, mt5_handler, journal, node, enabled=FAILOVER_ENABLED,
+                 poll_seconds=FAILOVER_POLL_SECONDS, lease=None):
+        self.mt5_handler = mt5_handler
+        self.journal = journal
+        self.node = node
+        self.enabled = enabled
+        self.poll_seconds = poll_seconds
+        self.lease = lease or FileLease(node)
+        self.role = STANDBY if enabled else ACTIVE
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Journal follower state
+        self._cursor = None
+        self._last_seq = 0
+        self._pending = {}  # alert seq -> alert record still in flight
+        self._trailing = {}  # ticket -> (trailing params, time of the result)
+        self._open_tickets = set()  # tickets of the latest account snapshot
+        self.followed = 0
+
+        self.takeovers = 0
+        self.last_takeover = None
+
+        if enabled:
+            mt5_handler.account.add_listener(self._on_positions)
+
+    def add_listener(self, callback):
+        """
+        Register a callback for role changes
+
+        Args:
+            callback (callable): Called as callback(active) when this instance becomes active
+                (True) or loses the lease (False)
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, active):
+        for callback in self._listeners:
+            try:
+                callback(active)
+            except Exception as e:
+                logger.error(f"Failover listener failed: {str(e)}", exc_info=True)
+
+    def start(self):
+        """Start following the journal and competing for the lease (only with failover enabled)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="failover", daemon=True)
+        logger.info(f"Failover enabled, node {self.node} starting as standby")
+        self._thread.start()
+
+    def stop(self):
+        """Stop and hand the lease over right away"""
+        self._stop.set()
+        if self.enabled and self.role == ACTIVE:
+            self.lease.release()
+            logger.info(f"Node {self.node} released the failover lease")
+
+    def is_active(self):
+        """True if this instance may send orders"""
+        return not self.enabled or (self.role == ACTIVE and self.lease.held())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.role == ACTIVE:
+                    held, _ = self.lease.try_acquire()
+                    if not held:
+                        self._demote()
+                else:
+                    self._warm()
+                    self._follow()
+                    held, previous = self.lease.try_acquire()
+                    if held:
+                        self._promote(previous)
+            except Exception as e:
+                logger.error(f"Failover loop error: {str(e)}", exc_info=True)
+            self._stop.wait(self.poll_seconds)
+
+    def _on_positions(self, positions, taken_at):
+        """Account snapshot listener: remember open tickets, forget closed trailing positions"""
+        open_tickets = {p.ticket for p in positions}
+        with self._lock:
+            self._open_tickets = open_tickets
+            for ticket, (_, at) in list(self._trailing.items()):
+                if at < taken_at and ticket not in open_tickets:
+                    del self._trailing[ticket]
+
+    def _warm(self):
+        """Keep the standby's session and caches ready for a takeover"""
+        self.mt5_handler.check_connection()
+        self.mt5_handler.account.get()
+        self.mt5_handler.symbol_catalog.get()
+
+    def _follow(self):
+        """Apply the journal records written since the last call"""
+        records, self._cursor = self.journal.read(self._cursor)
+        if not records:
+            return
+        refresh = False
+        with self._lock:
+            for record in records:
+                self._last_seq = max(self._last_seq, record.get('seq', 0))
+                kind = record.get('type')
+                if kind == 'alert':
+                    # Positions that already existed cannot be this alert's fill
+                    record['known_tickets'] = set(self._open_tickets)
+                    self._pending[record['seq']] = record
+                elif kind == 'result':
+                    alert = self._pending.pop(record.get('alert_seq'), None)
+                    if record.get('success'):
+                        refresh = True
+                        # Netting deals can join a position whose ticket is not the order ticket
+                        ticket = record.get('position') or record.get('order')
+                        if ticket:
+                            self._open_tickets.add(ticket)
+                            if alert is not None and alert['alert'].get('trailing'):
+                                self._trailing[ticket] = (alert['alert']['trailing'], record['time'])
+                elif kind == 'reconciled':
+                    self._pending.pop(record.get('alert_seq'), None)
+            self.followed += len(records)
+        if refresh:
+            # The active instance changed positions: reload the snapshot before a takeover needs it
+            self.mt5_handler.account.request_refresh()
+
+    def _promote(self, previous):
+        """Take over: catch up with the journal, reconcile in-flight alerts and start trading"""
+        started = time.monotonic()
+        expired_ago = time.time() - previous.get('expires', 0.0) if previous.get('node') else None
+        self._follow()
+        self.journal.resume(self._last_seq)
+
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            trailing = dict(self._trailing)
+        reconciled = [self._reconcile(record) for record in pending]
+
+        # Resume trailing the positions the previous active instance was trailing
+        open_tickets = {p.ticket for p in (mt5.positions_get() or ())}
+        resumed = [t for t, (params, _) in trailing.items()
+                   if t in open_tickets and self.mt5_handler.trailing.track(t, params)]
+
+        self.role = ACTIVE
+        self.takeovers += 1
+        self.last_takeover = {
+            "at": time.time(),
+            "previous_node": previous.get('node'),
+            "lease_expired_seconds_ago": round(expired_ago, 3) if expired_ago is not None else None,
+            "takeover_ms": round((time.monotonic() - started) * 1000.0, 3),
+            "reconciled": reconciled,
+            "trailing_resumed": resumed,
+        }
+        logger.warning(f"Node {self.node} is now active (previous: {previous.get('node')}), "
+                       f"reconciled {len(reconciled)} in-flight alert(s), resumed trailing on {len(resumed)}")
+        self._notify(True)
+
+    def _reconcile(self, record):
+        """Decide from the broker's positions whether an in-flight alert was filled"""
+        alert = record['alert']
+        symbol = self.mt5_handler.broker_symbol(alert['symbol'])
+        magic = self.mt5_handler.strategies.lookup(alert.get('strategy') or DEFAULT_STRATEGY)
+        positions = [p for p in (mt5.positions_get(symbol=symbol) or ()) if p.magic == magic]
+        new = [p.ticket for p in positions if p.ticket not in record['known_tickets']]
+
+        if new:
+            status = 'filled'
+            if alert.get('trailing'):
+                for ticket in new:
+                    self.mt5_handler.trailing.track(ticket, alert['trailing'])
+        elif positions and not self.mt5_handler.is_hedging():
+            # A netting fill joins the existing position and keeps its ticket
+            status = 'unknown'
+        else:
+            status = 'not_found'
+        if status != 'filled':
+            logger.warning(f"In-flight alert {record['seq']} ({alert.get('side')} {symbol}) "
+                           f"has no new position after failover ({status}); it is not resent")
+        self.journal.append('reconciled', alert_seq=record['seq'], status=status, tickets=new)
+        return {"alert_seq": record['seq'], "symbol": symbol, "side": alert.get('side'),
+                "status": status, "tickets": new}
+
+    def _demote(self):
+        """Lost the lease to another instance: stop trading and follow it again"""
+        logger.error(f"Node {self.node} lost the failover lease to {self.lease.holder}, switching to standby")
+        self.role = STANDBY
+        self._last_seq = self.journal.seq
+        self._cursor = self.journal.end()
+        self._notify(False)
+
+    def get_status(self):
+        """
+        Role, lease and journal state
+
+        Returns:
+            dict: Failover status for /failover
+        """
+        with self._lock:
+            pending = len(self._pending)
+            trailing = len(self._trailing)
+        return {
+            "enabled": self.enabled,
+            "node": self.node,
+            "role": ACTIVE if self.is_active() else STANDBY,
+            "lease": {
+                "holder": self.lease.holder,
+                "expires_in_seconds": round(self.lease.expires - time.time(), 3) if self.lease.expires else None,
+                "ttl_seconds": self.lease.ttl,
+            } if self.enabled else None,
+            "journal": {
+                **self.journal.get_stats(),
+                "followed": self.followed,
+                "in_flight": pending,
+                "trailing_known": trailing,
+            } if self.journal is not None else None,
+            "takeovers": self.takeovers,
+            "last_takeover": self.last_takeover,
+        }
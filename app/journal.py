@@ -0,0 +1,212 @@
+import json
+import logging
+import os
+import threading
+import time
+from .config import ORDER_JOURNAL_FILE, ORDER_JOURNAL_FSYNC, ORDER_JOURNAL_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the end of the file to find the last complete record
+_TAIL_BYTES = 64 * 1024
+
+# Suffix of the previous journal file after a rotation
+ROTATED_SUFFIX = '.1'
+
+
+def journal_files(path=ORDER_JOURNAL_FILE):
+    """
+    Existing files of a journal, oldest first
+
+    Args:
+        path (str): Journal file (ORDER_JOURNAL_FILE)
+
+    Returns:
+        list: The rotated file and the current file, where they exist
+    """
+    return [p for p in (path + ROTATED_SUFFIX, path) if os.path.exists(p)]
+
+
+def _parse_seq(line):
+    """Sequence number of a complete record line, None if it has none"""
+    if not line.endswith(b'\n'):
+        return None
+    try:
+        return json.loads(line)['seq']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class OrderJournal:
+    """
+    Append-only JSON Lines record of the alerts an instance executes
+
+    Every record has a sequence number, the time and the writing node:
+
+        {"seq": 1, "time": ..., "node": "host:5000", "type": "alert", "received_at": ..., "alert": {...}}
+        {"seq": 2, "time": ..., "node": "host:5000", "type": "result", "alert_seq": 1, "success": true, ...}
+        {"seq": 3, "time": ..., "node": "host:5001", "type": "reconciled", "alert_seq": 1, "status": "filled", ...}
+
+    An alert record is written before the order is queued and a result record when it is done,
+    so alerts without a result were in flight. Only the active instance writes; a standby
+    follows the file with read().
+
+    Once the file reaches ORDER_JOURNAL_MAX_BYTES it is renamed to <path>.1 (replacing the
+    previous one) and a new file is started, so the journal takes at most about twice that
+    on disk. read() cursors carry the first sequence number of the file they point into, so
+    a follower finishes the rotated file before reading the new one.
+    """
+    def __init__(self, path=ORDER_JOURNAL_FILE, node='', fsync=ORDER_JOURNAL_FSYNC,
+                 max_bytes=ORDER_JOURNAL_MAX_BYTES):
+        self.path = path
+        self.rotated_path = path + ROTATED_SUFFIX
+        self.node = node
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.seq = self._last_seq()
+        self._file = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.rotations = 0
+
+    def _last_seq(self):
+        """Sequence number of the last complete record in the journal"""
+        for path in reversed(journal_files(self.path)):
+            with open(path, 'rb') as f:
+                f.seek(max(0, os.path.getsize(path) - _TAIL_BYTES))
+                lines = f.read().split(b'\n')
+            for line in reversed(lines):
+                try:
+                    return json.loads(line)['seq']
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return 0
+
+    def _rotate(self):
+        """Move the full file to <path>.1 and start a new one (lock held)"""
+        self._file.close()
+        self._file = None
+        try:
+            os.replace(self.path, self.rotated_path)
+            self.rotations += 1
+            logger.info(f"Order journal rotated to {self.rotated_path}")
+        except OSError as e:
+            # On Windows the rename fails while a reader has a file open; retried on the next append
+            logger.warning(f"Order journal rotation failed, continuing in {self.path}: {str(e)}")
+
+    def append(self, record_type, **fields):
+        """
+        Append a record
+
+        Args:
+            record_type (str): 'alert', 'result' or 'reconciled'
+            **fields: JSON-serializable record fields
+
+        Returns:
+            int: Sequence number of the record
+        """
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self.seq += 1
+            record = {"seq": self.seq, "time": time.time(), "node": self.node, "type": record_type, **fields}
+            self._file.write(json.dumps(record, default=str) + '\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.written += 1
+            return self.seq
+
+    def read(self, cursor=None):
+        """
+        Read the complete records written after a cursor
+
+        Args:
+            cursor (tuple, optional): Cursor returned by the previous call or end(); None
+                reads the current file from the start
+
+        Returns:
+            tuple: (list of records, cursor to continue from)
+        """
+        first_seq, offset = cursor or (None, 0)
+        current_first, records, end = _read_file(self.path, offset, first_seq)
+        if first_seq is not None and current_first != first_seq:
+            # Rotated since the last read: finish the file the cursor points into first
+            rotated_first, rotated, _ = _read_file(self.rotated_path, offset, first_seq)
+            if rotated_first != first_seq:
+                logger.warning(f"Order journal {self.path} rotated more than once since the last read, "
+                               f"records may have been skipped")
+                rotated = []
+            current_first, records, end = _read_file(self.path, 0)
+            records = rotated + records
+        return records, (current_first, end)
+
+    def end(self):
+        """Cursor at the current end of the journal"""
+        first_seq, _, end = _read_file(self.path, None)
+        return first_seq, end
+
+    def resume(self, seq):
+        """Continue numbering after a record written by another instance"""
+        with self._lock:
+            self.seq = max(self.seq, seq)
+
+    def close(self):
+        """Close the file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_stats(self):
+        """Journal position for /failover and /metrics"""
+        return {"path": self.path, "seq": self.seq, "written": self.written, "rotations": self.rotations}
+
+
+def _read_file(path, offset, first_seq=None):
+    """
+    Read a journal file through one handle, so a concurrent rotation cannot mix two files
+
+    Args:
+        path (str): Journal file
+        offset (int or None): Byte offset to read records from; None only finds the end
+        first_seq (int, optional): Expected first sequence number; nothing is read from a
+            file that starts with another record
+
+    Returns:
+        tuple: (first sequence number or None, complete records after offset, offset to continue from)
+    """
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None, [], 0
+    with f:
+        file_first = _parse_seq(f.readline())
+        size = os.fstat(f.fileno()).st_size
+        if offset is None:
+            # End of the last complete record, found in the tail of the file
+            start = max(0, size - _TAIL_BYTES)
+            f.seek(start)
+            return file_first, [], start + f.read().rfind(b'\n') + 1
+        if first_seq is not None and file_first != first_seq:
+            return file_first, [], 0
+        if size < offset:
+            logger.warning(f"Order journal {path} was truncated, reading it from the start")
+            offset = 0
+        f.seek(offset)
+        data = f.read()
+    # A line without its newline is still being written and is read next time
+    end = data.rfind(b'\n') + 1
+    records = []
+    for line in data[:end].splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            logger.error(f"Skipping unreadable order journal line: {line[:200]!r}")
+    return file_first, records, offset + end
@@ -0,0 +1,63 @@
+import threading
+from collections import deque
+
+
+class LatencyWindow:
+    """
+    Thread-safe rolling window of latency samples (milliseconds) with percentile summaries
+    """
+    def __init__(self, size=1000):
+        self._samples = deque(maxlen=size)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, value_ms):
+        """
+        Record a latency sample
+
+        Args:
+            value_ms (float): Latency in milliseconds
+        """
+        with self._lock:
+            self._samples.append(float(value_ms))
+            self._count += 1
+
+    def summary(self):
+        """
+        Summarize the samples currently in the window
+
+        Returns:
+            dict: Total count plus min/p50/p90/p99/max of the window
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            total = self._count
+
+        if not samples:
+            return {"count": total, "min": None, "p50": None, "p90": None, "p99": None, "max": None}
+
+        return {
+            "count": total,
+            "min": round(samples[0], 3),
+            "p50": round(percentile(samples, 50), 3),
+            "p90": round(percentile(samples, 90), 3),
+            "p99": round(percentile(samples, 99), 3),
+            "max": round(samples[-1], 3)
+        }
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted sequence
+
+    Args:
+        sorted_values (list): Values sorted in ascending order
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: Percentile value, or None for an empty sequence
+    """
+    if not sorted_values:
+        return None
+    index = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[min(max(index, 0), len(sorted_values) - 1)]
@@ -1,15 +1,33 @@
 import logging
-import MetaTrader5 as mt5
+import time
+from .backend import mt5
 import pandas as pd
 from datetime import datetime
 from .config import (
     MT5_ACCOUNT, MT5_PASSWORD, MT5_SERVER, MT5_PATH,
-    DEFAULT_VOLUME, DEFAULT_STOP_LOSS, DEFAULT_TAKE_PROFIT,
-    MT5_DEFAULT_SUFFIX
+    DEFAULT_VOLUME, DEFAULT_STOP_LOSS, DEFAULT_TAKE_PROFIT
 )
+from .order_executor import OrderRetryEngine, classify_retcode, SUCCESS
+from .execution_quality import ExecutionQualityRecorder
+from .tick_feed import TickFeed
+from .trailing import TrailingStopEngine
+from .events import EventBroker
+from .symbol_catalog import SymbolCatalog
+from .symbol_resolver import SymbolResolver
+from .order_pipeline import OrderPipeline
+from .account import AccountCache
+from .equity_recorder import EquityRecorder
+from .sizing import risk_volumes
+from .strategies import StrategyIndex, DEFAULT_STRATEGY
 
 logger = logging.getLogger(__name__)
 
+# Position side filters accepted by modify_positions()
+POSITION_SIDES = {
+    'BUY': mt5.POSITION_TYPE_BUY, 'LONG': mt5.POSITION_TYPE_BUY,
+    'SELL': mt5.POSITION_TYPE_SELL, 'SHORT': mt5.POSITION_TYPE_SELL,
+}
+
 class MT5Handler:
     """
     Handles all MetaTrader 5 operations including connection and trading
@@ -17,7 +35,20 @@ class MT5Handler:
     def __init__(self):
         self.connected = False
         self.volume_column = None
-        self.symbol_map = {}  # Cache for symbol mappings
+        self.execution_quality = ExecutionQualityRecorder()
+        self.executor = OrderRetryEngine(recorder=self.execution_quality)
+        self.tick_feed = TickFeed()
+        self.trailing = TrailingStopEngine(self, self.tick_feed)
+        self.events = EventBroker(self.tick_feed)
+        self.symbol_catalog = SymbolCatalog()
+        self.symbols = SymbolResolver.from_file()
+        self.symbol_catalog.add_listener(self.symbols.build)
+        self.pipeline = OrderPipeline()
+        self.account = AccountCache(self.tick_feed)
+        self.strategies = StrategyIndex.from_file()
+        self.account.add_listener(self.strategies.sync)
+        self.account.add_listener(self.events.publish_positions)
+        self.equity = EquityRecorder(self.account)
         self.initialize_mt5()
     
     def initialize_mt5(self):
@@ -60,6 +91,9 @@ class MT5Handler:
                 if matches:
                     logger.info(f"Found {pair} variations: {matches}")
         
+        # Build the TradingView <-> broker symbol tables from the symbol list
+        self.symbol_catalog.get()
+        
         self.connected = True
         return True
         
@@ -116,6 +150,38 @@ class MT5Handler:
             return self.initialize_mt5()
         return True
     
+    def broker_symbol(self, symbol):
+        """
+        Convert a TradingView symbol to the broker's symbol name
+        
+        Args:
+            symbol (str): Symbol as sent by TradingView (e.g., 'OANDA:EURUSD')
+            
+        Returns:
+            str: Broker symbol (e.g., 'EURUSD.r')
+        """
+        return self.symbols.to_broker(symbol)
+    
+    def _did_you_mean(self, symbol):
+        """Error message suffix naming broker symbols close to an unknown symbol"""
+        suggestions = self.symbols.suggest(symbol)
+        return f". Did you mean {', '.join(suggestions)}?" if suggestions else ""
+    
+    def position_symbol(self, position_id):
+        """
+        Get the broker symbol of an open position
+        
+        Args:
+            position_id (int): Position ticket
+            
+        Returns:
+            str or None: Broker symbol, or None if the position is not open
+        """
+        positions = mt5.positions_get(ticket=position_id)
+        if not positions:
+            return None
+        return positions[0].symbol
+    
     def list_available_symbols(self):
         """
         Get a list of all available symbols in MT5
@@ -126,18 +192,16 @@ class MT5Handler:
         if not self.check_connection():
             return []
             
-        # Get all symbols from MT5
-        all_symbols = mt5.symbols_get()
-        if not all_symbols:
+        # Served from the cached catalog, reloaded only when the symbol set changes
+        snapshot = self.symbol_catalog.get()
+        if snapshot is None:
             return []
-            
-        # Extract symbol names
-        symbol_names = [s.name for s in all_symbols]
-        return symbol_names
+        return list(snapshot.names)
     
     def place_trade(self, symbol, order_type, volume=DEFAULT_VOLUME, 
                    price=0.0, stop_loss=DEFAULT_STOP_LOSS, 
-                   take_profit=DEFAULT_TAKE_PROFIT, comment="TV Signal"):
+                   take_profit=DEFAULT_TAKE_PROFIT, comment="TV Signal", trailing=None,
+                   strategy=DEFAULT_STRATEGY, deadline=None):
         """
         Place a trade in MT5
         
@@ -149,34 +213,38 @@ class MT5Handler:
             stop_loss (float): Stop loss in points
             take_profit (float): Take profit in points
             comment (str): Order comment
+            trailing (dict, optional): Trailing-stop/break-even parameters for the new position
+            strategy (str): Strategy id; selects the magic number of the order
+            deadline (float, optional): time.monotonic() after which the order must not be sent
             
         Returns:
             dict: Result of the order operation
         """
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.warning(f"Dropping {order_type} {symbol}: deadline passed while queued")
+            return self._order_event('trade', {
+                "success": False,
+                "message": "Deadline passed before the order was sent",
+                "expired": True
+            })
+        
         if not self.check_connection():
             return {"success": False, "message": "MT5 connection failed"}
         
-        # Check if the symbol already has the suffix
-        if MT5_DEFAULT_SUFFIX and not symbol.endswith(MT5_DEFAULT_SUFFIX):
-            mt5_symbol = symbol + MT5_DEFAULT_SUFFIX
-            logger.info(f"Adding suffix: {symbol} -> {mt5_symbol}")
-        else:
-            mt5_symbol = symbol
+        # Map the TradingView symbol to the broker's name
+        mt5_symbol = self.broker_symbol(symbol)
+        if mt5_symbol != symbol:
+            logger.info(f"Resolved symbol: {symbol} -> {mt5_symbol}")
             
         logger.info(f"Trading symbol: {mt5_symbol}")
         
         # Get symbol info
         symbol_info = mt5.symbol_info(mt5_symbol)
         if symbol_info is None:
-            # Try to find similar symbols for debugging
-            similar_symbols = []
-            all_symbols = mt5.symbols_get()
-            if all_symbols:
-                base_name = symbol.split('.')[0]
-                similar_symbols = [s.name for s in all_symbols if base_name in s.name]
-            
-            logger.error(f"Symbol {mt5_symbol} not found. Similar symbols: {similar_symbols}")
-            return {"success": False, "message": f"Symbol {mt5_symbol} not found"}
+            # Unknown names are not guessed; close broker symbols are suggested instead
+            hint = self._did_you_mean(symbol)
+            logger.error(f"Symbol {mt5_symbol} not found{hint}")
+            return {"success": False, "message": f"Symbol {mt5_symbol} not found{hint}"}
         
         if not symbol_info.visible:
             logger.info(f"Symbol {mt5_symbol} is not visible, trying to add it")
@@ -197,64 +265,353 @@ class MT5Handler:
         # Set order type
         if order_type.upper() in ["BUY", "LONG"]:
             mt5_order_type = mt5.ORDER_TYPE_BUY
-            current_price = tick.ask
-            sl = current_price - stop_loss * point if stop_loss > 0 else 0
-            tp = current_price + take_profit * point if take_profit > 0 else 0
+            direction = 1
         elif order_type.upper() in ["SELL", "SHORT"]:
             mt5_order_type = mt5.ORDER_TYPE_SELL
-            current_price = tick.bid
-            sl = current_price + stop_loss * point if stop_loss > 0 else 0
-            tp = current_price - take_profit * point if take_profit > 0 else 0
+            direction = -1
         else:
             return {"success": False, "message": f"Invalid order type: {order_type}"}
         
-        # Create request structure for market order
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": mt5_symbol,  # Use symbol with suffix
-            "volume": float(volume),
-            "type": mt5_order_type,
-            "price": current_price,
-            "sl": sl,
-            "tp": tp,
-            "deviation": 30,  # Increased deviation for more tolerance
-            "magic": 234000,
-            "comment": comment,
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
+        magic = self.strategies.magic(strategy)
         
-        # Send the order
-        logger.info(f"Sending order: {request}")
-        result = mt5.order_send(request)
+        def build_request(tick, deviation, filling):
+            """Price the market order, SL and TP from the given tick"""
+            current_price = tick.ask if direction > 0 else tick.bid
+            sl = current_price - direction * stop_loss * point if stop_loss > 0 else 0
+            tp = current_price + direction * take_profit * point if take_profit > 0 else 0
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": mt5_symbol,  # Use symbol with suffix
+                "volume": float(volume),
+                "type": mt5_order_type,
+                "price": current_price,
+                "sl": sl,
+                "tp": tp,
+                "deviation": deviation,
+                "magic": magic,
+                "comment": comment,
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": filling,
+            }
+            logger.info(f"Sending order: {request}")
+            return request
+        
+        # Send the order, retrying requotes and unsupported filling modes
+        result, execution = self.executor.execute(symbol_info, build_request, tick=tick, deadline=deadline)
         
         # Process the result
+        if execution.get('expired'):
+            return self._order_event('trade', {
+                "success": False,
+                "message": "Deadline passed before the order was sent",
+                "expired": True,
+                "execution": execution
+            })
         if result is None:
             error_code = mt5.last_error()
             logger.error(f"Order failed with error code: {error_code}")
-            return {
+            return self._order_event('trade', {
                 "success": False,
-                "message": f"Order failed. Error: {error_code}"
-            }
+                "message": f"Order failed. Error: {error_code}",
+                "execution": execution
+            })
         
-        if result.retcode != mt5.TRADE_RETCODE_DONE:
+        if classify_retcode(result.retcode) != SUCCESS:
             # Log detailed result for debugging
             result_dict = result._asdict()
-            logger.error(f"Order failed. Details: {result_dict}")
-            return {
+            logger.error(f"Order failed after {execution['attempts']} attempt(s). Details: {result_dict}")
+            return self._order_event('trade', {
                 "success": False,
                 "message": f"Order failed. Error code: {result.retcode}",
-                "details": result_dict
-            }
+                "details": result_dict,
+                "execution": execution
+            })
         
         # Success! Log and return the result
         result_dict = result._asdict()
-        logger.info(f"Order executed successfully. Details: {result_dict}")
-        return {
+        logger.info(f"Order executed successfully in {execution['attempts']} attempt(s). Details: {result_dict}")
+        
+        # Index the new position under its strategy. In hedging mode the position ticket is the
+        # order ticket; netting deals may join an existing position and wait for the next snapshot.
+        hedging = self.is_hedging()
+        if hedging:
+            self.strategies.add(magic, result.order, mt5_symbol)
+        position = result.order if hedging else None
+        
+        # Hand the position to the trailing engine
+        if trailing:
+            if not hedging:
+                position = self._netting_position(mt5_symbol)
+            execution['trailing'] = self.trailing.track(position, trailing) if position else False
+        
+        return self._order_event('trade', {
             "success": True,
             "message": f"Order executed: {order_type} {symbol}",
-            "details": result_dict
-        }
+            "details": result_dict,
+            "execution": execution,
+            "position": position
+        })
+    
+    def _netting_position(self, mt5_symbol):
+        """
+        Ticket of the single position a netting account holds on a symbol
+        
+        A netting deal opens, increases or reverses that position, so its ticket differs from
+        the order ticket whenever the position already existed.
+        
+        Args:
+            mt5_symbol (str): Broker symbol
+            
+        Returns:
+            int or None: Position ticket, or None if the deal left the symbol flat
+        """
+        positions = mt5.positions_get(symbol=mt5_symbol)
+        if not positions:
+            logger.warning(f"No open {mt5_symbol} position after the deal")
+            return None
+        return positions[0].ticket
+    
+    def reverse_position(self, symbol, volume=None, stop_loss=DEFAULT_STOP_LOSS,
+                         take_profit=DEFAULT_TAKE_PROFIT, comment="TV Signal", trailing=None,
+                         strategy=DEFAULT_STRATEGY, deadline=None):
+        """
+        Flip the strategy's position on a symbol to the opposite side
+        
+        Netting accounts get one deal of the open volume plus the new volume. Hedging accounts
+        open the opposite position with the same combined volume and settle the old position(s)
+        against it with TRADE_ACTION_CLOSE_BY, so the spread is paid once and only the new
+        position remains.
+        
+        Args:
+            symbol (str): Trading instrument symbol (e.g., 'EURUSD')
+            volume (float, optional): Volume of the new position. None mirrors the open volume.
+            stop_loss (float): Stop loss of the new position in points
+            take_profit (float): Take profit of the new position in points
+            comment (str): Order comment
+            trailing (dict, optional): Trailing-stop/break-even parameters for the new position
+            strategy (str): Strategy id whose position is reversed
+            deadline (float, optional): time.monotonic() after which the flip must not be sent
+            
+        Returns:
+            dict: Result of the reversal
+        """
+        if not self.check_connection():
+            return {"success": False, "message": "MT5 connection failed"}
+        
+        mt5_symbol = self.broker_symbol(symbol)
+        magic = self.strategies.lookup(strategy)
+        positions = [p for p in mt5.positions_get(symbol=mt5_symbol) or [] if p.magic == magic]
+        if not positions:
+            if self.account.symbol_info(mt5_symbol) is None:
+                return {"success": False, "message": f"Symbol {mt5_symbol} not found{self._did_you_mean(symbol)}"}
+            return {"success": False, "message": f"No {strategy} position on {mt5_symbol} to reverse"}
+        if len({p.type for p in positions}) > 1:
+            return {"success": False, "message": f"Positions on {mt5_symbol} are both long and short"}
+        
+        open_volume = round(sum(p.volume for p in positions), 8)
+        new_volume = open_volume if volume is None else float(volume)
+        order_type = "SELL" if positions[0].type == mt5.POSITION_TYPE_BUY else "BUY"
+        # Netting and hedging flips send different volumes, so never guess the mode
+        margin_mode = self.margin_mode()
+        if margin_mode is None:
+            logger.error(f"Account margin mode unknown, not reversing {mt5_symbol}")
+            return {"success": False, "message": "Account margin mode unknown, not reversing"}
+        hedging = margin_mode == mt5.ACCOUNT_MARGIN_MODE_RETAIL_HEDGING
+        logger.info(f"Reversing {open_volume} lots of {mt5_symbol} ({strategy}) to {order_type} {new_volume} "
+                    f"in {'hedging' if hedging else 'netting'} mode")
+        
+        # One deal of the combined volume; in netting mode this is the whole flip
+        result = self.place_trade(symbol, order_type, volume=open_volume + new_volume, stop_loss=stop_loss,
+                                  take_profit=take_profit, comment=comment,
+                                  trailing=trailing if not hedging else None, strategy=strategy,
+                                  deadline=deadline)
+        if result.get('expired'):
+            return result
+        if not result['success'] or not hedging:
+            result['message'] = f"Reverse {'failed' if not result['success'] else 'executed'}: {result['message']}"
+            return result
+        
+        # Hedging: settle every old position against the new one
+        new_ticket = result['details']['order']
+        settled = []
+        for position in positions:
+            request = {
+                "action": mt5.TRADE_ACTION_CLOSE_BY,
+                "position": position.ticket,
+                "position_by": new_ticket,
+                "magic": magic,
+                "comment": "Reverse close by",
+            }
+            logger.info(f"Closing position {position.ticket} by {new_ticket}: {request}")
+            close_result = mt5.order_send(request)
+            if close_result is None or close_result.retcode != mt5.TRADE_RETCODE_DONE:
+                error = mt5.last_error() if close_result is None else close_result.retcode
+                logger.error(f"Close by failed for position {position.ticket}: {error}")
+                # Close what is left of the new position so the old and new legs are not both open
+                rollback = self.close_position(new_ticket)
+                if rollback['success']:
+                    message = (f"Reverse failed: close by of {position.ticket} failed (error {error}), "
+                               f"new position {new_ticket} closed again")
+                else:
+                    logger.error(f"Could not close reverse position {new_ticket}: {rollback['message']}")
+                    message = (f"Reverse failed: close by of {position.ticket} failed (error {error}) and "
+                               f"closing new position {new_ticket} failed: {rollback['message']}")
+                return self._order_event('close', {
+                    "success": False,
+                    "message": message,
+                    "details": result['details'],
+                    "settled": settled,
+                    "rolled_back": rollback['success'],
+                    "exposure": self._net_exposure(mt5_symbol, magic)
+                })
+            self.strategies.remove(position.ticket)
+            settled.append(position.ticket)
+        
+        if trailing:
+            result['execution']['trailing'] = self.trailing.track(new_ticket, trailing)
+        
+        return self._order_event('close', {
+            "success": True,
+            "message": f"Reverse executed: {order_type} {symbol}, closed {settled} by {new_ticket}",
+            "details": result['details'],
+            "execution": result['execution'],
+            "position": new_ticket,
+            "settled": settled,
+            "exposure": self._net_exposure(mt5_symbol, magic)
+        })
+    
+    def _net_exposure(self, mt5_symbol, magic):
+        """
+        Net volume a strategy holds on a symbol, read back from the terminal
+        
+        Returns:
+            dict: Signed volume (positive long, negative short) and the open tickets,
+                or None if the positions cannot be read
+        """
+        positions = mt5.positions_get(symbol=mt5_symbol)
+        if positions is None:
+            return None
+        positions = [p for p in positions if p.magic == magic]
+        volume = sum(p.volume if p.type == mt5.POSITION_TYPE_BUY else -p.volume for p in positions)
+        return {"volume": round(volume, 8), "tickets": [p.ticket for p in positions]}
+    
+    def size_trades(self, trades):
+        """
+        Set the volume of alerts that give a risk_pct instead of a fixed volume
+        
+        All risk-sized alerts are computed in one vectorized pass from the cached account
+        snapshot and cached symbol information, without extra terminal calls once warm.
+        
+        Args:
+            trades (list): Parsed alerts from parse_tradingview_webhook(); volumes are updated in place
+            
+        Returns:
+            list: None for every alert that can be placed, or an error message
+        """
+        errors = [None] * len(trades)
+        indices = [i for i, trade in enumerate(trades) if trade.get('risk_pct', 0) > 0]
+        if not indices:
+            return errors
+        
+        account = self.account.get()
+        if account is None:
+            for i in indices:
+                errors[i] = "Account information not available for risk sizing"
+            return errors
+        
+        sized, infos = [], []
+        for i in indices:
+            info = self.account.symbol_info(self.broker_symbol(trades[i]['symbol']))
+            if info is None:
+                errors[i] = f"Symbol {trades[i]['symbol']} not found{self._did_you_mean(trades[i]['symbol'])}"
+                continue
+            sized.append(i)
+            infos.append(info)
+        if not sized:
+            return errors
+        
+        volumes = risk_volumes(
+            account['equity'],
+            [trades[i]['risk_pct'] for i in sized],
+            [trades[i]['stop_loss'] for i in sized],
+            [info.point for info in infos],
+            [info.trade_tick_value for info in infos],
+            [info.trade_tick_size for info in infos],
+            [info.volume_step for info in infos],
+            [info.volume_min for info in infos],
+            [info.volume_max for info in infos]
+        )
+        
+        for i, volume in zip(sized, volumes.tolist()):
+            if volume <= 0:
+                errors[i] = f"Risk of {trades[i]['risk_pct']}% is below the minimum volume of {trades[i]['symbol']}"
+            else:
+                trades[i]['volume'] = volume
+                logger.info(f"Sized {trades[i]['symbol']}: {trades[i]['risk_pct']}% of {account['equity']} "
+                            f"with {trades[i]['stop_loss']} point stop -> {volume} lots")
+        return errors
+    
+    def margin_mode(self):
+        """
+        Get the account margin mode from the cached snapshot, or from the terminal without one
+        
+        Returns:
+            int or None: ACCOUNT_MARGIN_MODE_* value, or None if it cannot be read
+        """
+        account = self.account.get()
+        if account is not None:
+            return account['margin_mode']
+        info = mt5.account_info()
+        return info.margin_mode if info is not None else None
+    
+    def is_hedging(self):
+        """
+        Check whether the account is in hedging mode
+        
+        Returns:
+            bool: True for hedging accounts, False for netting/exchange accounts or if unknown
+        """
+        return self.margin_mode() == mt5.ACCOUNT_MARGIN_MODE_RETAIL_HEDGING
+    
+    def strategy_positions(self, strategy_id):
+        """
+        Get the open positions of a strategy
+        
+        The tickets come from the strategy index, which order results update right away and
+        every account snapshot reconciles (including the first one at startup, so positions
+        opened before a restart are found by magic number). Only those tickets are read from
+        the terminal, one positions_get(ticket=...) call each.
+        
+        Args:
+            strategy_id (str): Strategy id
+            
+        Returns:
+            list or None: Position dictionaries, or None for a strategy that is neither
+                configured nor has placed orders or holds positions
+            
+        Raises:
+            ConnectionError: If the terminal is not connected
+        """
+        if not self.check_connection():
+            raise ConnectionError("MT5 connection failed")
+        
+        # Reconciles the index with the first snapshot if that has not happened yet
+        self.account.start()
+        tickets = self.strategies.tickets(strategy_id)
+        if not tickets and not self.strategies.known(strategy_id):
+            return None
+        
+        result = []
+        for ticket in sorted(tickets):
+            positions = mt5.positions_get(ticket=ticket)
+            if not positions:
+                # Closed since the last snapshot
+                self.strategies.remove(ticket)
+                continue
+            position_dict = positions[0]._asdict()
+            position_dict['strategy'] = strategy_id
+            result.append(position_dict)
+        return result
     
     def get_positions(self, symbol=None):
         """
@@ -269,13 +626,8 @@ class MT5Handler:
         if not self.check_connection():
             return []
         
-        # Add suffix if needed
-        if symbol is not None and MT5_DEFAULT_SUFFIX and not symbol.endswith(MT5_DEFAULT_SUFFIX):
-            mt5_symbol = symbol + MT5_DEFAULT_SUFFIX
-            positions = mt5.positions_get(symbol=mt5_symbol)
-        else:
-            # Use as-is or get all positions
-            positions = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
+        # Filter by the broker's name of the symbol, or get all positions
+        positions = mt5.positions_get(symbol=self.broker_symbol(symbol)) if symbol else mt5.positions_get()
             
         if positions is None or len(positions) == 0:
             return []
@@ -285,11 +637,12 @@ class MT5Handler:
         for position in positions:
             position_dict = position._asdict()
             
-            # Remove suffix from the returned symbol for consistency with TradingView
-            if MT5_DEFAULT_SUFFIX and position_dict['symbol'].endswith(MT5_DEFAULT_SUFFIX):
+            # Report the TradingView name for consistency with the alerts
+            tv_symbol = self.symbols.to_tv(position_dict['symbol'])
+            if tv_symbol != position_dict['symbol']:
                 # Store both the broker symbol and the standard symbol
                 position_dict['broker_symbol'] = position_dict['symbol']
-                position_dict['symbol'] = position_dict['symbol'][:-len(MT5_DEFAULT_SUFFIX)]
+                position_dict['symbol'] = tv_symbol
                 
             result.append(position_dict)
             
@@ -318,55 +671,264 @@ class MT5Handler:
         
         # Determine order type for closing
         close_type = mt5.ORDER_TYPE_SELL if position.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
-        price = mt5.symbol_info_tick(position_symbol).bid if position.type == mt5.ORDER_TYPE_BUY else mt5.symbol_info_tick(position_symbol).ask
         
-        # Create request structure
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "position": position_id,
-            "symbol": position_symbol,
-            "volume": position.volume,
-            "type": close_type,
-            "price": price,
-            "deviation": 30,
-            "magic": 234000,
-            "comment": "Close position",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
+        symbol_info = mt5.symbol_info(position_symbol)
+        if symbol_info is None:
+            return {"success": False, "message": f"Symbol {position_symbol} not found"}
         
-        # Send the order
-        logger.info(f"Closing position {position_id}: {request}")
-        result = mt5.order_send(request)
+        def build_request(tick, deviation, filling):
+            """Price the closing deal from the given tick"""
+            price = tick.bid if position.type == mt5.ORDER_TYPE_BUY else tick.ask
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "position": position_id,
+                "symbol": position_symbol,
+                "volume": position.volume,
+                "type": close_type,
+                "price": price,
+                "deviation": deviation,
+                "magic": position.magic,
+                "comment": "Close position",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": filling,
+            }
+            logger.info(f"Closing position {position_id}: {request}")
+            return request
+        
+        # Send the order, retrying requotes and unsupported filling modes
+        result, execution = self.executor.execute(symbol_info, build_request)
         
         # Process the result
         if result is None:
             error_code = mt5.last_error()
             logger.error(f"Close position failed with error code: {error_code}")
-            return {
+            return self._order_event('close', {
                 "success": False,
-                "message": f"Close position failed. Error: {error_code}"
-            }
+                "message": f"Close position failed. Error: {error_code}",
+                "execution": execution
+            })
             
-        if result.retcode != mt5.TRADE_RETCODE_DONE:
+        if classify_retcode(result.retcode) != SUCCESS:
             result_dict = result._asdict()
             logger.error(f"Close position failed. Details: {result_dict}")
-            return {
+            return self._order_event('close', {
                 "success": False,
                 "message": f"Close position failed. Error code: {result.retcode}",
-                "details": result_dict
-            }
+                "details": result_dict,
+                "execution": execution
+            })
         
         result_dict = result._asdict()
         logger.info(f"Position {position_id} closed successfully. Details: {result_dict}")
-        return {
+        self.strategies.remove(position_id)
+        return self._order_event('close', {
             "success": True,
             "message": f"Position {position_id} closed",
-            "details": result_dict
+            "details": result_dict,
+            "execution": execution
+        })
+    
+    def modify_position(self, position_id, stop_loss=None, take_profit=None):
+        """
+        Set the stop loss and/or take profit of an open position
+        
+        Args:
+            position_id (int): Position ticket
+            stop_loss (float, optional): New absolute stop loss price. None keeps the current one.
+            take_profit (float, optional): New absolute take profit price. None keeps the current one.
+            
+        Returns:
+            dict: Result of the modify operation
+        """
+        if not self.check_connection():
+            return {"success": False, "message": "MT5 connection failed"}
+        
+        positions = mt5.positions_get(ticket=position_id)
+        if positions is None or len(positions) == 0:
+            return {"success": False, "message": f"Position {position_id} not found"}
+        
+        position = positions[0]
+        sl = position.sl if stop_loss is None else stop_loss
+        tp = position.tp if take_profit is None else take_profit
+        return self.send_sltp(position_id, position.symbol, sl, tp, position.magic)
+    
+    def modify_positions(self, tickets=None, symbol=None, side=None, magic=None, comment=None,
+                         stop_loss=None, take_profit=None, sl_points=None, tp_points=None):
+        """
+        Move SL/TP of many positions from one positions snapshot and one tick per symbol
+        
+        Positions are selected by ticket list and/or filters. New levels are either absolute
+        prices (stop_loss/take_profit) or distances in points from the current closing price
+        (sl_points/tp_points). Requests are sent back to back without re-reading positions.
+        
+        Args:
+            tickets (list, optional): Position tickets to modify
+            symbol (str, optional): Only positions of this symbol
+            side (str, optional): Only 'BUY'/'LONG' or 'SELL'/'SHORT' positions
+            magic (int, optional): Only positions with this magic number
+            comment (str, optional): Only positions whose comment contains this text
+            stop_loss (float, optional): Absolute stop loss price (0 removes it)
+            take_profit (float, optional): Absolute take profit price (0 removes it)
+            sl_points (float, optional): Stop loss distance in points from the current price
+            tp_points (float, optional): Take profit distance in points from the current price
+            
+        Returns:
+            dict: Per-ticket results and timings
+        """
+        position_type = None
+        if side is not None:
+            position_type = POSITION_SIDES.get(str(side).upper())
+            if position_type is None:
+                return {"success": False, "message": f"Invalid side: {side}. Use BUY/LONG or SELL/SHORT"}
+        
+        if not self.check_connection():
+            return {"success": False, "message": "MT5 connection failed"}
+        
+        started = time.perf_counter()
+        
+        # One positions snapshot for the whole batch
+        if symbol is not None:
+            positions = mt5.positions_get(symbol=self.broker_symbol(symbol))
+        else:
+            positions = mt5.positions_get()
+        positions = list(positions or [])
+        
+        if tickets is not None:
+            wanted = {int(t) for t in tickets}
+            positions = [p for p in positions if p.ticket in wanted]
+        if position_type is not None:
+            positions = [p for p in positions if p.type == position_type]
+        if magic is not None:
+            positions = [p for p in positions if p.magic == int(magic)]
+        if comment is not None:
+            positions = [p for p in positions if comment in p.comment]
+        snapshot_done = time.perf_counter()
+        
+        # One symbol_info and one tick per symbol
+        prices = {}
+        if sl_points is not None or tp_points is not None:
+            for position_symbol in {p.symbol for p in positions}:
+                info = mt5.symbol_info(position_symbol)
+                tick = mt5.symbol_info_tick(position_symbol)
+                prices[position_symbol] = (info, tick)
+        prices_done = time.perf_counter()
+        
+        results = []
+        for position in positions:
+            sl, tp = position.sl, position.tp
+            if stop_loss is not None:
+                sl = stop_loss
+            if take_profit is not None:
+                tp = take_profit
+            
+            if position.symbol in prices:
+                info, tick = prices[position.symbol]
+                if info is None or tick is None:
+                    results.append({"ticket": position.ticket, "success": False,
+                                    "message": f"No market data for {position.symbol}"})
+                    continue
+                long = position.type == mt5.POSITION_TYPE_BUY
+                price = tick.bid if long else tick.ask
+                direction = 1 if long else -1
+                if sl_points is not None:
+                    sl = round(price - direction * sl_points * info.point, info.digits) if sl_points > 0 else 0.0
+                if tp_points is not None:
+                    tp = round(price + direction * tp_points * info.point, info.digits) if tp_points > 0 else 0.0
+            
+            if sl == position.sl and tp == position.tp:
+                results.append({"ticket": position.ticket, "success": True, "message": "Unchanged",
+                                "sl": sl, "tp": tp, "latency_ms": 0.0})
+                continue
+            
+            sent = time.perf_counter()
+            result = self.send_sltp(position.ticket, position.symbol, sl, tp, position.magic)
+            results.append({
+                "ticket": position.ticket,
+                "success": result["success"],
+                "message": result["message"],
+                "sl": sl,
+                "tp": tp,
+                "latency_ms": round((time.perf_counter() - sent) * 1000.0, 3)
+            })
+        finished = time.perf_counter()
+        
+        failed = sum(1 for r in results if not r["success"])
+        send_seconds = finished - prices_done
+        return {
+            "success": failed == 0,
+            "message": f"Modified {len(results) - failed} of {len(results)} positions",
+            "count": len(results),
+            "failed": failed,
+            "results": results,
+            "timings": {
+                "snapshot_ms": round((snapshot_done - started) * 1000.0, 3),
+                "prices_ms": round((prices_done - snapshot_done) * 1000.0, 3),
+                "send_ms": round(send_seconds * 1000.0, 3),
+                "total_ms": round((finished - started) * 1000.0, 3),
+                "per_second": round(len(results) / send_seconds, 1) if send_seconds > 0 else None
+            }
+        }
+    
+    def send_sltp(self, position_id, symbol, sl, tp, magic):
+        """
+        Send a TRADE_ACTION_SLTP request without looking the position up first
+        
+        Args:
+            position_id (int): Position ticket
+            symbol (str): Broker symbol of the position
+            sl (float): Absolute stop loss price (0 removes it)
+            tp (float): Absolute take profit price (0 removes it)
+            magic (int): Magic number of the position, so the change is labelled with its strategy
+            
+        Returns:
+            dict: Result of the modify operation
+        """
+        request = {
+            "action": mt5.TRADE_ACTION_SLTP,
+            "position": position_id,
+            "symbol": symbol,
+            "sl": float(sl),
+            "tp": float(tp),
+            "magic": magic,
         }
+        
+        logger.info(f"Modifying position {position_id}: {request}")
+        result = mt5.order_send(request)
+        
+        if result is None:
+            error_code = mt5.last_error()
+            logger.error(f"Modify position failed with error code: {error_code}")
+            return self._order_event('modify', {
+                "success": False,
+                "message": f"Modify position failed. Error: {error_code}"
+            })
+        
+        if result.retcode != mt5.TRADE_RETCODE_DONE:
+            result_dict = result._asdict()
+            logger.error(f"Modify position failed. Details: {result_dict}")
+            return self._order_event('modify', {
+                "success": False,
+                "message": f"Modify position failed. Error code: {result.retcode}",
+                "details": result_dict
+            })
+        
+        return self._order_event('modify', {
+            "success": True,
+            "message": f"Position {position_id} modified",
+            "details": result._asdict()
+        })
+    
+    def _order_event(self, event, response):
+        """Publish an order result to stream subscribers and return it unchanged"""
+        self.events.publish('orders', event, response)
+        if response["success"]:
+            # Positions changed, so the cached account snapshot is out of date
+            self.account.request_refresh()
+        return response
     
     def close_session(self):
         """Properly close MT5 connection"""
+        self.tick_feed.stop()
         if self.connected:
             mt5.shutdown()
             self.connected = False
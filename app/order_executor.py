@@ -0,0 +1,300 @@
+import logging
+import math
+import threading
+import time
+from .backend import mt5
+from .metrics import LatencyWindow
+from .config import (
+    ORDER_MAX_ATTEMPTS, ORDER_RETRY_DEADLINE_MS, ORDER_RETRY_BACKOFF_MS,
+    ORDER_BASE_DEVIATION, ORDER_MAX_DEVIATION
+)
+
+logger = logging.getLogger(__name__)
+
+# symbol_info.filling_mode bit flags (not exported by the MetaTrader5 package)
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+# Retcode classes
+SUCCESS = 'success'
+REPRICE = 'reprice'
+REFILL = 'refill'
+FATAL = 'fatal'
+
+_SUCCESS_RETCODES = {
+    mt5.TRADE_RETCODE_DONE,
+    mt5.TRADE_RETCODE_DONE_PARTIAL,
+    mt5.TRADE_RETCODE_PLACED,
+}
+
+# The request never reached execution, so it is safe to send again with a fresh price.
+# TIMEOUT and CONNECTION are deliberately absent: the request may have reached the server
+# and the order may have been executed there.
+_REPRICE_RETCODES = {
+    mt5.TRADE_RETCODE_REQUOTE,
+    mt5.TRADE_RETCODE_PRICE_CHANGED,
+    mt5.TRADE_RETCODE_PRICE_OFF,
+    mt5.TRADE_RETCODE_TOO_MANY_REQUESTS,
+}
+
+_REFILL_RETCODES = {
+    mt5.TRADE_RETCODE_INVALID_FILL,
+}
+
+_SLIPPAGE_ALPHA = 0.2  # EWMA weight of the newest slippage observation
+
+
+def classify_retcode(retcode):
+    """
+    Classify an order_send retcode
+
+    Args:
+        retcode (int): Retcode from an OrderSendResult
+
+    Returns:
+        str: One of SUCCESS, REPRICE, REFILL or FATAL
+    """
+    if retcode in _SUCCESS_RETCODES:
+        return SUCCESS
+    if retcode in _REPRICE_RETCODES:
+        return REPRICE
+    if retcode in _REFILL_RETCODES:
+        return REFILL
+    return FATAL
+
+
+def filling_candidates(symbol_info):
+    """
+    Order filling modes a symbol supports, most preferred first
+
+    Args:
+        symbol_info: Result of mt5.symbol_info()
+
+    Returns:
+        list: ORDER_FILLING_* constants to try in order
+    """
+    mask = getattr(symbol_info, 'filling_mode', 0) or 0
+    candidates = []
+    if mask & SYMBOL_FILLING_IOC:
+        candidates.append(mt5.ORDER_FILLING_IOC)
+    if mask & SYMBOL_FILLING_FOK:
+        candidates.append(mt5.ORDER_FILLING_FOK)
+    # RETURN is accepted for request/exchange execution and is the last resort elsewhere
+    candidates.append(mt5.ORDER_FILLING_RETURN)
+    return candidates
+
+
+class SymbolExecutionState:
+    """
+    Per-symbol execution settings learned from previous orders
+    """
+    __slots__ = ('filling', 'deviation', 'slippage_ewma', 'fills', 'requotes')
+
+    def __init__(self, deviation):
+        self.filling = None
+        self.deviation = deviation
+        self.slippage_ewma = 0.0
+        self.fills = 0
+        self.requotes = 0
+
+
+class OrderRetryEngine:
+    """
+    Sends orders with retcode-aware retries, re-pricing from a fresh tick on requotes,
+    per-symbol filling mode discovery and slippage-adaptive deviation
+    """
+    def __init__(self, max_attempts=ORDER_MAX_ATTEMPTS, deadline_ms=ORDER_RETRY_DEADLINE_MS,
+                 backoff_ms=ORDER_RETRY_BACKOFF_MS, base_deviation=ORDER_BASE_DEVIATION,
+                 max_deviation=ORDER_MAX_DEVIATION, recorder=None):
+        self.max_attempts = max(1, max_attempts)
+        self.deadline_ms = deadline_ms
+        self.backoff_ms = backoff_ms
+        self.base_deviation = base_deviation
+        self.max_deviation = max(max_deviation, base_deviation)
+        self.recorder = recorder  # Optional ExecutionQualityRecorder, sees the final outcome of every order
+
+        self._states = {}
+        self._lock = threading.Lock()
+
+        # Tuning statistics
+        self.fill_latency = LatencyWindow()
+        self.attempt_counts = {}  # attempts needed -> number of orders
+        self.retcode_counts = {}
+        self.orders_sent = 0
+        self.orders_filled = 0
+        self.retries = 0
+
+    def _state(self, symbol):
+        """Get or create the execution state of a symbol"""
+        state = self._states.get(symbol)
+        if state is None:
+            with self._lock:
+                state = self._states.setdefault(symbol, SymbolExecutionState(self.base_deviation))
+        return state
+
+    def execute(self, symbol_info, build_request, tick=None, deadline=None):
+        """
+        Send an order, retrying recoverable failures until it fills or the deadline passes
+
+        Args:
+            symbol_info: Result of mt5.symbol_info() for the traded symbol
+            build_request (callable): Called as build_request(tick, deviation, filling) and
+                returns the order request dict priced from the given tick
+            tick (optional): Tick to price the first attempt from. Fetched if None.
+            deadline (float, optional): time.monotonic() value after which no attempt is sent,
+                e.g. the request deadline. Retries also stop after deadline_ms.
+
+        Returns:
+            tuple: (OrderSendResult or None, dict of execution details)
+        """
+        symbol = symbol_info.name
+        state = self._state(symbol)
+        candidates = filling_candidates(symbol_info)
+        if state.filling is None or state.filling not in candidates:
+            state.filling = candidates[0]
+        tried_fillings = set()
+
+        started = time.perf_counter()
+        retry_deadline = time.monotonic() + self.deadline_ms / 1000.0
+        deadline = retry_deadline if deadline is None else min(deadline, retry_deadline)
+
+        result = None
+        request = None
+        retcodes = []
+        attempt = 0
+        sent_at = returned_at = None
+        expired = False
+
+        while attempt < self.max_attempts:
+            if time.monotonic() >= deadline:
+                if attempt == 0:
+                    expired = True
+                    logger.warning(f"{symbol}: deadline passed before the order was sent")
+                else:
+                    logger.warning(f"{symbol}: retry deadline reached after {attempt} attempt(s)")
+                break
+
+            if tick is None:
+                tick = mt5.symbol_info_tick(symbol)
+                if tick is None:
+                    logger.error(f"{symbol}: failed to get tick for attempt {attempt + 1}")
+                    break
+
+            request = build_request(tick, state.deviation, state.filling)
+            attempt += 1
+            sent_at = time.time()
+            result = mt5.order_send(request)
+            returned_at = time.time()
+
+            if result is None:
+                logger.error(f"{symbol}: order_send returned None. Error: {mt5.last_error()}")
+                break
+
+            retcodes.append(result.retcode)
+            outcome = classify_retcode(result.retcode)
+
+            if outcome == SUCCESS:
+                self._record_fill(state, symbol_info, request, result)
+                break
+
+            if outcome == REFILL:
+                tried_fillings.add(state.filling)
+                remaining = [f for f in candidates if f not in tried_fillings]
+                if not remaining:
+                    logger.error(f"{symbol}: no supported filling mode left to try")
+                    break
+                logger.info(f"{symbol}: filling mode {state.filling} rejected, switching to {remaining[0]}")
+                state.filling = remaining[0]
+                continue
+
+            if outcome == REPRICE:
+                if result.retcode in (mt5.TRADE_RETCODE_REQUOTE, mt5.TRADE_RETCODE_PRICE_OFF,
+                                      mt5.TRADE_RETCODE_PRICE_CHANGED):
+                    self._widen_deviation(state)
+                logger.info(f"{symbol}: retcode {result.retcode} on attempt {attempt}, re-pricing")
+                tick = None
+                if self.backoff_ms > 0:
+                    pause = min(self.backoff_ms * attempt / 1000.0, max(deadline - time.monotonic(), 0))
+                    if pause > 0:
+                        time.sleep(pause)
+                continue
+
+            # Fatal retcode: retrying cannot help
+            break
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self._record_attempts(attempt, retcodes)
+
+        details = {
+            "attempts": attempt,
+            "retcodes": retcodes,
+            "latency_ms": round(elapsed_ms, 3),
+            "deviation": request["deviation"] if request else state.deviation,
+            "filling": request["type_filling"] if request else state.filling,
+            # Wall-clock time of the last order_send() call and its return (OrderSendResult has no timestamp)
+            "sent_at": sent_at,
+            "returned_at": returned_at,
+        }
+        if expired:
+            details["expired"] = True
+        if result is not None and classify_retcode(result.retcode) == SUCCESS:
+            self.fill_latency.add(elapsed_ms)
+        if self.recorder is not None:
+            self.recorder.record(symbol, request, result, elapsed_ms, symbol_info.point)
+        return result, details
+
+    def _widen_deviation(self, state):
+        """Allow more slippage after the market moved away from the requested price"""
+        state.requotes += 1
+        state.deviation = min(self.max_deviation, int(state.deviation * 1.5) + 1)
+
+    def _record_fill(self, state, symbol_info, request, result):
+        """Update the slippage estimate and let the deviation decay towards it"""
+        point = symbol_info.point or 0
+        requested = request.get("price") or 0
+        if point > 0 and requested and result.price:
+            slippage = abs(result.price - requested) / point
+            state.slippage_ewma += _SLIPPAGE_ALPHA * (slippage - state.slippage_ewma)
+        state.fills += 1
+
+        floor = max(self.base_deviation, int(math.ceil(state.slippage_ewma * 2)))
+        state.deviation = min(self.max_deviation, max(floor, int(state.deviation * 0.9)))
+
+    def _record_attempts(self, attempts, retcodes):
+        """Update the retry counters"""
+        with self._lock:
+            self.orders_sent += 1
+            if retcodes and classify_retcode(retcodes[-1]) == SUCCESS:
+                self.orders_filled += 1
+            self.retries += max(attempts - 1, 0)
+            self.attempt_counts[attempts] = self.attempt_counts.get(attempts, 0) + 1
+            for retcode in retcodes:
+                self.retcode_counts[retcode] = self.retcode_counts.get(retcode, 0) + 1
+
+    def get_stats(self):
+        """
+        Get retry and fill statistics
+
+        Returns:
+            dict: Counters, fill latency summary and the learned per-symbol settings
+        """
+        with self._lock:
+            symbols = {
+                symbol: {
+                    "filling": state.filling,
+                    "deviation": state.deviation,
+                    "slippage_ewma": round(state.slippage_ewma, 3),
+                    "fills": state.fills,
+                    "requotes": state.requotes,
+                }
+                for symbol, state in self._states.items()
+            }
+            return {
+                "orders_sent": self.orders_sent,
+                "orders_filled": self.orders_filled,
+                "retries": self.retries,
+                "attempts": {str(k): v for k, v in sorted(self.attempt_counts.items())},
+                "retcodes": {str(k): v for k, v in sorted(self.retcode_counts.items())},
+                "fill_latency_ms": self.fill_latency.summary(),
+                "symbols": symbols,
+            }
@@ -0,0 +1,236 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from .metrics import LatencyWindow
+from .config import ORDER_PIPELINE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Lanes in priority order: exits first, then stop changes, then new entries
+LANES = ('close', 'modify', 'open')
+_PRIORITY = {lane: i for i, lane in enumerate(LANES)}
+
+# Key of jobs that touch every symbol (e.g. modify-all); they run as a barrier
+BARRIER_KEY = '*'
+
+
+class OrderJob:
+    """
+    One unit of work queued in the order pipeline
+    """
+    __slots__ = ('lane', 'key', 'fn', 'args', 'kwargs', 'seq', 'epoch', 'enqueued_at',
+                 'started_at', 'result', 'error', '_done')
+
+    def __init__(self, lane, key, fn, args, kwargs, seq, epoch=0):
+        self.lane = lane
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.seq = seq
+        self.epoch = epoch  # Barriers submitted before this job
+        self.enqueued_at = time.perf_counter()
+        self.started_at = None
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the job to finish
+
+        Args:
+            timeout (float, optional): Seconds to wait. None waits forever.
+
+        Returns:
+            The return value of the job function
+
+        Raises:
+            TimeoutError: If the job did not finish in time
+            Exception: Whatever the job function raised
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("Order job did not finish in time")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _KeyQueue:
+    """FIFO of jobs for one symbol plus its scheduling state"""
+    __slots__ = ('jobs', 'busy', 'scheduled')
+
+    def __init__(self):
+        self.jobs = deque()
+        self.busy = False
+        self.scheduled = None  # Priority of the live heap entry, None if not in the heap
+
+
+class OrderPipeline:
+    """
+    Priority-laned order queue with per-symbol FIFO ordering
+
+    Jobs are grouped by key (the broker symbol). A symbol is scheduled with the priority of
+    the most urgent job waiting for it, so a queued close also pulls forward the trades of the
+    same symbol ahead of it instead of overtaking them. Across symbols, closes run before
+    modifications and modifications before new entries. At most one job per symbol runs at a time.
+
+    Jobs keyed BARRIER_KEY act on all symbols: such a job starts only after every job submitted
+    before it has finished, and jobs submitted after it wait until it is done.
+    """
+    def __init__(self, workers=ORDER_PIPELINE_WORKERS):
+        self._queues = {}  # key -> _KeyQueue
+        self._ready = []  # heap of (priority, seq, key)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._epoch = 0  # Barriers submitted
+        self._barriers_done = 0
+        self._pending = {}  # epoch -> unfinished non-barrier jobs
+
+        self._depth = {lane: 0 for lane in LANES}
+        self._processed = {lane: 0 for lane in LANES}
+        self._wait = {lane: LatencyWindow() for lane in LANES}
+        self._service = {lane: LatencyWindow() for lane in LANES}
+
+        self._workers = []
+        for i in range(max(1, workers)):
+            worker = threading.Thread(target=self._work, name=f"order-pipeline-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, lane, key, fn, *args, **kwargs):
+        """
+        Queue a job
+
+        Args:
+            lane (str): One of LANES
+            key (str): Ordering key, normally the broker symbol
+            fn (callable): Function to run on a pipeline worker
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            OrderJob: Handle to wait on
+        """
+        if lane not in _PRIORITY:
+            raise ValueError(f"Unknown lane: {lane}")
+        with self._lock:
+            job = OrderJob(lane, key, fn, args, kwargs, next(self._seq), self._epoch)
+            if key == BARRIER_KEY:
+                self._epoch += 1
+            else:
+                self._pending[job.epoch] = self._pending.get(job.epoch, 0) + 1
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = _KeyQueue()
+            queue.jobs.append(job)
+            self._depth[lane] += 1
+
+            priority = _PRIORITY[lane]
+            if not queue.busy and (queue.scheduled is None or priority < queue.scheduled):
+                self._schedule(key, queue, priority)
+        return job
+
+    def run(self, lane, key, fn, *args, **kwargs):
+        """
+        Queue a job and wait for its result
+
+        Returns:
+            The return value of fn
+        """
+        return self.submit(lane, key, fn, *args, **kwargs).wait()
+
+    def _schedule(self, key, queue, priority):
+        """Put a symbol in the ready heap (caller holds the lock)"""
+        queue.scheduled = priority
+        heapq.heappush(self._ready, (priority, next(self._seq), key))
+        self._available.notify()
+
+    def _wake(self, key):
+        """Schedule an idle symbol that has jobs waiting (caller holds the lock)"""
+        queue = self._queues.get(key)
+        if queue is not None and not queue.busy and queue.jobs and queue.scheduled is None:
+            self._schedule(key, queue, min(_PRIORITY[j.lane] for j in queue.jobs))
+
+    def _runnable(self, job):
+        """Whether the barriers allow a job to start (caller holds the lock)"""
+        if job.key == BARRIER_KEY:
+            return self._pending.get(job.epoch, 0) == 0
+        return job.epoch <= self._barriers_done
+
+    def _next_job(self):
+        """Block until a job can run and take it (caller holds the lock)"""
+        while True:
+            while not self._ready:
+                self._available.wait()
+            priority, _, key = heapq.heappop(self._ready)
+            queue = self._queues.get(key)
+            if queue is None or queue.busy or not queue.jobs or queue.scheduled != priority:
+                continue  # Stale heap entry
+            queue.scheduled = None
+            if not self._runnable(queue.jobs[0]):
+                continue  # Woken again when the blocking jobs finish
+            queue.busy = True
+            job = queue.jobs.popleft()
+            self._depth[job.lane] -= 1
+            return job
+
+    def _work(self):
+        """Worker loop"""
+        while True:
+            with self._lock:
+                job = self._next_job()
+
+            job.started_at = time.perf_counter()
+            self._wait[job.lane].add((job.started_at - job.enqueued_at) * 1000.0)
+            try:
+                job.result = job.fn(*job.args, **job.kwargs)
+            except Exception as e:
+                logger.error(f"Order job in lane {job.lane} for {job.key} failed: {str(e)}", exc_info=True)
+                job.error = e
+            self._service[job.lane].add((time.perf_counter() - job.started_at) * 1000.0)
+
+            with self._lock:
+                self._processed[job.lane] += 1
+                queue = self._queues[job.key]
+                queue.busy = False
+                if queue.jobs:
+                    self._schedule(job.key, queue, min(_PRIORITY[j.lane] for j in queue.jobs))
+                else:
+                    del self._queues[job.key]
+                if job.key == BARRIER_KEY:
+                    self._barriers_done += 1
+                    for key in list(self._queues):
+                        self._wake(key)
+                else:
+                    self._pending[job.epoch] -= 1
+                    if not self._pending[job.epoch]:
+                        del self._pending[job.epoch]
+                        self._wake(BARRIER_KEY)
+            job._done.set()
+
+    def get_stats(self):
+        """
+        Get per-lane queue statistics
+
+        Returns:
+            dict: Depth, processed count, queue wait and service time per lane
+        """
+        with self._lock:
+            depth = dict(self._depth)
+            processed = dict(self._processed)
+        return {
+            "workers": len(self._workers),
+            "lanes": {
+                lane: {
+                    "depth": depth[lane],
+                    "processed": processed[lane],
+                    "wait_ms": self._wait[lane].summary(),
+                    "service_ms": self._service[lane].summary(),
+                }
+                for lane in LANES
+            }
+        }
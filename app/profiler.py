@@ -0,0 +1,190 @@
+import cProfile
+import heapq
+import io
+import itertools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from .config import DEBUG_PROFILE_INTERVAL_MS, DEBUG_PROFILE_MAX_TRACES
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profiling window is requested while another one is running"""
+
+
+def _frame_name(code):
+    """Frame label used in collapsed stacks"""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _TradeTrace:
+    """cProfile data of one /trade request, collected on every thread that worked on it"""
+    __slots__ = ('started', 'profiles', '_lock')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.profiles = []
+        self._lock = threading.Lock()
+
+    def wrap(self, fn):
+        """
+        Wrap a function so that it runs under its own cProfile profile on the calling thread
+
+        Args:
+            fn (callable): Function to profile (e.g. the job submitted to the order pipeline)
+
+        Returns:
+            callable: Profiled function with the same signature
+        """
+        def traced(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler owns this thread/interpreter: run untraced
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    self.profiles.append(profile)
+        return traced
+
+
+class DebugProfiler:
+    """
+    On-demand wall-clock sampling profiler for all server threads
+
+    Nothing runs while no profiling window is open: the sampler is a loop on the thread
+    that requested the profile, and /trade only checks one attribute to see whether
+    trade tracing is on. During a window, the stack of every other thread is sampled every
+    DEBUG_PROFILE_INTERVAL_MS with sys._current_frames() and aggregated into collapsed
+    stacks (thread;outer;...;inner count), the input format of flamegraph.pl and speedscope.
+    Optionally, /trade requests in the window run under cProfile and the slowest ones above
+    a threshold are kept.
+    """
+    def __init__(self, interval_ms=DEBUG_PROFILE_INTERVAL_MS, max_traces=DEBUG_PROFILE_MAX_TRACES):
+        self.interval = interval_ms / 1000.0
+        self.max_traces = max_traces
+        self._busy = threading.Lock()
+        self._trace_threshold_ms = None  # Trade tracing is on while this is set
+        self._traces = []  # min-heap of (duration_ms, seq, path, stats text)
+        self._trace_seq = itertools.count()
+        self._traces_lock = threading.Lock()
+        self.windows = 0
+
+    def profile(self, seconds, trace_threshold_ms=None):
+        """
+        Sample all threads for a bounded window
+
+        Args:
+            seconds (float): Length of the window
+            trace_threshold_ms (float, optional): Also cProfile /trade requests and keep the
+                slowest ones that take at least this long. None disables trade tracing.
+
+        Returns:
+            dict: samples, collapsed stacks and slow trade traces
+
+        Raises:
+            ProfilerBusyError: If another window is running
+        """
+        if not self._busy.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            with self._traces_lock:
+                self._traces = []
+            self._trace_threshold_ms = trace_threshold_ms
+            stacks, samples = self._sample(seconds)
+        finally:
+            self._trace_threshold_ms = None
+            self.windows += 1
+            self._busy.release()
+
+        with self._traces_lock:
+            traces = sorted(self._traces, reverse=True)
+            self._traces = []
+        return {
+            "seconds": seconds,
+            "interval_ms": round(self.interval * 1000.0, 3),
+            "samples": samples,
+            "collapsed": '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common()),
+            "slow_trades": [
+                {"path": path, "duration_ms": round(duration, 3), "profile": text}
+                for duration, _, path, text in traces
+            ],
+        }
+
+    def _sample(self, seconds):
+        """Sampling loop run on the requesting thread"""
+        own = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[';'.join(reversed(labels))] += 1
+            samples += 1
+            time.sleep(self.interval)
+        return stacks, samples
+
+    def start_trade_trace(self):
+        """
+        Start tracing a /trade request if trade tracing is on
+
+        Returns:
+            _TradeTrace or None: Trace to wrap the request's work with, None when off
+        """
+        if self._trace_threshold_ms is None:
+            return None
+        return _TradeTrace()
+
+    def finish_trade_trace(self, trace, path):
+        """
+        Keep the trace of a finished request if it is among the slowest above the threshold
+
+        Args:
+            trace (_TradeTrace): Trace returned by start_trade_trace()
+            path (str): Request path
+        """
+        threshold = self._trace_threshold_ms
+        duration = (time.perf_counter() - trace.started) * 1000.0
+        if threshold is None or duration < threshold or not trace.profiles:
+            return
+        with self._traces_lock:
+            if len(self._traces) >= self.max_traces and duration <= self._traces[0][0]:
+                return
+
+        out = io.StringIO()
+        stats = pstats.Stats(trace.profiles[0], stream=out)
+        for profile in trace.profiles[1:]:
+            stats.add(profile)
+        stats.sort_stats('cumulative').print_stats(30)
+
+        entry = (duration, next(self._trace_seq), path, out.getvalue())
+        with self._traces_lock:
+            if len(self._traces) < self.max_traces:
+                heapq.heappush(self._traces, entry)
+            else:
+                heapq.heappushpop(self._traces, entry)
+
+    def get_stats(self):
+        """Profiler state for /metrics"""
+        return {
+            "running": self._busy.locked(),
+            "windows": self.windows,
+        }
@@ -1,9 +1,26 @@
+import atexit
+import hmac
+import json
 import logging
+import socket
 import threading
-from .mt5_handler import MT5Handler
+import time
+from .mt5_handler import MT5Handler, POSITION_SIDES
 from .utils import parse_tradingview_webhook
-from .config import FLASK_HOST, FLASK_PORT, DEBUG
-from flask import Flask, request, jsonify
+from .config import (
+    FLASK_HOST, FLASK_PORT, DEBUG,
+    SYMBOLS_PAGE_SIZE, SYMBOLS_MAX_PAGE_SIZE,
+    DEBUG_PROFILE_ENABLED, DEBUG_PROFILE_TOKEN, DEBUG_PROFILE_MAX_SECONDS,
+    EQUITY_RECORDER_ENABLED, ORDER_JOURNAL_ENABLED, FAILOVER_ENABLED, FAILOVER_NODE_ID
+)
+from .events import TOPICS
+from .profiler import DebugProfiler, ProfilerBusyError
+from .alert_latency import AlertLatencyTracker, parse_alert_time
+from .admission import AdmissionController
+from .journal import OrderJournal
+from .failover import FailoverManager
+from .order_pipeline import BARRIER_KEY
+from flask import Flask, Response, request, jsonify, stream_with_context
 
 logger = logging.getLogger(__name__)
 
@@ -23,22 +40,89 @@ def create_app(mt5_handler=None):
     if mt5_handler is None:
         mt5_handler = MT5Handler()
 
+    # Load the first account snapshot now so the first order does not wait for it
+    mt5_handler.account.start()
+
+    profiler = DebugProfiler()
+    # The profiler is never exposed without a token
+    profile_enabled = DEBUG_PROFILE_ENABLED and bool(DEBUG_PROFILE_TOKEN)
+    if DEBUG_PROFILE_ENABLED and not DEBUG_PROFILE_TOKEN:
+        logger.error("DEBUG_PROFILE_ENABLED is set without DEBUG_PROFILE_TOKEN, /debug/profile stays disabled")
+    alert_latency = AlertLatencyTracker()
+    admission = AdmissionController()
+    
+    # Order journal, and the lease that decides which instance trades when failover is enabled
+    node = FAILOVER_NODE_ID or f"{socket.gethostname()}:{FLASK_PORT}"
+    journal = OrderJournal(node=node) if ORDER_JOURNAL_ENABLED or FAILOVER_ENABLED else None
+    failover = FailoverManager(mt5_handler, journal, node)
+    
+    def on_role_change(active):
+        # Only the active instance trails stops and records the equity curve (a standby shares its files)
+        if active:
+            mt5_handler.trailing.resume()
+        else:
+            mt5_handler.trailing.clear()
+        if EQUITY_RECORDER_ENABLED:
+            if active:
+                mt5_handler.equity.start()
+            else:
+                mt5_handler.equity.stop()
+    failover.add_listener(on_role_change)
+    if failover.enabled:
+        failover.start()
+        atexit.register(failover.stop)
+    else:
+        on_role_change(True)
+    
+    @app.before_request
+    def reject_on_standby():
+        """A standby instance serves reads only; orders go to the active instance"""
+        if request.method == 'POST' and not failover.is_active():
+            return jsonify({"success": False, "message": f"Standby instance ({node}), not accepting orders",
+                            "role": "standby"}), 503
+
     @app.route('/symbols', methods=['GET'])
     def get_symbols():
         """Endpoint to get all available symbols"""
         try:
-            symbols = mt5_handler.list_available_symbols()
+            query = request.args.get('q', '')
+            fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+            cursor = request.args.get('cursor')
+            limit = None
+            if 'limit' in request.args:
+                try:
+                    limit = int(request.args['limit'])
+                except ValueError:
+                    limit = 0
+                if limit <= 0:
+                    return jsonify({"success": False, "message": "limit must be a positive integer"}), 400
             
-            # Filter by query if provided
-            query = request.args.get('q', '').upper()
-            if query:
-                symbols = [s for s in symbols if query in s.upper()]
+            # Unfiltered list: serve the pre-encoded response
+            if not (query or fields or cursor) and limit is None:
+                snapshot = mt5_handler.symbol_catalog.get()
+                if snapshot is None:
+                    return jsonify({"success": True, "count": 0, "symbols": []}), 200
+                if snapshot.etag in request.if_none_match:
+                    response = Response(status=304)
+                elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+                    response = Response(snapshot.body_gzip, mimetype='application/json')
+                    response.headers['Content-Encoding'] = 'gzip'
+                else:
+                    response = Response(snapshot.body, mimetype='application/json')
+                response.set_etag(snapshot.etag)
+                response.headers['Vary'] = 'Accept-Encoding'
+                return response
             
-            return jsonify({
-                "success": True,
-                "count": len(symbols),
-                "symbols": symbols
-            }), 200
+            # Filtered and/or paginated list
+            if (cursor or fields) and limit is None:
+                limit = SYMBOLS_PAGE_SIZE
+            if limit is not None:
+                limit = min(limit, SYMBOLS_MAX_PAGE_SIZE)
+            try:
+                result = mt5_handler.symbol_catalog.page(query=query, fields=fields, cursor=cursor, limit=limit)
+            except ValueError as e:
+                return jsonify({"success": False, "message": str(e)}), 400
+            return jsonify(result), 200
             
         except Exception as e:
             logger.error(f"Error getting symbols: {str(e)}", exc_info=True)
@@ -55,11 +139,26 @@ def create_app(mt5_handler=None):
             "endpoints": {
                 "/": "This information page (GET)",
                 "/trade": "Endpoint for TradingView alerts (POST)",
+                "/trade/<template>": "TradingView alerts parsed with a named alert template (POST)",
                 "/health": "Health check endpoint (GET)",
+                "/metrics": "Order execution statistics (GET)",
+                "/account": "Cached account snapshot with estimated equity (GET)",
+                "/equity?from=...&to=...&resolution=60": "Equity OHLC per time bucket from the recorded curve (GET)",
+                "/failover": "Active/standby role, lease and order journal state; 503 on a standby (GET)",
+                "/latency": "Stale-alert rejections and per-stage alert latency (GET)",
+                "/execution-quality?symbol=EURUSD": "Slippage and fill latency distributions per symbol (GET)",
                 "/positions": "List open positions (GET)",
+                "/positions/modify": "Move SL/TP of many positions (POST)",
                 "/position/<id>/close": "Close a specific position (POST)",
+                "/strategies": "Strategies with magic numbers and open position counts (GET)",
+                "/strategies/<id>/positions": "Open positions of a strategy (GET)",
+                "/strategies/<id>/close": "Close all positions of a strategy (POST)",
+                "/strategies/<id>/modify": "Move SL/TP of all positions of a strategy (POST)",
+                "/trailing": "Positions managed by the trailing-stop engine (GET)",
+                "/stream?topics=orders,positions,ticks&symbols=EURUSD": "Server-Sent Events stream (GET)",
                 "/symbols": "List available symbols (GET)",
-                "/symbols?q=EUR": "Search for symbols (GET)"
+                "/symbols?q=EUR": "Search for symbols (GET)",
+                "/symbols?fields=point,digits&limit=500&cursor=...": "Paginated symbols with selected fields (GET)"
             }
         })
 
@@ -72,47 +171,232 @@ def create_app(mt5_handler=None):
             "timestamp": str(import_datetime().now())
         })
 
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Endpoint exposing order execution statistics"""
+        try:
+            return jsonify({
+                "success": True,
+                "order_execution": mt5_handler.executor.get_stats(),
+                "order_pipeline": mt5_handler.pipeline.get_stats(),
+                "trailing": mt5_handler.trailing.get_status(),
+                "stream": mt5_handler.events.get_stats(),
+                "account": mt5_handler.account.get_stats(),
+                "equity": mt5_handler.equity.get_stats(),
+                "symbols": mt5_handler.symbols.get_stats(),
+                "profiler": profiler.get_stats(),
+                "alert_latency": alert_latency.get_stats(),
+                "admission": admission.get_stats(),
+                "failover": failover.get_status()
+            }), 200
+            
+        except Exception as e:
+            logger.error(f"Error getting metrics: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+    @app.route('/latency', methods=['GET'])
+    def get_latency():
+        """Endpoint summarizing alert age rejections and per-stage alert latency"""
+        try:
+            return jsonify({"success": True, **alert_latency.get_stats()}), 200
+            
+        except Exception as e:
+            logger.error(f"Error getting latency summary: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+    @app.route('/execution-quality', methods=['GET'])
+    def get_execution_quality():
+        """Endpoint with per-symbol slippage and fill latency distributions"""
+        try:
+            symbol = request.args.get('symbol')
+            if symbol:
+                symbol = mt5_handler.broker_symbol(symbol)
+            return jsonify({"success": True, **mt5_handler.execution_quality.summary(symbol)}), 200
+            
+        except Exception as e:
+            logger.error(f"Error getting execution quality: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+    @app.route('/account', methods=['GET'])
+    def get_account():
+        """Endpoint to get the cached account snapshot with estimated equity"""
+        try:
+            account = mt5_handler.account.get()
+            if account is None:
+                return jsonify({"success": False, "message": "Account information not available"}), 503
+            return jsonify({"success": True, "account": account}), 200
+            
+        except Exception as e:
+            logger.error(f"Error getting account: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+    @app.route('/equity', methods=['GET'])
+    def get_equity():
+        """Endpoint with the recorded equity curve downsampled to OHLC buckets"""
+        try:
+            try:
+                end = parse_alert_time(request.args['to']) if request.args.get('to') else time.time()
+                start = parse_alert_time(request.args['from']) if request.args.get('from') else end - 86400
+                resolution = request.args.get('resolution')
+                resolution = float(resolution) if resolution else None
+            except ValueError as e:
+                return jsonify({"success": False, "message": f"Invalid from/to/resolution: {str(e)}"}), 400
+            if end <= start:
+                return jsonify({"success": False, "message": "'to' must be after 'from'"}), 400
+            if resolution is not None and resolution <= 0:
+                return jsonify({"success": False, "message": "resolution must be positive"}), 400
+            return jsonify({"success": True, "from": start, "to": end,
+                            **mt5_handler.equity.query(start, end, resolution)}), 200
+            
+        except Exception as e:
+            logger.error(f"Error getting equity curve: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+    @app.route('/failover', methods=['GET'])
+    def get_failover():
+        """Endpoint with the failover role; a standby answers 503 so proxies route to the active instance"""
+        try:
+            status = failover.get_status()
+            return jsonify({"success": True, **status}), 200 if status['role'] == 'active' else 503
+            
+        except Exception as e:
+            logger.error(f"Error getting failover status: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
     @app.route('/trade', methods=['POST'])
-    def webhook():
+    @app.route('/trade/<template>', methods=['POST'])
+    def webhook(template=None):
         """Endpoint to receive TradingView alerts"""
+        # Shed load before doing any work when too many requests are in flight
+        if not admission.try_acquire():
+            logger.warning("Too many trade requests in flight, rejecting")
+            return jsonify({"success": False, "message": "Too many requests in flight"}), 429, {"Retry-After": "1"}
+        try:
+            # Only traced while a /debug/profile window with trade tracing is open
+            trace = profiler.start_trade_trace()
+            if trace is None:
+                return process_alert(template)
+            response = trace.wrap(process_alert)(template, trace)
+            profiler.finish_trade_trace(trace, request.path)
+            return response
+        finally:
+            admission.release()
+    
+    def process_alert(template, trace=None):
+        """Parse, size and execute the alert(s) of a /trade request"""
         if request.method == 'POST':
+            received_at = time.time()
+            admitted_at = time.monotonic()
+            admitted_perf = time.perf_counter()
             try:
                 # Log the request
                 logger.info(f"Received webhook request from {request.remote_addr}")
                 
-                # Get the JSON data from TradingView
-                if not request.is_json:
-                    logger.warning("Request is not JSON")
-                    return jsonify({"success": False, "message": "Request must be JSON"}), 400
-                
-                data = request.json
+                # TradingView sends JSON messages as JSON and anything else as plain text
+                data = read_alert_body()
+                if data is None:
+                    logger.warning("Request body is empty or invalid JSON")
+                    return jsonify({"success": False, "message": "Request must be JSON or a text alert"}), 400
                 logger.info(f"Received webhook data: {data}")
                 
+                # A JSON array is a basket of alerts, sized together and queued at once
+                basket = isinstance(data, list)
+                alerts = data if basket else [data]
+                
                 # Parse and validate the webhook data
                 try:
-                    trade_params = parse_tradingview_webhook(data)
+                    trades = [parse_tradingview_webhook(alert, template) for alert in alerts]
                 except ValueError as e:
                     logger.error(f"Invalid webhook data: {str(e)}")
                     return jsonify({"success": False, "message": str(e)}), 400
                 
-                # Place the trade
-                result = mt5_handler.place_trade(
-                    symbol=trade_params['symbol'],
-                    order_type=trade_params['side'],
-                    volume=trade_params['volume'],
-                    price=trade_params['price'],
-                    stop_loss=trade_params['stop_loss'],
-                    take_profit=trade_params['take_profit'],
-                    comment=trade_params['comment']
-                )
+                # Stale-signal guard, then risk-based volumes for all alerts in one pass
+                stale_errors = [alert_latency.check(t['alert_time'], received_at) for t in trades]
+                errors = [stale or sizing for stale, sizing in zip(stale_errors, mt5_handler.size_trades(trades))]
+                
+                # Queue the trades in the order pipeline (entries run after pending exits)
+                place_trade = mt5_handler.place_trade if trace is None else trace.wrap(mt5_handler.place_trade)
+                jobs = []
+                journaled = []
+                for trade_params, error in zip(trades, errors):
+                    if error is not None:
+                        jobs.append(None)
+                        journaled.append(None)
+                        continue
+                    # Journal the alert before it can reach the terminal, so a successor sees it in flight
+                    journaled.append(journal.append('alert', received_at=received_at, alert=trade_params)
+                                     if journal is not None else None)
+                    if trade_params['side'] == 'REVERSE':
+                        # Flips settle an open position, so they go to the exit lane
+                        reverse = mt5_handler.reverse_position if trace is None else trace.wrap(mt5_handler.reverse_position)
+                        jobs.append(mt5_handler.pipeline.submit(
+                            'close', mt5_handler.broker_symbol(trade_params['symbol']), reverse,
+                            symbol=trade_params['symbol'],
+                            volume=trade_params['volume'] if trade_params['risk_pct'] > 0 or trade_params['volume_set'] else None,
+                            stop_loss=trade_params['stop_loss'],
+                            take_profit=trade_params['take_profit'],
+                            comment=trade_params['comment'],
+                            trailing=trade_params['trailing'],
+                            strategy=trade_params['strategy'],
+                            deadline=admission.deadline(admitted_at, received_at, trade_params['alert_time'])
+                        ))
+                        continue
+                    jobs.append(mt5_handler.pipeline.submit(
+                        'open', mt5_handler.broker_symbol(trade_params['symbol']), place_trade,
+                        symbol=trade_params['symbol'],
+                        order_type=trade_params['side'],
+                        volume=trade_params['volume'],
+                        price=trade_params['price'],
+                        stop_loss=trade_params['stop_loss'],
+                        take_profit=trade_params['take_profit'],
+                        comment=trade_params['comment'],
+                        trailing=trade_params['trailing'],
+                        strategy=trade_params['strategy'],
+                        deadline=admission.deadline(admitted_at, received_at, trade_params['alert_time'])
+                    ))
+                results = [job.wait() if job is not None else {"success": False, "message": error}
+                           for job, error in zip(jobs, errors)]
+                for alert_seq, result in zip(journaled, results):
+                    if alert_seq is not None:
+                        details = result.get('details') or {}
+                        journal.append('result', alert_seq=alert_seq, success=result['success'],
+                                       message=result['message'], expired=bool(result.get('expired')),
+                                       order=details.get('order'), position=result.get('position'),
+                                       price=details.get('price'),
+                                       volume=details.get('volume'), retcode=details.get('retcode'))
+                
+                # Time from admission until a pipeline worker picked the alert up
+                for job in jobs:
+                    if job is not None:
+                        admission.queue_latency.add((job.started_at - admitted_perf) * 1000.0)
+                expired = [bool(r.get('expired')) for r in results]
+                for _ in range(sum(expired)):
+                    admission.record_expired()
+                
+                for trade_params, result in zip(trades, results):
+                    if result['success']:
+                        logger.info(f"Trade executed successfully: {result['message']}")
+                        alert_latency.record(trade_params['alert_time'], received_at, result.get('execution', {}))
+                    else:
+                        logger.error(f"Trade execution failed: {result['message']}")
                 
                 # Return the result
-                if result['success']:
-                    logger.info(f"Trade executed successfully: {result['message']}")
-                    return jsonify(result), 200
-                else:
-                    logger.error(f"Trade execution failed: {result['message']}")
-                    return jsonify(result), 500
+                if basket:
+                    success = all(r['success'] for r in results)
+                    return jsonify({
+                        "success": success,
+                        "message": f"{sum(r['success'] for r in results)} of {len(results)} trades executed",
+                        "results": results
+                    }), 200 if success else 500
+                
+                result = results[0]
+                if errors[0] is not None:
+                    # Rejected before reaching the terminal (stale or not sizeable)
+                    return jsonify(result), 400
+                if expired[0]:
+                    # Dropped unsent because it waited past its deadline
+                    return jsonify(result), 503
+                return jsonify(result), 200 if result['success'] else 500
             
             except Exception as e:
                 logger.error(f"Error processing webhook: {str(e)}", exc_info=True)
@@ -140,12 +424,168 @@ def create_app(mt5_handler=None):
             logger.error(f"Error getting positions: {str(e)}", exc_info=True)
             return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
     
+    @app.route('/positions/modify', methods=['POST'])
+    def modify_positions():
+        """Endpoint to move SL/TP of many positions at once"""
+        try:
+            if not request.is_json:
+                return jsonify({"success": False, "message": "Request must be JSON"}), 400
+            
+            data = request.json
+            if not isinstance(data, dict):
+                return jsonify({"success": False, "message": "Request must be a JSON object"}), 400
+            tickets = data.get('tickets')
+            filters = {key: data[key] for key in ('symbol', 'side', 'magic', 'comment') if key in data}
+            if 'side' in filters and str(filters['side']).upper() not in POSITION_SIDES:
+                return jsonify({"success": False,
+                                "message": f"Invalid side: {filters['side']}. Use BUY/LONG or SELL/SHORT"}), 400
+            if tickets is None and not filters and not data.get('all'):
+                return jsonify({"success": False,
+                                "message": "Specify tickets, a filter (symbol, side, magic, comment) or all=true"}), 400
+            
+            levels = read_sltp_levels(data)
+            
+            key = mt5_handler.broker_symbol(filters['symbol']) if 'symbol' in filters else BARRIER_KEY
+            result = mt5_handler.pipeline.run('modify', key, mt5_handler.modify_positions,
+                                              tickets=tickets, **filters, **levels)
+            status = 200 if result['success'] else 500
+            return jsonify(result), status
+            
+        except (TypeError, ValueError) as e:
+            return jsonify({"success": False, "message": f"Invalid request: {str(e)}"}), 400
+        except Exception as e:
+            logger.error(f"Error modifying positions: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+    
+    @app.route('/strategies', methods=['GET'])
+    def get_strategies():
+        """Endpoint to list strategies with their magic numbers and open position counts"""
+        try:
+            mt5_handler.account.get()  # Starts the snapshots that keep the index in sync
+            strategies = mt5_handler.strategies.get_status()
+            return jsonify({"success": True, "strategies": strategies, "count": len(strategies)}), 200
+            
+        except Exception as e:
+            logger.error(f"Error getting strategies: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+    
+    @app.route('/strategies/<strategy_id>/positions', methods=['GET'])
+    def get_strategy_positions(strategy_id):
+        """Endpoint to get the open positions of one strategy"""
+        try:
+            positions = mt5_handler.strategy_positions(strategy_id)
+            if positions is None:
+                return jsonify({"success": False, "message": f"Unknown strategy: {strategy_id}"}), 404
+            return jsonify({
+                "success": True,
+                "strategy": strategy_id,
+                "magic": mt5_handler.strategies.lookup(strategy_id),
+                "positions": positions,
+                "count": len(positions)
+            }), 200
+            
+        except Exception as e:
+            logger.error(f"Error getting strategy positions: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+    
+    @app.route('/strategies/<strategy_id>/close', methods=['POST'])
+    def close_strategy(strategy_id):
+        """Endpoint to close all open positions of one strategy"""
+        try:
+            positions = mt5_handler.strategy_positions(strategy_id)
+            if positions is None:
+                return jsonify({"success": False, "message": f"Unknown strategy: {strategy_id}"}), 404
+            tickets = {p['ticket']: p['symbol'] for p in positions}
+            
+            # All closes are queued at once; each runs in its symbol's order in the exit lane
+            jobs = [(ticket, mt5_handler.pipeline.submit('close', symbol, mt5_handler.close_position, ticket))
+                    for ticket, symbol in tickets.items()]
+            results = []
+            for ticket, job in jobs:
+                result = job.wait()
+                results.append({"ticket": ticket, "success": result['success'], "message": result['message']})
+            
+            failed = sum(1 for r in results if not r['success'])
+            logger.info(f"Closed {len(results) - failed} of {len(results)} positions of strategy {strategy_id}")
+            return jsonify({
+                "success": failed == 0,
+                "message": f"Closed {len(results) - failed} of {len(results)} positions",
+                "strategy": strategy_id,
+                "count": len(results),
+                "failed": failed,
+                "results": results
+            }), 200 if failed == 0 else 500
+            
+        except Exception as e:
+            logger.error(f"Error closing strategy positions: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+    
+    @app.route('/strategies/<strategy_id>/modify', methods=['POST'])
+    def modify_strategy(strategy_id):
+        """Endpoint to move SL/TP of all open positions of one strategy"""
+        try:
+            if not request.is_json:
+                return jsonify({"success": False, "message": "Request must be JSON"}), 400
+            
+            levels = read_sltp_levels(request.json)
+            positions = mt5_handler.strategy_positions(strategy_id)
+            if positions is None:
+                return jsonify({"success": False, "message": f"Unknown strategy: {strategy_id}"}), 404
+            tickets = {p['ticket']: p['symbol'] for p in positions}
+            symbols = set(tickets.values())
+            key = symbols.pop() if len(symbols) == 1 else BARRIER_KEY
+            result = mt5_handler.pipeline.run('modify', key, mt5_handler.modify_positions,
+                                              tickets=list(tickets), **levels)
+            result['strategy'] = strategy_id
+            return jsonify(result), 200 if result['success'] else 500
+            
+        except (TypeError, ValueError) as e:
+            return jsonify({"success": False, "message": f"Invalid request: {str(e)}"}), 400
+        except Exception as e:
+            logger.error(f"Error modifying strategy positions: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+    
+    @app.route('/stream', methods=['GET'])
+    def stream():
+        """Server-Sent Events stream of order results, position changes and ticks"""
+        topics = [t.strip() for t in request.args.get('topics', ','.join(TOPICS)).split(',') if t.strip()]
+        invalid = [t for t in topics if t not in TOPICS]
+        if invalid or not topics:
+            return jsonify({"success": False, "message": f"Invalid topics: {invalid}. Use {list(TOPICS)}"}), 400
+        
+        symbols = [s.strip() for s in request.args.get('symbols', '').split(',') if s.strip()]
+        if 'ticks' in topics and not symbols:
+            return jsonify({"success": False, "message": "The ticks topic needs a symbols parameter"}), 400
+        symbols = [mt5_handler.broker_symbol(s) for s in symbols]
+        
+        subscriber = mt5_handler.events.subscribe(topics, symbols)
+        if subscriber is None:
+            return jsonify({"success": False, "message": "Too many stream clients"}), 503
+        
+        return Response(
+            stream_with_context(mt5_handler.events.stream(subscriber)),
+            mimetype='text/event-stream',
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    @app.route('/trailing', methods=['GET'])
+    def get_trailing():
+        """Endpoint to list positions managed by the trailing-stop engine"""
+        try:
+            status = mt5_handler.trailing.get_status()
+            return jsonify({"success": True, **status}), 200
+            
+        except Exception as e:
+            logger.error(f"Error getting trailing status: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+    
     @app.route('/position/<int:position_id>/close', methods=['POST'])
     def close_position(position_id):
         """Endpoint to close a specific position"""
         try:
-            # Close the position
-            result = mt5_handler.close_position(position_id)
+            # Close the position in the exit lane, ordered after earlier orders of the same symbol
+            key = mt5_handler.position_symbol(position_id) or f"#{position_id}"
+            result = mt5_handler.pipeline.run('close', key, mt5_handler.close_position, position_id)
             
             # Return the result
             if result['success']:
@@ -159,6 +599,39 @@ def create_app(mt5_handler=None):
             logger.error(f"Error closing position: {str(e)}", exc_info=True)
             return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
     
+    @app.route('/debug/profile', methods=['GET'])
+    def debug_profile():
+        """Endpoint to sample all server threads for a bounded window (collapsed stacks)"""
+        # Disabled unless configured with a token, which is only accepted as a header
+        if not profile_enabled:
+            return jsonify({"success": False, "message": "Endpoint not found"}), 404
+        token = request.headers.get('X-Debug-Token', '')
+        if not hmac.compare_digest(token.encode('utf-8'), DEBUG_PROFILE_TOKEN.encode('utf-8')):
+            return jsonify({"success": False, "message": "Invalid debug token"}), 403
+        
+        try:
+            seconds = request.args.get('seconds', 5, type=float)
+            if seconds is None or not 0 < seconds <= DEBUG_PROFILE_MAX_SECONDS:
+                return jsonify({"success": False,
+                                "message": f"seconds must be between 0 and {DEBUG_PROFILE_MAX_SECONDS}"}), 400
+            threshold_ms = request.args.get('trade_threshold_ms', type=float)
+            fmt = request.args.get('format', 'collapsed')
+            if fmt not in ('collapsed', 'json'):
+                return jsonify({"success": False, "message": "format must be collapsed or json"}), 400
+            
+            logger.info(f"Profiling server threads for {seconds}s")
+            result = profiler.profile(seconds, trace_threshold_ms=threshold_ms)
+            
+            if fmt == 'collapsed':
+                return Response(result['collapsed'] + '\n', mimetype='text/plain')
+            return jsonify({"success": True, **result}), 200
+            
+        except ProfilerBusyError as e:
+            return jsonify({"success": False, "message": str(e)}), 409
+        except Exception as e:
+            logger.error(f"Error profiling: {str(e)}", exc_info=True)
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+    
     @app.errorhandler(404)
     def not_found(e):
         """Handle 404 errors"""
@@ -176,6 +649,58 @@ def create_app(mt5_handler=None):
     
     return app
 
+def read_sltp_levels(data):
+    """
+    Read the new SL/TP levels of a modify request
+    
+    Args:
+        data (dict): Request JSON with sl, tp, sl_points and/or tp_points
+        
+    Returns:
+        dict: Keyword arguments for MT5Handler.modify_positions()
+        
+    Raises:
+        ValueError: If the body is not an object, no level is given or absolute and point levels are mixed
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Request must be a JSON object")
+    levels = {}
+    for key, param in (('sl', 'stop_loss'), ('tp', 'take_profit'),
+                       ('sl_points', 'sl_points'), ('tp_points', 'tp_points')):
+        if data.get(key) is not None:
+            levels[param] = float(data[key])
+    if not levels:
+        raise ValueError("Specify sl, tp, sl_points or tp_points")
+    if 'stop_loss' in levels and 'sl_points' in levels or 'take_profit' in levels and 'tp_points' in levels:
+        raise ValueError("Use either absolute or point levels, not both")
+    return levels
+
+def read_alert_body():
+    """
+    Read a webhook body as a JSON object, a JSON array of objects (basket) or plain text
+    
+    Returns:
+        dict or list or str or None: Parsed JSON, the raw text, or None if the body is unusable
+    """
+    if request.is_json:
+        data = request.get_json(silent=True)
+    else:
+        text = request.get_data(as_text=True).strip()
+        if not text:
+            return None
+        if not text.startswith(('{', '[')):
+            return text
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+    
+    if isinstance(data, dict):
+        return data
+    if isinstance(data, list) and data and all(isinstance(item, dict) for item in data):
+        return data
+    return None
+
 def import_datetime():
     """Import datetime to avoid circular imports"""
     from datetime import datetime
@@ -0,0 +1,574 @@
+"""
+Simulated MetaTrader 5 terminal
+
+Implements the subset of the MetaTrader5 package API used by this application so the
+server, scripts and benchmarks can run on machines without a terminal (e.g. Linux).
+Prices follow a seeded random walk, orders fill instantly at the current price and
+SIM_LATENCY_MS adds a fixed delay to every call to mimic terminal IPC.
+SIM_STATE_FILE keeps balance and positions in a file shared by all processes using it, like
+several terminals logged in to the same account (Linux/macOS only).
+Select it with MT5_BACKEND=sim.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# Constants (same values as the MetaTrader5 package)
+TIMEFRAME_M1 = 1
+
+COPY_TICKS_ALL = -1
+COPY_TICKS_INFO = 1
+COPY_TICKS_TRADE = 2
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_PENDING = 5
+TRADE_ACTION_SLTP = 6
+TRADE_ACTION_MODIFY = 7
+TRADE_ACTION_REMOVE = 8
+TRADE_ACTION_CLOSE_BY = 10
+
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+ORDER_TIME_GTC = 0
+
+ACCOUNT_MARGIN_MODE_RETAIL_NETTING = 0
+ACCOUNT_MARGIN_MODE_EXCHANGE = 1
+ACCOUNT_MARGIN_MODE_RETAIL_HEDGING = 2
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_CANCEL = 10007
+TRADE_RETCODE_PLACED = 10008
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_DONE_PARTIAL = 10010
+TRADE_RETCODE_ERROR = 10011
+TRADE_RETCODE_TIMEOUT = 10012
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_PRICE = 10015
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_TRADE_DISABLED = 10017
+TRADE_RETCODE_MARKET_CLOSED = 10018
+TRADE_RETCODE_NO_MONEY = 10019
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+TRADE_RETCODE_INVALID_EXPIRATION = 10022
+TRADE_RETCODE_ORDER_CHANGED = 10023
+TRADE_RETCODE_TOO_MANY_REQUESTS = 10024
+TRADE_RETCODE_NO_CHANGES = 10025
+TRADE_RETCODE_LOCKED = 10028
+TRADE_RETCODE_FROZEN = 10029
+TRADE_RETCODE_INVALID_FILL = 10030
+TRADE_RETCODE_CONNECTION = 10031
+TRADE_RETCODE_POSITION_CLOSED = 10036
+TRADE_RETCODE_INVALID_CLOSE_VOLUME = 10038
+
+TerminalInfo = namedtuple('TerminalInfo', 'connected trade_allowed name company path ping_last')
+AccountInfo = namedtuple('AccountInfo', 'login trade_mode leverage margin_mode balance credit profit '
+                                        'equity margin margin_free margin_level currency server name company')
+SymbolInfo = namedtuple('SymbolInfo', 'name description path visible select digits point spread '
+                                      'trade_mode trade_stops_level filling_mode trade_contract_size '
+                                      'trade_tick_value trade_tick_size volume_min volume_max volume_step '
+                                      'currency_base currency_profit bid ask')
+Tick = namedtuple('Tick', 'time bid ask last volume time_msc flags volume_real')
+TradePosition = namedtuple('TradePosition', 'ticket time time_msc time_update time_update_msc type magic '
+                                            'identifier reason volume price_open sl tp price_current '
+                                            'swap profit symbol comment external_id')
+OrderSendResult = namedtuple('OrderSendResult', 'retcode deal order volume price bid ask comment '
+                                                'request_id retcode_external request')
+OrderCheckResult = namedtuple('OrderCheckResult', 'retcode balance equity profit margin margin_free '
+                                                  'margin_level comment request')
+
+# name, digits, start price, contract size, path
+_SYMBOLS = [
+    ("EURUSD", 5, 1.08500, 100000, "Forex\\Majors"),
+    ("GBPUSD", 5, 1.26500, 100000, "Forex\\Majors"),
+    ("USDJPY", 3, 151.500, 100000, "Forex\\Majors"),
+    ("AUDUSD", 5, 0.65500, 100000, "Forex\\Majors"),
+    ("USDCHF", 5, 0.90500, 100000, "Forex\\Majors"),
+    ("XAUUSD", 2, 2350.00, 100, "Metals"),
+    ("US500", 1, 5200.0, 1, "Indices"),
+    ("BTCUSD", 2, 65000.00, 1, "Crypto"),
+]
+
+_LATENCY = float(os.getenv('SIM_LATENCY_MS', 0)) / 1000.0
+_SUFFIX = os.getenv('SIM_SYMBOL_SUFFIX', '')
+_MARGIN_MODE = int(os.getenv('SIM_MARGIN_MODE', ACCOUNT_MARGIN_MODE_RETAIL_HEDGING))
+_SPREAD_POINTS = 10
+_STATE_FILE = os.getenv('SIM_STATE_FILE', '')
+
+_lock = threading.RLock()
+_state = {
+    "initialized": False,
+    "last_error": (1, "Success"),
+    "balance": float(os.getenv('SIM_BALANCE', 10000)),
+    "login": 0,
+    "server": "Simulated-Server",
+    "positions": {},
+    "next_ticket": 1000000,
+    "prices": {},
+    "last_update": {},
+}
+_random = random.Random(int(os.getenv('SIM_SEED', 42)))
+
+
+def _ipc():
+    """Mimic the round trip to the terminal"""
+    if _LATENCY > 0:
+        time.sleep(_LATENCY)
+
+
+@contextmanager
+def _account(write=False):
+    """
+    Hold the account state, loaded from SIM_STATE_FILE when set
+
+    The file is locked for the duration, so processes sharing it see one consistent account.
+    """
+    with _lock:
+        if not _STATE_FILE:
+            yield
+            return
+        import fcntl
+        with open(_STATE_FILE, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if write else fcntl.LOCK_SH)
+            f.seek(0)
+            text = f.read()
+            if text:
+                shared = json.loads(text)
+                _state["balance"] = shared["balance"]
+                _state["next_ticket"] = shared["next_ticket"]
+                _state["positions"] = {p[0]: TradePosition(*p) for p in shared["positions"]}
+            yield
+            if write:
+                f.seek(0)
+                f.truncate()
+                json.dump({"balance": _state["balance"], "next_ticket": _state["next_ticket"],
+                           "positions": list(_state["positions"].values())}, f)
+                f.flush()
+
+
+def _symbol_spec(name):
+    """Find the static definition of a (suffixed) symbol"""
+    for spec in _SYMBOLS:
+        if spec[0] + _SUFFIX == name:
+            return spec
+    return None
+
+
+def _mid(name):
+    """Advance the random walk of a symbol to now and return its mid price"""
+    spec = _symbol_spec(name)
+    now = time.time()
+    with _lock:
+        price = _state["prices"].get(name, spec[2])
+        last = _state["last_update"].get(name, now)
+        steps = min(int((now - last) * 10), 50)
+        point = 10 ** -spec[1]
+        for _ in range(steps):
+            price += _random.choice((-1, 0, 1)) * 3 * point
+        _state["prices"][name] = round(price, spec[1])
+        if steps or name not in _state["last_update"]:
+            _state["last_update"][name] = now
+        return _state["prices"][name]
+
+
+def _quote(name):
+    """Current bid and ask of a symbol"""
+    spec = _symbol_spec(name)
+    mid = _mid(name)
+    half = _SPREAD_POINTS / 2 * 10 ** -spec[1]
+    return round(mid - half, spec[1]), round(mid + half, spec[1])
+
+
+def _fail(code, message):
+    """Record an API error and return None like the real package"""
+    _state["last_error"] = (code, message)
+    return None
+
+
+def initialize(path=None, **kwargs):
+    _ipc()
+    _state["initialized"] = True
+    return True
+
+
+def login(login, password=None, server=None, **kwargs):
+    _ipc()
+    _state["login"] = login
+    if server:
+        _state["server"] = server
+    return _state["initialized"]
+
+
+def shutdown():
+    _state["initialized"] = False
+    return True
+
+
+def last_error():
+    return _state["last_error"]
+
+
+def terminal_info():
+    _ipc()
+    if not _state["initialized"]:
+        return _fail(-10004, "No IPC connection")
+    return TerminalInfo(True, True, "Simulated Terminal", "Simulated", "", 0)
+
+
+def account_info():
+    _ipc()
+    if not _state["initialized"]:
+        return _fail(-10004, "No IPC connection")
+    with _account():
+        profit = sum(_profit(p) for p in _state["positions"].values())
+        margin = sum(_margin(p) for p in _state["positions"].values())
+        balance = _state["balance"]
+    equity = balance + profit
+    return AccountInfo(_state["login"], 0, 100, _MARGIN_MODE, round(balance, 2), 0.0, round(profit, 2),
+                       round(equity, 2), round(margin, 2), round(equity - margin, 2),
+                       round(equity / margin * 100, 2) if margin else 0.0,
+                       "USD", _state["server"], "Simulated Account", "Simulated")
+
+
+def symbols_total():
+    _ipc()
+    return len(_SYMBOLS)
+
+
+def symbols_get(group=None):
+    _ipc()
+    return tuple(_symbol_info(spec[0] + _SUFFIX) for spec in _SYMBOLS)
+
+
+def _symbol_info(name):
+    spec = _symbol_spec(name)
+    if spec is None:
+        return None
+    bid, ask = _quote(name)
+    point = 10 ** -spec[1]
+    # 1 lot moving one point is worth contract_size * point in the quote currency (USD for all but USDxxx)
+    tick_value = spec[3] * point
+    if name.startswith("USD") and spec[4].startswith("Forex"):
+        tick_value = tick_value / bid
+    return SymbolInfo(name, spec[0], spec[4] + "\\" + spec[0], True, True, spec[1], point, _SPREAD_POINTS,
+                      4, 0, 3, spec[3], tick_value, point, 0.01, 100.0, 0.01,
+                      spec[0][:3], spec[0][3:6] if spec[4].startswith("Forex") else "USD", bid, ask)
+
+
+def symbol_info(symbol):
+    _ipc()
+    info = _symbol_info(symbol)
+    if info is None:
+        return _fail(-1, "Symbol not found")
+    return info
+
+
+def symbol_select(symbol, enable=True):
+    _ipc()
+    return _symbol_spec(symbol) is not None
+
+
+def symbol_info_tick(symbol):
+    _ipc()
+    if _symbol_spec(symbol) is None:
+        return _fail(-1, "Symbol not found")
+    bid, ask = _quote(symbol)
+    now = time.time()
+    msc = int(_state["last_update"].get(symbol, now) * 1000)
+    return Tick(int(now), bid, ask, 0.0, 0, msc, 6, 0.0)
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    _ipc()
+    import numpy as np
+    spec = _symbol_spec(symbol)
+    if spec is None:
+        return _fail(-1, "Symbol not found")
+    dtype = [('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+             ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')]
+    now = int(time.time()) // 60 * 60
+    mid = _mid(symbol)
+    rates = np.zeros(count, dtype=dtype)
+    for i in range(count):
+        rates[i] = (now - (start_pos + count - 1 - i) * 60, mid, mid, mid, mid, 0, _SPREAD_POINTS, 0)
+    return rates
+
+
+_TICK_DTYPE = [('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+               ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8')]
+_HISTORY_EPOCH_DAY = 18262  # 2020-01-01
+_HISTORY_TICK_MS = 500  # Average tick interval of the generated history
+
+
+def _history_day(name, day):
+    """
+    Generated ticks of one UTC day (days since 1970-01-01)
+
+    The ticks only depend on the symbol and the day, so every call returns the same history.
+    """
+    import numpy as np
+    import zlib
+    spec = _symbol_spec(name)
+    point = 10 ** -spec[1]
+    seed = zlib.crc32(spec[0].encode())
+    # Day open: a daily random walk from the start price
+    daily = np.random.default_rng(seed).normal(0.0, 0.004, max(day - _HISTORY_EPOCH_DAY, 0) + 1)
+    open_price = spec[2] * float(np.exp(daily.sum()))
+    rng = np.random.default_rng([seed, day])
+    count = 86400 * 1000 // _HISTORY_TICK_MS
+    time_msc = day * 86400000 + np.arange(count, dtype=np.int64) * _HISTORY_TICK_MS \
+        + rng.integers(0, _HISTORY_TICK_MS, count)
+    mid = open_price + np.cumsum(rng.normal(0.0, 1.5, count)) * point
+    half = _SPREAD_POINTS / 2 * point
+    ticks = np.zeros(count, dtype=_TICK_DTYPE)
+    ticks['time_msc'] = time_msc
+    ticks['time'] = time_msc // 1000
+    ticks['bid'] = np.round(mid - half, spec[1])
+    ticks['ask'] = np.round(mid + half, spec[1])
+    ticks['flags'] = 6  # TICK_FLAG_BID | TICK_FLAG_ASK
+    return ticks
+
+
+def _epoch(value):
+    """Epoch seconds of a datetime (naive means UTC, as in the MetaTrader5 package) or a number"""
+    from datetime import datetime, timezone
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+    return float(value)
+
+
+def copy_ticks_range(symbol, date_from, date_to, flags=COPY_TICKS_ALL):
+    _ipc()
+    import numpy as np
+    if _symbol_spec(symbol) is None:
+        return _fail(-1, "Symbol not found")
+    start_ms = int(_epoch(date_from) * 1000)
+    end_ms = int(min(_epoch(date_to), time.time()) * 1000)
+    if end_ms < start_ms:
+        return np.zeros(0, dtype=_TICK_DTYPE)
+    days = [_history_day(symbol, day) for day in range(start_ms // 86400000, end_ms // 86400000 + 1)]
+    ticks = np.concatenate(days)
+    lo, hi = np.searchsorted(ticks['time_msc'], [start_ms, end_ms], side='left')
+    return ticks[lo:hi]
+
+
+def _profit(position):
+    spec = _symbol_spec(position.symbol)
+    bid, ask = _quote(position.symbol)
+    info = _symbol_info(position.symbol)
+    if position.type == POSITION_TYPE_BUY:
+        diff = bid - position.price_open
+    else:
+        diff = position.price_open - ask
+    return diff / info.trade_tick_size * info.trade_tick_value * position.volume if spec else 0.0
+
+
+def _margin(position):
+    info = _symbol_info(position.symbol)
+    return position.volume * info.trade_contract_size * position.price_open / 100.0 \
+        if not position.symbol.startswith("USD") else position.volume * info.trade_contract_size / 100.0
+
+
+def _current(position):
+    """Position record with current price and floating profit"""
+    bid, ask = _quote(position.symbol)
+    price = bid if position.type == POSITION_TYPE_BUY else ask
+    return position._replace(price_current=price, profit=round(_profit(position), 2))
+
+
+def positions_total():
+    _ipc()
+    with _account():
+        return len(_state["positions"])
+
+
+def positions_get(symbol=None, group=None, ticket=None):
+    _ipc()
+    with _account():
+        positions = list(_state["positions"].values())
+    if ticket is not None:
+        positions = [p for p in positions if p.ticket == ticket]
+    elif symbol is not None:
+        positions = [p for p in positions if p.symbol == symbol]
+    return tuple(_current(p) for p in positions)
+
+
+def order_check(request):
+    _ipc()
+    account = account_info()
+    retcode, _, _ = _validate(request)
+    return OrderCheckResult(0 if retcode is None else retcode, account.balance, account.equity,
+                            account.profit, account.margin, account.margin_free, account.margin_level,
+                            "Done" if retcode is None else "Rejected", request)
+
+
+def _validate(request):
+    """Check a deal request, returning (error retcode or None, bid, ask)"""
+    symbol = request.get("symbol")
+    if _symbol_spec(symbol) is None:
+        return TRADE_RETCODE_INVALID, 0.0, 0.0
+    bid, ask = _quote(symbol)
+    if request.get("action") != TRADE_ACTION_DEAL:
+        return None, bid, ask
+    if request.get("type_filling", ORDER_FILLING_FOK) not in (ORDER_FILLING_FOK, ORDER_FILLING_IOC):
+        return TRADE_RETCODE_INVALID_FILL, bid, ask
+    volume = request.get("volume", 0)
+    if volume < 0.01 or volume > 100:
+        return TRADE_RETCODE_INVALID_VOLUME, bid, ask
+    market = ask if request.get("type") == ORDER_TYPE_BUY else bid
+    point = 10 ** -_symbol_spec(symbol)[1]
+    if request.get("price") and abs(market - request["price"]) > request.get("deviation", 0) * point + 1e-12:
+        return TRADE_RETCODE_REQUOTE, bid, ask
+    return None, bid, ask
+
+
+def _result(retcode, request, bid=0.0, ask=0.0, deal=0, order=0, volume=0.0, price=0.0, comment=""):
+    return OrderSendResult(retcode, deal, order, volume, price, bid, ask, comment or "Request executed",
+                           0, 0, request)
+
+
+def order_send(request):
+    _ipc()
+    if not _state["initialized"]:
+        return _fail(-10004, "No IPC connection")
+
+    action = request.get("action")
+    if action == TRADE_ACTION_SLTP:
+        return _modify(request)
+    if action == TRADE_ACTION_CLOSE_BY:
+        return _close_by(request)
+    if action != TRADE_ACTION_DEAL:
+        return _result(TRADE_RETCODE_INVALID, request, comment="Unsupported action")
+
+    retcode, bid, ask = _validate(request)
+    if retcode is not None:
+        return _result(retcode, request, bid, ask)
+
+    with _account(write=True):
+        ticket = _state["next_ticket"]
+        _state["next_ticket"] += 1
+        price = ask if request["type"] == ORDER_TYPE_BUY else bid
+        if request.get("position"):
+            return _close(request, ticket, price, bid, ask)
+        return _open(request, ticket, price, bid, ask)
+
+
+def _open(request, ticket, price, bid, ask):
+    """Open a position, or net it against an existing one on netting accounts (lock held)"""
+    symbol = request["symbol"]
+    side = POSITION_TYPE_BUY if request["type"] == ORDER_TYPE_BUY else POSITION_TYPE_SELL
+    volume = round(float(request["volume"]), 2)
+
+    if _MARGIN_MODE != ACCOUNT_MARGIN_MODE_RETAIL_HEDGING:
+        existing = next((p for p in _state["positions"].values() if p.symbol == symbol), None)
+        if existing is not None:
+            return _net(request, existing, side, volume, ticket, price, bid, ask)
+
+    now = time.time()
+    _state["positions"][ticket] = TradePosition(
+        ticket, int(now), int(now * 1000), int(now), int(now * 1000), side, request.get("magic", 0),
+        ticket, 3, volume, price, request.get("sl", 0.0) or 0.0, request.get("tp", 0.0) or 0.0,
+        price, 0.0, 0.0, symbol, request.get("comment", ""), "")
+    return _result(TRADE_RETCODE_DONE, request, bid, ask, deal=ticket, order=ticket, volume=volume, price=price)
+
+
+def _net(request, existing, side, volume, ticket, price, bid, ask):
+    """Apply a deal to the single netting position of a symbol (lock held)"""
+    if existing.type == side:
+        total = round(existing.volume + volume, 2)
+        average = (existing.price_open * existing.volume + price * volume) / total
+        _state["positions"][existing.ticket] = existing._replace(volume=total, price_open=average)
+    else:
+        _realize(existing, min(volume, existing.volume), price)
+        remaining = round(volume - existing.volume, 2)
+        if remaining < 0:
+            _state["positions"][existing.ticket] = existing._replace(volume=round(-remaining, 2))
+        elif remaining == 0:
+            del _state["positions"][existing.ticket]
+        else:
+            # The deal reverses the position: the remainder keeps the position id
+            _state["positions"][existing.ticket] = existing._replace(
+                type=side, volume=remaining, price_open=price,
+                sl=request.get("sl", 0.0) or 0.0, tp=request.get("tp", 0.0) or 0.0)
+    return _result(TRADE_RETCODE_DONE, request, bid, ask, deal=ticket, order=ticket, volume=volume, price=price)
+
+
+def _realize(position, volume, price):
+    """Book the profit of closing part of a position into the balance (lock held)"""
+    info = _symbol_info(position.symbol)
+    diff = price - position.price_open if position.type == POSITION_TYPE_BUY else position.price_open - price
+    _state["balance"] += diff / info.trade_tick_size * info.trade_tick_value * volume
+
+
+def _close(request, ticket, price, bid, ask):
+    """Close (part of) a position by ticket (lock held)"""
+    position = _state["positions"].get(request["position"])
+    if position is None:
+        return _result(TRADE_RETCODE_POSITION_CLOSED, request, bid, ask)
+    volume = round(float(request["volume"]), 2)
+    if volume > position.volume:
+        return _result(TRADE_RETCODE_INVALID_CLOSE_VOLUME, request, bid, ask)
+    _realize(position, volume, price)
+    if volume < position.volume:
+        _state["positions"][position.ticket] = position._replace(volume=round(position.volume - volume, 2))
+    else:
+        del _state["positions"][position.ticket]
+    return _result(TRADE_RETCODE_DONE, request, bid, ask, deal=ticket, order=ticket, volume=volume, price=price)
+
+
+def _close_by(request):
+    """Close a position by an opposite one of the same symbol (hedging accounts only)"""
+    with _account(write=True):
+        position = _state["positions"].get(request.get("position"))
+        opposite = _state["positions"].get(request.get("position_by"))
+        if position is None or opposite is None:
+            return _result(TRADE_RETCODE_POSITION_CLOSED, request)
+        if (_MARGIN_MODE != ACCOUNT_MARGIN_MODE_RETAIL_HEDGING or position.symbol != opposite.symbol
+                or position.type == opposite.type):
+            return _result(TRADE_RETCODE_INVALID, request, comment="Invalid close by")
+
+        # The position is closed at the open price of the opposite one; the overlap cancels out
+        volume = min(position.volume, opposite.volume)
+        _realize(position, volume, opposite.price_open)
+        for p in (position, opposite):
+            if p.volume > volume:
+                _state["positions"][p.ticket] = p._replace(volume=round(p.volume - volume, 2))
+            else:
+                del _state["positions"][p.ticket]
+        ticket = _state["next_ticket"]
+        _state["next_ticket"] += 1
+        bid, ask = _quote(position.symbol)
+        return _result(TRADE_RETCODE_DONE, request, bid, ask, deal=ticket, order=ticket, volume=volume,
+                       price=opposite.price_open)
+
+
+def _modify(request):
+    """Change SL/TP of a position"""
+    with _account(write=True):
+        position = _state["positions"].get(request.get("position"))
+        if position is None:
+            return _result(TRADE_RETCODE_POSITION_CLOSED, request)
+        sl = request.get("sl", 0.0) or 0.0
+        tp = request.get("tp", 0.0) or 0.0
+        if sl == position.sl and tp == position.tp:
+            return _result(TRADE_RETCODE_NO_CHANGES, request)
+        bid, ask = _quote(position.symbol)
+        price = bid if position.type == POSITION_TYPE_BUY else ask
+        long = position.type == POSITION_TYPE_BUY
+        if (sl and (sl >= price if long else sl <= price)) or (tp and (tp <= price if long else tp >= price)):
+            return _result(TRADE_RETCODE_INVALID_STOPS, request, bid, ask)
+        _state["positions"][position.ticket] = position._replace(sl=sl, tp=tp)
+        return _result(TRADE_RETCODE_DONE, request, bid, ask)
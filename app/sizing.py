@@ -0,0 +1,49 @@
+import numpy as np
+
+
+def risk_volumes(equity, risk_pct, stop_points, point, tick_value, tick_size,
+                 volume_step, volume_min, volume_max):
+    """
+    Lot sizes that risk a percentage of equity between entry and stop loss
+
+    All arguments after equity are arrays (or scalars) with one element per alert, so a basket
+    of alerts is sized in one vectorized pass. Volumes are rounded down to the volume step so
+    the risk is never exceeded, and capped at volume_max.
+
+    Args:
+        equity (float): Account equity
+        risk_pct: Percentage of equity to risk per alert
+        stop_points: Stop loss distance in points
+        point: Symbol point size
+        tick_value: Value of one tick for one lot (trade_tick_value)
+        tick_size: Price change of one tick (trade_tick_size)
+        volume_step: Volume step of the symbol
+        volume_min: Minimum volume of the symbol
+        volume_max: Maximum volume of the symbol
+
+    Returns:
+        numpy.ndarray: Volumes; 0 where the risk is too small for the minimum volume
+            or the inputs are invalid
+    """
+    risk_pct = np.asarray(risk_pct, dtype=float)
+    stop_points = np.asarray(stop_points, dtype=float)
+    point = np.asarray(point, dtype=float)
+    tick_value = np.asarray(tick_value, dtype=float)
+    tick_size = np.asarray(tick_size, dtype=float)
+    volume_step = np.asarray(volume_step, dtype=float)
+    volume_min = np.asarray(volume_min, dtype=float)
+    volume_max = np.asarray(volume_max, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk_money = equity * risk_pct / 100.0
+        loss_per_lot = stop_points * point / tick_size * tick_value
+        raw = risk_money / loss_per_lot
+        # Round down to the step; the epsilon keeps exact multiples from dropping a step
+        steps = np.floor(raw / volume_step + 1e-9)
+        volumes = np.minimum(steps * volume_step, volume_max)
+
+    valid = np.isfinite(volumes) & (loss_per_lot > 0) & (volumes >= volume_min - 1e-12)
+    volumes = np.where(valid, volumes, 0.0)
+
+    # Trim float noise of the step multiplication (e.g. 0.30000000000000004)
+    return np.round(volumes, 8)
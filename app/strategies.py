@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from .config import MT5_MAGIC, STRATEGY_MAGIC_BASE, STRATEGY_MAGIC_RANGE, STRATEGIES_FILE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STRATEGY = 'default'
+
+
+class StrategyIndex:
+    """
+    Strategy id <-> magic number mapping and an index of open tickets per magic number
+
+    A strategy's magic number comes from STRATEGIES_FILE when listed there, otherwise it is
+    derived from a CRC32 of the id, so the mapping is the same after a restart and positions
+    opened before it are found again by magic number. The ticket index is updated right away
+    from order results and reconciled with every account positions snapshot.
+    """
+    def __init__(self, magics=None, base=STRATEGY_MAGIC_BASE, magic_range=STRATEGY_MAGIC_RANGE):
+        self.base = base
+        self.magic_range = magic_range
+        self._magics = {}  # strategy id -> magic
+        self._strategies = {}  # magic -> strategy id
+        self._tickets = {}  # magic -> {ticket: symbol}
+        self._ticket_magic = {}  # ticket -> magic
+        self._changed = {}  # ticket -> time of the last order result that touched it
+        self._lock = threading.Lock()
+        # Alerts without a strategy id trade under the 'default' strategy and MT5_MAGIC
+        for strategy_id, magic in {DEFAULT_STRATEGY: MT5_MAGIC, **(magics or {})}.items():
+            self._register(str(strategy_id), int(magic))
+
+    @classmethod
+    def from_file(cls, path=STRATEGIES_FILE):
+        """
+        Load fixed strategy magic numbers from a JSON file ({"strategy id": magic})
+
+        Args:
+            path (str): Path of the strategies file. A missing file yields derived magics only.
+
+        Returns:
+            StrategyIndex: Index with the configured strategies
+        """
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            magics = json.load(f)
+        logger.info(f"Loaded {len(magics)} strategy magic numbers from {path}")
+        return cls(magics)
+
+    def _register(self, strategy_id, magic):
+        """Add a strategy id -> magic mapping"""
+        other = self._strategies.get(magic)
+        if other is not None and other != strategy_id:
+            logger.warning(f"Strategies {other} and {strategy_id} share magic number {magic}")
+        self._magics[strategy_id] = magic
+        self._strategies.setdefault(magic, strategy_id)
+
+    def magic(self, strategy_id):
+        """
+        Get the magic number of a strategy, registering the strategy on first use
+
+        Only the order paths call this; reads use lookup() so that querying an id does not
+        create a strategy.
+
+        Args:
+            strategy_id (str): Strategy id from the alert
+
+        Returns:
+            int: Magic number
+        """
+        magic = self._magics.get(strategy_id)
+        if magic is None:
+            magic = self._derive(strategy_id)
+            with self._lock:
+                self._register(strategy_id, magic)
+        return magic
+
+    def lookup(self, strategy_id):
+        """
+        Get the magic number of a strategy without registering it
+
+        Args:
+            strategy_id (str): Strategy id
+
+        Returns:
+            int: Configured or derived magic number
+        """
+        magic = self._magics.get(strategy_id)
+        return self._derive(strategy_id) if magic is None else magic
+
+    def known(self, strategy_id):
+        """Whether a strategy is configured or has placed orders since the start"""
+        return strategy_id in self._magics
+
+    def _derive(self, strategy_id):
+        """Magic number derived from the strategy id"""
+        return self.base + zlib.crc32(strategy_id.encode('utf-8')) % self.magic_range
+
+    def strategy(self, magic):
+        """Strategy id of a magic number, or None if unknown"""
+        return self._strategies.get(magic)
+
+    def add(self, magic, ticket, symbol):
+        """Index a position opened by an order"""
+        with self._lock:
+            self._ticket_magic[ticket] = magic
+            self._tickets.setdefault(magic, {})[ticket] = symbol
+            self._changed[ticket] = time.time()
+
+    def remove(self, ticket):
+        """Drop a closed position from the index"""
+        with self._lock:
+            self._drop(ticket)
+            self._changed[ticket] = time.time()
+
+    def _drop(self, ticket):
+        """Remove a ticket from the index (caller holds the lock)"""
+        magic = self._ticket_magic.pop(ticket, None)
+        if magic is None:
+            return
+        tickets = self._tickets.get(magic)
+        if tickets is not None:
+            tickets.pop(ticket, None)
+            if not tickets:
+                del self._tickets[magic]
+
+    def sync(self, positions, taken_at):
+        """
+        Reconcile the index with a positions snapshot
+
+        Tickets changed by an order result after the snapshot was taken keep their state.
+
+        Args:
+            positions (iterable): Position records from mt5.positions_get()
+            taken_at (float): time.time() just before the snapshot was requested
+        """
+        current = {p.ticket: p for p in positions}
+        with self._lock:
+            for ticket in list(self._ticket_magic):
+                if ticket not in current and self._changed.get(ticket, 0.0) <= taken_at:
+                    self._drop(ticket)
+            for ticket, position in current.items():
+                if ticket in self._ticket_magic or self._changed.get(ticket, 0.0) > taken_at:
+                    continue
+                self._ticket_magic[ticket] = position.magic
+                self._tickets.setdefault(position.magic, {})[ticket] = position.symbol
+            self._changed = {t: at for t, at in self._changed.items() if at > taken_at}
+
+    def tickets(self, strategy_id):
+        """
+        Open tickets of a strategy
+
+        Args:
+            strategy_id (str): Strategy id
+
+        Returns:
+            dict: ticket -> broker symbol
+        """
+        magic = self.lookup(strategy_id)
+        with self._lock:
+            return dict(self._tickets.get(magic, {}))
+
+    def get_status(self):
+        """
+        List known strategies with their magic number and open position count
+
+        Returns:
+            list: One entry per strategy id or indexed magic number
+        """
+        with self._lock:
+            magics = set(self._tickets) | set(self._strategies)
+            return [
+                {
+                    "strategy": self._strategies.get(magic),
+                    "magic": magic,
+                    "positions": len(self._tickets.get(magic, {}))
+                }
+                for magic in sorted(magics)
+            ]
@@ -0,0 +1,181 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from .backend import mt5
+from .config import SYMBOLS_CHECK_SECONDS, SYMBOLS_REBUILD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolCatalogSnapshot:
+    """
+    Immutable view of the broker's symbol list with its pre-encoded full response
+    """
+    def __init__(self, symbols):
+        self.symbols = symbols  # SymbolInfo records in terminal order
+        self.names = [s.name for s in symbols]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.fields = set(symbols[0]._fields) if symbols else set()
+
+        body = json.dumps({"success": True, "count": len(self.names), "symbols": self.names},
+                          separators=(',', ':')).encode('utf-8')
+        self.body = body
+        self.body_gzip = gzip.compress(body, compresslevel=6)
+        self.etag = hashlib.sha1('\n'.join(self.names).encode('utf-8')).hexdigest()
+        self.built_at = time.time()
+
+
+class SymbolCatalog:
+    """
+    Cached symbol list, rebuilt only when the broker's symbol set changes
+
+    symbols_total() is checked at most every SYMBOLS_CHECK_SECONDS and the full
+    symbols_get() rebuild happens when the count changes or every SYMBOLS_REBUILD_SECONDS
+    (to catch renames that keep the count). The unfiltered response is kept as JSON and
+    gzip bytes so the common "list everything" call is served without encoding work.
+    """
+    def __init__(self, check_seconds=SYMBOLS_CHECK_SECONDS, rebuild_seconds=SYMBOLS_REBUILD_SECONDS):
+        self.check_seconds = check_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._snapshot = None
+        self._total = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.rebuilds = 0
+
+    def add_listener(self, callback):
+        """
+        Register a function called with each new snapshot whose symbol set changed
+
+        Args:
+            callback (callable): callback(snapshot)
+        """
+        self._listeners.append(callback)
+
+    def get(self):
+        """
+        Get the current snapshot, refreshing it if the check interval has passed
+
+        Returns:
+            SymbolCatalogSnapshot or None: Snapshot, or None if symbols could not be loaded
+        """
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.check_seconds:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is not None and now - self._checked_at < self.check_seconds:
+                return self._snapshot
+            self._checked_at = now
+            try:
+                total = mt5.symbols_total()
+            except Exception as e:
+                logger.error(f"symbols_total() failed: {str(e)}")
+                return self._snapshot
+
+            expired = self._snapshot is not None and time.time() - self._snapshot.built_at >= self.rebuild_seconds
+            if self._snapshot is None or total != self._total or expired:
+                self._rebuild(total)
+            return self._snapshot
+
+    def invalidate(self):
+        """Force a rebuild on the next get()"""
+        with self._lock:
+            self._checked_at = 0.0
+            self._total = None
+
+    def _rebuild(self, total):
+        """Reload the symbol list from the terminal (caller holds the lock)"""
+        symbols = mt5.symbols_get()
+        if symbols is None:
+            logger.error(f"symbols_get() failed: {mt5.last_error()}")
+            return
+        snapshot = SymbolCatalogSnapshot(list(symbols))
+        changed = self._snapshot is None or snapshot.etag != self._snapshot.etag
+        if changed:
+            logger.info(f"Symbol catalog rebuilt: {len(snapshot.names)} symbols")
+        self._snapshot = snapshot
+        self._total = total
+        self.rebuilds += 1
+
+        if changed:
+            for callback in self._listeners:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.error(f"Symbol catalog listener failed: {str(e)}", exc_info=True)
+
+    def page(self, query=None, fields=None, cursor=None, limit=None):
+        """
+        Filter, project and paginate the symbol list
+
+        Args:
+            query (str, optional): Case-insensitive substring the symbol name must contain
+            fields (list, optional): SymbolInfo attributes to include besides the name
+            cursor (str, optional): Cursor returned by a previous page
+            limit (int, optional): Maximum number of symbols to return. None returns all.
+
+        Returns:
+            dict: Response with symbols, count of matches and next_cursor
+        """
+        snapshot = self.get()
+        if snapshot is None:
+            return {"success": True, "count": 0, "symbols": [], "next_cursor": None}
+
+        if fields:
+            unknown = [f for f in fields if f not in snapshot.fields]
+            if unknown:
+                raise ValueError(f"Unknown fields: {unknown}")
+
+        start = 0
+        if cursor:
+            start = snapshot.index.get(decode_cursor(cursor), -1) + 1
+            if start == 0:
+                raise ValueError("Invalid or expired cursor")
+
+        query = query.upper() if query else None
+        matched = [i for i in range(len(snapshot.names))
+                   if query is None or query in snapshot.names[i].upper()]
+
+        page = [i for i in matched if i >= start]
+        next_cursor = None
+        if limit is not None and len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(snapshot.names[page[-1]])
+
+        if fields:
+            symbols = []
+            for i in page:
+                info = snapshot.symbols[i]
+                item = {"name": info.name}
+                for field in fields:
+                    item[field] = getattr(info, field)
+                symbols.append(item)
+        else:
+            symbols = [snapshot.names[i] for i in page]
+
+        return {
+            "success": True,
+            "count": len(matched),
+            "symbols": symbols,
+            "next_cursor": next_cursor
+        }
+
+
+def encode_cursor(name):
+    """Encode the last symbol of a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(name.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor()"""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid or expired cursor")
@@ -0,0 +1,227 @@
+import difflib
+import json
+import logging
+import os
+import re
+import threading
+from .config import MT5_DEFAULT_SUFFIX, SYMBOL_ALIASES_FILE
+
+logger = logging.getLogger(__name__)
+
+# Separators brokers put between the base name and a suffix (EURUSD.r, EURUSD#, EURUSD_i)
+_SUFFIX_SEPARATOR = re.compile(r'[.#_!+-]')
+_NON_ALNUM = re.compile(r'[^A-Z0-9]')
+
+# Cap on remembered suggestions for unknown names
+_MAX_SUGGESTION_CACHE = 1024
+
+
+def normalize(name):
+    """Uppercase alphanumeric key of a symbol name ('EUR/USD' -> 'EURUSD')"""
+    return _NON_ALNUM.sub('', name.upper())
+
+
+def strip_exchange(name):
+    """Remove a TradingView exchange prefix ('OANDA:EURUSD' -> 'EURUSD')"""
+    name = name.strip()
+    return name.rsplit(':', 1)[-1] if ':' in name else name
+
+
+class SymbolResolver:
+    """
+    Two-way mapping between TradingView symbol names and broker symbol names
+
+    The tables are built once from the broker's symbol list and the alias file, and rebuilt
+    only when the symbol catalog changes, so lookups are dictionary reads:
+
+    1. explicit aliases from SYMBOL_ALIASES_FILE (e.g. XAUUSD -> GOLD)
+    2. broker names without the suffix of their asset class (first element of
+       symbol_info().path, e.g. Forex -> '.r') or without MT5_DEFAULT_SUFFIX
+    3. exact broker names
+    4. broker names without a separator-led suffix (EURUSD.pro -> EURUSD), unless several
+       broker names share that base
+    5. normalized names (uppercase, alphanumeric only), so EUR/USD and XAU_USD resolve
+
+    An exchange prefix (OANDA:EURUSD) is always ignored. Names that match nothing are never
+    guessed, since a near miss (BTCUSDT -> BTCUSD) would trade another instrument; suggest()
+    offers close broker names for the error message instead. Without a symbol list the
+    configured suffix is appended as before.
+
+    Alias file format:
+        {"aliases": {"XAUUSD": "GOLD"}, "suffixes": {"forex": ".r", "indices": ".cash"}}
+    """
+    def __init__(self, aliases=None, suffixes=None, default_suffix=MT5_DEFAULT_SUFFIX):
+        self.aliases = {strip_exchange(k): v for k, v in (aliases or {}).items()}
+        self.suffixes = {k.lower(): v for k, v in (suffixes or {}).items()}
+        self.default_suffix = default_suffix
+
+        self._to_broker = {}  # TradingView name -> broker name
+        self._by_key = {}  # normalized name -> broker name
+        self._to_tv = {}  # broker name -> TradingView name
+        self._suggestions = {}  # (unresolved normalized name, n) -> close broker names
+        self._keys = []
+        self._etag = None
+        self._lock = threading.Lock()
+        self.unresolved = 0
+
+    @classmethod
+    def from_file(cls, path=SYMBOL_ALIASES_FILE):
+        """
+        Load aliases and per-asset-class suffixes from a JSON file
+
+        Args:
+            path (str): Path of the alias file. A missing file yields automatic mapping only.
+
+        Returns:
+            SymbolResolver: Resolver without broker symbols (see build())
+        """
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            config = json.load(f)
+        resolver = cls(config.get('aliases'), config.get('suffixes'))
+        logger.info(f"Loaded {len(resolver.aliases)} symbol aliases and "
+                    f"{len(resolver.suffixes)} asset class suffixes from {path}")
+        return resolver
+
+    def _suffix_of(self, info):
+        """Configured suffix of a symbol's asset class (first element of symbol_info().path)"""
+        if not self.suffixes:
+            return self.default_suffix
+        asset_class = getattr(info, 'path', '').replace('/', '\\').split('\\', 1)[0].lower()
+        return self.suffixes.get(asset_class, self.default_suffix)
+
+    def _suffixed_base(self, info):
+        """Name without the configured suffix of its asset class, or None"""
+        for suffix in (self._suffix_of(info), self.default_suffix):
+            if suffix and info.name.endswith(suffix) and len(info.name) > len(suffix):
+                return info.name[:-len(suffix)]
+        return None
+
+    def build(self, snapshot):
+        """
+        (Re)build the lookup tables from a symbol catalog snapshot
+
+        Args:
+            snapshot (SymbolCatalogSnapshot): Current broker symbol list
+        """
+        if snapshot is None or snapshot.etag == self._etag:
+            return
+
+        to_broker, to_tv, by_key = {}, {}, {}
+        names = set(snapshot.names)
+
+        def add(tv_name, broker_name, reverse=True):
+            to_broker[tv_name] = broker_name
+            by_key[normalize(tv_name)] = broker_name
+            if reverse:
+                to_tv[broker_name] = tv_name
+
+        # Increasing priority: a later step overrides an earlier one for the same name.
+        # Bases guessed from a separator (EURUSD.pro -> EURUSD), only when a single broker symbol
+        # has that base: GER40.cash and GER40.roll leave GER40 to suggest() instead of guessing
+        candidates = {}
+        for name in snapshot.names:
+            parts = _SUFFIX_SEPARATOR.split(name, 1)
+            if len(parts) == 2 and parts[0]:
+                candidates.setdefault(parts[0], []).append(name)
+        for base, broker_names in candidates.items():
+            if len(broker_names) == 1:
+                add(base, broker_names[0])
+        # Exact broker names
+        for name in snapshot.names:
+            add(name, name, reverse=False)
+            to_tv.setdefault(name, name)
+        # Bases without the configured suffix (preferred when a broker lists both EURUSD and EURUSD.r)
+        for info in reversed(snapshot.symbols):
+            base = self._suffixed_base(info)
+            if base is not None:
+                add(base, info.name)
+        # Explicit aliases
+        for tv_name, broker_name in self.aliases.items():
+            if broker_name not in names:
+                logger.warning(f"Symbol alias {tv_name} -> {broker_name}: broker symbol not found")
+                continue
+            add(tv_name, broker_name)
+
+        with self._lock:
+            self._to_broker = to_broker
+            self._to_tv = to_tv
+            self._by_key = by_key
+            self._keys = list(by_key)
+            self._suggestions = {}
+            self._etag = snapshot.etag
+        logger.info(f"Symbol resolver built: {len(names)} broker symbols, {len(to_broker)} names")
+
+    def to_broker(self, symbol):
+        """
+        Resolve a TradingView symbol to the broker's symbol name
+
+        Args:
+            symbol (str): Symbol as sent by TradingView (e.g. 'OANDA:XAUUSD')
+
+        Returns:
+            str: Broker symbol (e.g. 'GOLD'); the name with the default suffix if unknown
+        """
+        name = strip_exchange(symbol)
+        broker = self._to_broker.get(name)
+        if broker is not None:
+            return broker
+        key = normalize(name)
+        broker = self._by_key.get(key)
+        if broker is not None:
+            return broker
+        if self._keys:
+            self.unresolved += 1
+
+        if self.default_suffix and not name.endswith(self.default_suffix):
+            return name + self.default_suffix
+        return name
+
+    def suggest(self, symbol, n=3):
+        """
+        Broker symbols with names close to an unknown symbol, for error messages
+
+        Args:
+            symbol (str): Symbol as sent by TradingView
+            n (int): Maximum number of suggestions
+
+        Returns:
+            list: Broker symbol names, closest first; computed once per name
+        """
+        cache_key = (normalize(strip_exchange(symbol)), n)
+        suggestions = self._suggestions.get(cache_key)
+        if suggestions is None:
+            with self._lock:
+                matches = difflib.get_close_matches(cache_key[0], self._keys, n=n, cutoff=0.6)
+                suggestions = list(dict.fromkeys(self._by_key[m] for m in matches))
+                if len(self._suggestions) < _MAX_SUGGESTION_CACHE:
+                    self._suggestions[cache_key] = suggestions
+        return suggestions
+
+    def to_tv(self, broker_symbol):
+        """
+        Map a broker symbol back to its TradingView name
+
+        Args:
+            broker_symbol (str): Broker symbol (e.g. 'EURUSD.r')
+
+        Returns:
+            str: TradingView name (e.g. 'EURUSD')
+        """
+        name = self._to_tv.get(broker_symbol)
+        if name is not None:
+            return name
+        if self.default_suffix and broker_symbol.endswith(self.default_suffix):
+            return broker_symbol[:-len(self.default_suffix)]
+        return broker_symbol
+
+    def get_stats(self):
+        """Table sizes for /metrics"""
+        return {
+            "names": len(self._to_broker),
+            "broker_symbols": len(self._to_tv),
+            "aliases": len(self.aliases),
+            "unresolved": self.unresolved,
+            "suggestions_cached": len(self._suggestions),
+        }
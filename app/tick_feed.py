@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from .backend import mt5
+from .config import TICK_POLL_INTERVAL_MS
+
+logger = logging.getLogger(__name__)
+
+
+class TickFeed:
+    """
+    Single background poller that turns symbol_info_tick() into a tick stream
+
+    The MT5 Python API has no push notifications, so one thread polls the subscribed
+    symbols and dispatches a tick to every listener only when its time_msc changes.
+    Terminal load depends on the number of subscribed symbols, not on the number of listeners.
+    """
+    def __init__(self, interval_ms=TICK_POLL_INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self._subscriptions = {}  # symbol -> reference count
+        self._last_ticks = {}  # symbol -> last tick seen
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def add_listener(self, listener):
+        """
+        Register a callback for new ticks
+
+        Args:
+            listener (callable): Called as listener(symbol, tick) from the feed thread
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Unregister a tick callback"""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def subscribe(self, symbol):
+        """
+        Start polling a broker symbol (reference counted)
+
+        Args:
+            symbol (str): Broker symbol name
+        """
+        with self._lock:
+            self._subscriptions[symbol] = self._subscriptions.get(symbol, 0) + 1
+        self.start()
+
+    def unsubscribe(self, symbol):
+        """Release one subscription of a broker symbol"""
+        with self._lock:
+            count = self._subscriptions.get(symbol, 0) - 1
+            if count > 0:
+                self._subscriptions[symbol] = count
+            else:
+                self._subscriptions.pop(symbol, None)
+                self._last_ticks.pop(symbol, None)
+
+    def last_tick(self, symbol):
+        """
+        Get the most recent tick seen for a subscribed symbol
+
+        Returns:
+            Tick or None: Last tick, or None if the symbol has not ticked yet
+        """
+        return self._last_ticks.get(symbol)
+
+    def symbols(self):
+        """List the currently subscribed symbols"""
+        with self._lock:
+            return list(self._subscriptions)
+
+    def start(self):
+        """Start the polling thread if it is not running"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="tick-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the polling thread"""
+        # Under the lock, so a start() on another thread has either not begun or fully started it
+        with self._lock:
+            self._running = False
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=2)
+
+    def _run(self):
+        """Poll subscribed symbols and dispatch changed ticks"""
+        logger.info("Tick feed started")
+        while self._running:
+            started = time.monotonic()
+            for symbol in self.symbols():
+                try:
+                    tick = mt5.symbol_info_tick(symbol)
+                except Exception as e:
+                    logger.error(f"Tick feed error for {symbol}: {str(e)}")
+                    continue
+                if tick is None:
+                    continue
+                last = self._last_ticks.get(symbol)
+                if last is not None and last.time_msc == tick.time_msc:
+                    continue
+                self._last_ticks[symbol] = tick
+                self._dispatch(symbol, tick)
+
+            pause = self.interval - (time.monotonic() - started)
+            if pause > 0:
+                time.sleep(pause)
+        logger.info("Tick feed stopped")
+
+    def _dispatch(self, symbol, tick):
+        """Deliver a tick to every listener, isolating listener failures"""
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(symbol, tick)
+            except Exception as e:
+                logger.error(f"Tick listener failed for {symbol}: {str(e)}", exc_info=True)
@@ -0,0 +1,422 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from .backend import mt5
+from .config import TRAILING_MAX_MODIFY_PER_SEC, TRAILING_SYNC_SECONDS, TRAILING_STATE_FILE
+
+logger = logging.getLogger(__name__)
+
+
+class TrailingPosition:
+    """
+    Trailing-stop and break-even state of one tracked position
+    """
+    __slots__ = ('ticket', 'symbol', 'direction', 'open_price', 'point', 'digits',
+                 'sl', 'tp', 'confirmed_sl', 'trail', 'step', 'be_trigger', 'be_offset',
+                 'be_done', 'version', 'params', 'tracked_at', 'magic')
+
+    def __init__(self, ticket, symbol, direction, open_price, point, digits, sl, tp, params, magic=0):
+        self.ticket = ticket
+        self.magic = magic
+        self.params = params
+        self.tracked_at = time.time()
+        self.symbol = symbol
+        self.direction = direction  # 1 for long, -1 for short
+        self.open_price = open_price
+        self.point = point
+        self.digits = digits
+        self.sl = sl
+        self.tp = tp
+        self.confirmed_sl = sl
+        self.trail = params['trailing_stop'] * point
+        self.step = max(params['trailing_step'], 1) * point  # Move at least one point at a time
+        self.be_trigger = params['break_even'] * point
+        self.be_offset = params['break_even_offset'] * point
+        self.be_done = self.be_trigger <= 0 or self._beyond(sl, open_price + direction * self.be_offset)
+        self.version = 0
+
+    def _beyond(self, sl, level):
+        """True if the stop is already at or beyond a level in the profitable direction"""
+        if not sl:
+            return False
+        return sl >= level if self.direction > 0 else sl <= level
+
+    def next_trigger(self):
+        """
+        Price (bid for longs, ask for shorts) at which this position next needs a stop move
+
+        Returns:
+            float or None: Trigger price, or None if nothing is left to do
+        """
+        d = self.direction
+        triggers = []
+        if not self.be_done:
+            triggers.append(self.open_price + d * self.be_trigger)
+        if self.trail > 0:
+            activation = self.open_price + d * self.trail
+            if self.sl:
+                activation = max(activation, self.sl + self.trail + self.step) if d > 0 \
+                    else min(activation, self.sl - self.trail - self.step)
+            triggers.append(activation)
+        if not triggers:
+            return None
+        return min(triggers) if d > 0 else max(triggers)
+
+    def target_sl(self, price):
+        """
+        Stop loss this position should have at a given price
+
+        Args:
+            price (float): Bid for longs, ask for shorts
+
+        Returns:
+            float or None: New stop loss, or None if the current one should stay
+        """
+        d = self.direction
+        candidates = []
+        if not self.be_done and d * (price - self.open_price) >= self.be_trigger:
+            candidates.append(self.open_price + d * self.be_offset)
+        if self.trail > 0 and d * (price - self.open_price) >= self.trail:
+            candidates.append(price - d * self.trail)
+        if not candidates:
+            return None
+        new_sl = round(max(candidates) if d > 0 else min(candidates), self.digits)
+        if self.sl and d * (new_sl - self.sl) <= 0:
+            return None
+        return new_sl
+
+
+class TrailingStopEngine:
+    """
+    Tick-driven trailing stops and break-even moves kept in per-symbol heaps
+
+    Long positions sit in a min-heap keyed by the bid that next triggers them and short
+    positions in a max-heap keyed by ask, so each tick only inspects the top of the heap.
+    Stop moves are coalesced per ticket and sent as TRADE_ACTION_SLTP by a rate-limited worker.
+    The parameters of tracked positions are saved to TRAILING_STATE_FILE, and resume() picks
+    the ones that are still open up again after a restart.
+    """
+    def __init__(self, mt5_handler, tick_feed, max_modify_per_sec=TRAILING_MAX_MODIFY_PER_SEC,
+                 sync_seconds=TRAILING_SYNC_SECONDS, state_file=TRAILING_STATE_FILE):
+        self.mt5_handler = mt5_handler
+        self.tick_feed = tick_feed
+        self.min_interval = 1.0 / max_modify_per_sec if max_modify_per_sec > 0 else 0
+        self.sync_seconds = sync_seconds
+        self.state_file = state_file
+        self._save_lock = threading.Lock()
+
+        self._positions = {}  # ticket -> TrailingPosition
+        self._long_heaps = {}  # symbol -> [(trigger, seq, ticket, version)]
+        self._short_heaps = {}  # symbol -> [(-trigger, seq, ticket, version)]
+        self._pending = {}  # ticket -> stop loss waiting to be sent
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads = []
+
+        self.modifications_sent = 0
+        self.modifications_failed = 0
+
+        tick_feed.add_listener(self.on_tick)
+
+    def track(self, ticket, params, save=True):
+        """
+        Start trailing an open position
+
+        Args:
+            ticket (int): Position ticket
+            params (dict): Trailing parameters, the 'trailing' dict of an alert parsed by
+                app/alert_templates.py (distances in points)
+            save (bool): Write the state file afterwards
+
+        Returns:
+            bool: True if the position is now tracked
+        """
+        positions = mt5.positions_get(ticket=ticket)
+        if not positions:
+            logger.warning(f"Cannot trail position {ticket}: position not found")
+            return False
+        position = positions[0]
+
+        symbol_info = mt5.symbol_info(position.symbol)
+        if symbol_info is None:
+            logger.warning(f"Cannot trail position {ticket}: symbol {position.symbol} not found")
+            return False
+
+        direction = 1 if position.type == mt5.POSITION_TYPE_BUY else -1
+        entry = TrailingPosition(ticket, position.symbol, direction, position.price_open,
+                                 symbol_info.point, symbol_info.digits,
+                                 position.sl, position.tp, params, position.magic)
+        with self._lock:
+            previous = self._positions.get(ticket)
+            self._positions[ticket] = entry
+            self._push(entry)
+        if previous is None:
+            self.tick_feed.subscribe(position.symbol)
+
+        self._start()
+        if save:
+            self._save()
+        logger.info(f"Trailing position {ticket} {position.symbol}: {params}")
+        return True
+
+    def untrack(self, ticket):
+        """Stop trailing a position and forget its parameters"""
+        with self._lock:
+            entry = self._positions.pop(ticket, None)
+            self._pending.pop(ticket, None)
+            if entry is not None:
+                self._discard(entry)
+        if entry is not None:
+            self.tick_feed.unsubscribe(entry.symbol)
+            self._save()
+
+    def clear(self):
+        """Stop trailing all positions but keep the state file (e.g. when becoming a standby)"""
+        with self._lock:
+            entries = list(self._positions.values())
+            self._positions.clear()
+            self._pending.clear()
+            self._long_heaps.clear()
+            self._short_heaps.clear()
+        for entry in entries:
+            self.tick_feed.unsubscribe(entry.symbol)
+
+    def resume(self):
+        """
+        Track the saved positions that are still open, e.g. after a restart
+
+        Returns:
+            list: Tickets that are tracked again
+        """
+        saved = self._load()
+        if not saved:
+            return []
+        positions = mt5.positions_get()
+        if positions is None:
+            logger.warning(f"Cannot resume trailing stops: positions_get() failed: {mt5.last_error()}")
+            return []
+        open_tickets = {p.ticket for p in positions}
+        resumed = [ticket for ticket, params in saved.items()
+                   if ticket in open_tickets and self.track(ticket, params, save=False)]
+        self._save()
+        logger.info(f"Resumed trailing on {len(resumed)} of {len(saved)} saved position(s)")
+        return resumed
+
+    def _load(self):
+        """Saved parameters by ticket"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file) as f:
+                return {int(ticket): params for ticket, params in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            logger.error(f"Cannot read trailing state {self.state_file}: {str(e)}")
+            return {}
+
+    def _save(self):
+        """Write the parameters of the tracked positions to the state file"""
+        if not self.state_file:
+            return
+        with self._save_lock:
+            with self._lock:
+                state = {str(ticket): entry.params for ticket, entry in self._positions.items()}
+            try:
+                directory = os.path.dirname(self.state_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                temp = self.state_file + '.tmp'
+                with open(temp, 'w') as f:
+                    json.dump(state, f)
+                os.replace(temp, self.state_file)
+            except OSError as e:
+                logger.error(f"Cannot save trailing state {self.state_file}: {str(e)}")
+
+    def _discard(self, entry):
+        """Remove the heap items of a position that is no longer tracked (caller holds the lock)"""
+        heaps = self._long_heaps if entry.direction > 0 else self._short_heaps
+        heap = heaps.get(entry.symbol)
+        if heap is None:
+            return
+        heap[:] = [item for item in heap if item[2] != entry.ticket]
+        if heap:
+            heapq.heapify(heap)
+        else:
+            del heaps[entry.symbol]
+
+    def _push(self, entry):
+        """Schedule the next trigger of a position (caller holds the lock)"""
+        entry.version += 1
+        trigger = entry.next_trigger()
+        if trigger is None:
+            return
+        if entry.direction > 0:
+            heap = self._long_heaps.setdefault(entry.symbol, [])
+            heapq.heappush(heap, (trigger, next(self._seq), entry.ticket, entry.version))
+        else:
+            heap = self._short_heaps.setdefault(entry.symbol, [])
+            heapq.heappush(heap, (-trigger, next(self._seq), entry.ticket, entry.version))
+
+    def on_tick(self, symbol, tick):
+        """
+        Fire every trigger crossed by a tick
+
+        Args:
+            symbol (str): Broker symbol
+            tick: Tick from the tick feed
+        """
+        with self._lock:
+            fired = []
+            long_heap = self._long_heaps.get(symbol)
+            while long_heap and long_heap[0][0] <= tick.bid:
+                _, _, ticket, version = heapq.heappop(long_heap)
+                entry = self._fire(ticket, version, tick.bid)
+                if entry is not None:
+                    fired.append(entry)
+
+            short_heap = self._short_heaps.get(symbol)
+            while short_heap and -short_heap[0][0] >= tick.ask:
+                _, _, ticket, version = heapq.heappop(short_heap)
+                entry = self._fire(ticket, version, tick.ask)
+                if entry is not None:
+                    fired.append(entry)
+
+            # Reschedule only after the scan so an entry fires at most once per tick
+            for entry in fired:
+                self._push(entry)
+            if self._pending:
+                self._wakeup.notify()
+
+    def _fire(self, ticket, version, price):
+        """
+        Move the stop of a triggered position (caller holds the lock)
+
+        Returns:
+            TrailingPosition or None: The entry to reschedule, or None for a stale heap item
+        """
+        entry = self._positions.get(ticket)
+        if entry is None or entry.version != version:
+            return None
+
+        new_sl = entry.target_sl(price)
+        if not entry.be_done and entry.direction * (price - entry.open_price) >= entry.be_trigger:
+            entry.be_done = True
+        if new_sl is not None:
+            entry.sl = new_sl
+            self._pending[ticket] = new_sl
+        return entry
+
+    def _start(self):
+        """Start the modification worker and the position sync thread"""
+        with self._lock:
+            if self._threads:
+                return
+            self._threads = [
+                threading.Thread(target=self._modify_loop, name="trailing-modify", daemon=True),
+                threading.Thread(target=self._sync_loop, name="trailing-sync", daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _modify_loop(self):
+        """Send pending stop moves, at most one per min_interval"""
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._wakeup.wait()
+                ticket, sl = self._pending.popitem()
+                entry = self._positions.get(ticket)
+                if entry is None:
+                    continue
+                symbol, tp, magic = entry.symbol, entry.tp, entry.magic
+
+            result = self.mt5_handler.send_sltp(ticket, symbol, sl, tp, magic)
+
+            with self._lock:
+                entry = self._positions.get(ticket)
+                if result['success']:
+                    self.modifications_sent += 1
+                    if entry is not None:
+                        entry.confirmed_sl = sl
+                else:
+                    self.modifications_failed += 1
+                    logger.warning(f"Trailing stop move for {ticket} failed: {result['message']}")
+                    if entry is not None and ticket not in self._pending:
+                        # Fall back to the broker's stop so the move is retried on a later tick
+                        entry.sl = entry.confirmed_sl
+                        self._push(entry)
+
+            if self.min_interval:
+                time.sleep(self.min_interval)
+
+    def _sync_loop(self):
+        """Drop positions that were closed and pick up stops changed outside the engine"""
+        while True:
+            time.sleep(self.sync_seconds)
+            with self._lock:
+                if not self._positions:
+                    continue
+            taken_at = time.time()
+            try:
+                positions = mt5.positions_get()
+            except Exception as e:
+                logger.error(f"Trailing sync failed: {str(e)}")
+                continue
+            if positions is None:
+                continue
+            self.sync(positions, taken_at)
+
+    def sync(self, positions, taken_at=None):
+        """
+        Reconcile tracked positions with a positions snapshot
+
+        Args:
+            positions (iterable): Position records from mt5.positions_get()
+            taken_at (float, optional): time.time() just before the snapshot was requested;
+                positions tracked after it are left alone
+        """
+        open_positions = {p.ticket: p for p in positions}
+        closed = []
+        with self._lock:
+            for ticket, entry in self._positions.items():
+                position = open_positions.get(ticket)
+                if position is None:
+                    if taken_at is None or entry.tracked_at < taken_at:
+                        closed.append(ticket)
+                    continue
+                entry.tp = position.tp
+                if ticket not in self._pending and position.sl != entry.confirmed_sl:
+                    entry.sl = entry.confirmed_sl = position.sl
+                    self._push(entry)
+        for ticket in closed:
+            logger.info(f"Position {ticket} closed, no longer trailing")
+            self.untrack(ticket)
+
+    def get_status(self):
+        """
+        Describe the tracked positions
+
+        Returns:
+            dict: Tracked positions with their current stop and next trigger
+        """
+        with self._lock:
+            return {
+                "tracked": len(self._positions),
+                "pending_modifications": len(self._pending),
+                "modifications_sent": self.modifications_sent,
+                "modifications_failed": self.modifications_failed,
+                "positions": [
+                    {
+                        "ticket": entry.ticket,
+                        "symbol": entry.symbol,
+                        "sl": entry.sl,
+                        "next_trigger": entry.next_trigger(),
+                        "break_even_done": entry.be_done,
+                    }
+                    for entry in self._positions.values()
+                ]
+            }
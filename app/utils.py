@@ -3,6 +3,10 @@ import logging
 import json
 from datetime import datetime
 from .config import LOG_DIR, LOG_FORMAT, LOG_LEVEL
+from .alert_templates import AlertTemplateRegistry
+
+# Alert templates are compiled once when the application starts
+alert_templates = AlertTemplateRegistry.from_file()
 
 def setup_logging(name, log_to_file=True):
     """
@@ -51,47 +55,15 @@ def save_webhook_url(webhook_url):
     print('Webhook URL saved to webhook_url.txt')
     return
 
-def parse_tradingview_webhook(data):
+def parse_tradingview_webhook(data, template=None):
     """
     Parse and validate TradingView webhook data
     
     Args:
-        data (dict): Webhook data from TradingView
+        data (dict or str): Webhook data from TradingView (JSON object or plain-text body)
+        template (str, optional): Alert template name. See app/alert_templates.py.
         
     Returns:
         dict: Validated and processed webhook data
     """
-    required_fields = ['symbol', 'side']
-    
-    # Check required fields
-    for field in required_fields:
-        if field not in data:
-            raise ValueError(f"Missing required field: {field}")
-    
-    # Get symbol from data
-    symbol = str(data['symbol'])
-    
-    # Remove any existing suffix if present (shouldn't be in TradingView data)
-    from .config import MT5_DEFAULT_SUFFIX
-    if MT5_DEFAULT_SUFFIX and symbol.endswith(MT5_DEFAULT_SUFFIX):
-        symbol = symbol[:-len(MT5_DEFAULT_SUFFIX)]
-    
-    # Normalize and validate fields
-    result = {
-        'symbol': symbol,  # Symbol without suffix - suffix will be added in the MT5 handler
-        'side': str(data['side']).upper(),  # Uppercase side for consistency
-        'volume': float(data.get('volume', 0.01)),
-        'price': float(data.get('price', 0)),
-        'stop_loss': float(data.get('stop_loss', 100)),
-        'take_profit': float(data.get('take_profit', 200)),
-        'comment': str(data.get('comment', 'TradingView Signal'))
-    }
-    
-    # Additional validation
-    if result['volume'] <= 0:
-        raise ValueError(f"Invalid volume: {result['volume']}")
-    
-    if result['side'] not in ['BUY', 'SELL', 'LONG', 'SHORT']:
-        raise ValueError(f"Invalid side: {result['side']}")
-    
-    return result
\ No newline at end of file
+    return alert_templates.parse(data, template)
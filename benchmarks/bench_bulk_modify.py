@@ -0,0 +1,74 @@
+"""
+Benchmark bulk SL/TP modification throughput against the simulated terminal.
+
+Opens N positions spread over a few symbols, then times MT5Handler.modify_positions()
+moving every stop with point offsets. Use --latency-ms to model the terminal round trip
+of a real setup (measure it with scripts/test_mt5_connection.py).
+"""
+
+import sys
+import os
+import argparse
+import json
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk SL/TP modify benchmark (simulated terminal)')
+    parser.add_argument('--positions', type=int, default=500, help='Number of positions to modify')
+    parser.add_argument('--rounds', type=int, default=5, help='Number of timed rounds')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated terminal latency per call')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    # The backend is chosen at import time
+    os.environ['MT5_BACKEND'] = 'sim'
+    os.environ['SIM_LATENCY_MS'] = '0'
+    from app import sim_backend
+    from app.mt5_handler import MT5Handler
+    import logging
+    logging.disable(logging.INFO)
+
+    handler = MT5Handler()
+    symbols = ["EURUSD", "GBPUSD", "USDJPY", "XAUUSD"]
+    for i in range(args.positions):
+        result = handler.place_trade(symbols[i % len(symbols)], "BUY" if i % 2 == 0 else "SELL",
+                                     volume=0.01, stop_loss=0, take_profit=0)
+        if not result['success']:
+            print(f"Failed to open position {i}: {result['message']}")
+            return
+
+    sim_backend._LATENCY = args.latency_ms / 1000.0
+
+    rounds = []
+    for i in range(args.rounds):
+        result = handler.modify_positions(sl_points=200 + i * 10, tp_points=400 + i * 10)
+        rounds.append(result['timings'])
+        if result['failed']:
+            print(f"Round {i + 1}: {result['failed']} modifications failed")
+
+    best = min(rounds, key=lambda t: t['total_ms'])
+    report = {
+        "positions": args.positions,
+        "latency_ms": args.latency_ms,
+        "rounds": rounds,
+        "best_total_ms": best['total_ms'],
+        "best_per_second": best['per_second'],
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Bulk modify: {args.positions} positions, simulated latency {args.latency_ms} ms/call")
+    for i, timings in enumerate(rounds):
+        print(f"  round {i + 1}: snapshot {timings['snapshot_ms']:.2f} ms, prices {timings['prices_ms']:.2f} ms, "
+              f"send {timings['send_ms']:.2f} ms, total {timings['total_ms']:.2f} ms, "
+              f"{timings['per_second']} modifications/s")
+    print(f"Best: {best['total_ms']:.2f} ms ({best['per_second']} modifications/s)")
+
+
+if __name__ == "__main__":
+    main()
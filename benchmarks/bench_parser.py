@@ -0,0 +1,79 @@
+"""
+Micro-benchmark of alert parsing per template format.
+
+Reports the cost per alert of the compiled parsers for the default JSON shape, a mapped
+JSON template (dotted paths), key=value text and regex text alerts, both for the template
+alone and including json.loads of the raw body.
+"""
+
+import sys
+import os
+import argparse
+import json
+import timeit
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.alert_templates import AlertTemplateRegistry
+
+TEMPLATES = {
+    "tv_strategy": {
+        "fields": {"symbol": "ticker", "side": "strategy.order.action", "volume": "strategy.order.contracts"},
+        "defaults": {"stop_loss": 150}
+    },
+    "kv": {"format": "kv", "fields": {"symbol": "sym"}},
+    "plain": {
+        "format": "regex",
+        "pattern": r"(?P<side>buy|sell)\s+(?P<volume>[\d.]+)\s+(?P<symbol>\w+)",
+        "flags": "i"
+    },
+}
+
+CASES = [
+    ("json (default)", None, '{"symbol": "EURUSD", "side": "buy", "price": 1.0855, "volume": 0.1, '
+                             '"stop_loss": 100, "take_profit": 200, "comment": "TradingView Signal"}'),
+    ("json (mapped)", "tv_strategy", '{"ticker": "EURUSD", "strategy": {"order": {"action": "sell", '
+                                     '"contracts": 0.2}}, "comment": "Strategy"}'),
+    ("kv text", "kv", "sym=EURUSD side=buy volume=0.1 stop_loss=120 take_profit=240"),
+    ("regex text", "plain", "Strategy order BUY 0.1 EURUSD @ 1.0855 filled"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Alert parser micro-benchmark')
+    parser.add_argument('--number', type=int, default=100000, help='Alerts parsed per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='Measurements per case (best is reported)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    registry = AlertTemplateRegistry(TEMPLATES)
+    results = []
+    for name, template, body in CASES:
+        payload = json.loads(body) if body.startswith('{') else body
+        registry.parse(payload, template)  # Fail fast on a broken case
+
+        parse_only = min(timeit.repeat(lambda: registry.parse(payload, template),
+                                       number=args.number, repeat=args.repeat))
+        if body.startswith('{'):
+            with_decode = min(timeit.repeat(lambda: registry.parse(json.loads(body), template),
+                                            number=args.number, repeat=args.repeat))
+        else:
+            with_decode = parse_only
+        results.append({
+            "case": name,
+            "parse_us": round(parse_only / args.number * 1e6, 3),
+            "parse_with_decode_us": round(with_decode / args.number * 1e6, 3),
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'case':<16} {'parse (us/alert)':>18} {'incl. decode (us/alert)':>25}")
+    for r in results:
+        print(f"{r['case']:<16} {r['parse_us']:>18.3f} {r['parse_with_decode_us']:>25.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,591 @@
+"""
+Replay logged or journaled TradingView alerts against historical ticks
+
+Shows what the webhook would have filled at for different latency and deviation settings.
+Alerts come from the server log ("Received webhook data: ..." lines) or the order journal.
+Ticks are fetched with copy_ticks_range() once per symbol and day and cached as .npy files,
+so later runs work from the cache (and without a terminal for cached days).
+
+Each order attempt is priced from the last tick at the time it is built and executes at the
+last tick after the injected latency; like the simulated terminal, it is requoted when the
+price moved by more than the deviation. Requotes are retried the way OrderRetryEngine does
+(deviation widened by 1.5x + 1, linear backoff, ORDER_MAX_ATTEMPTS, ORDER_RETRY_DEADLINE_MS).
+SL/TP are placed the way place_trade() places them (points from the requested price) and the
+position is held until SL or TP is hit or --max-hold-hours pass.
+
+Usage:
+    python scripts/replay_alerts.py --log logs/*.log --latency-ms 20,100,250 --deviation 10,30
+    python scripts/replay_alerts.py --journal data/orders.jsonl --trades trades.csv
+"""
+import sys
+import os
+import argparse
+import ast
+import glob
+import json
+import re
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import (
+    MT5_ACCOUNT, MT5_PASSWORD, MT5_SERVER, MT5_PATH, ORDER_JOURNAL_FILE,
+    ORDER_MAX_ATTEMPTS, ORDER_RETRY_DEADLINE_MS, ORDER_RETRY_BACKOFF_MS,
+    ORDER_BASE_DEVIATION, ORDER_MAX_DEVIATION
+)
+from app.utils import parse_tradingview_webhook
+from app.sizing import risk_volumes
+from app.symbol_resolver import SymbolResolver
+from app.journal import journal_files
+
+# Try to import MetaTrader5 (or the simulated terminal with MT5_BACKEND=sim)
+try:
+    from app.backend import mt5
+except ImportError:
+    mt5 = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ticks')
+
+# Fields kept in the cache (24 bytes per tick)
+TICK_DTYPE = np.dtype([('time_msc', '<i8'), ('bid', '<f8'), ('ask', '<f8')])
+DAY_MS = 86400000
+
+# "2024-05-01 12:30:00,123 - app.server - INFO - Received webhook data: {...}"
+_LOG_LINE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - .*?Received webhook data: (.*)$')
+
+# Ticks per block of the precomputed min/max used to find SL/TP hits
+_BLOCK = 4096
+
+
+def read_log_alerts(paths):
+    """
+    Read alerts from server log files
+
+    Log times are read as local time of this machine, like the log formatter writes them.
+
+    Args:
+        paths (list): Log file paths
+
+    Returns:
+        list: (received_at epoch seconds, alert body) tuples
+    """
+    entries = []
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                match = _LOG_LINE.match(line.rstrip('\n'))
+                if match is None:
+                    continue
+                stamp, millis, body = match.groups()
+                received_at = datetime.strptime(stamp, '%Y-%m-%d %H:%M:%S').timestamp() + int(millis) / 1000.0
+                try:
+                    # JSON bodies are logged as Python reprs, text bodies as they are
+                    data = ast.literal_eval(body)
+                except (ValueError, SyntaxError):
+                    data = body
+                for alert in data if isinstance(data, list) else [data]:
+                    entries.append((received_at, alert))
+    return entries
+
+
+def read_journal_alerts(path):
+    """
+    Read the alerts of an order journal
+
+    Args:
+        path (str): Journal file written by the server (ORDER_JOURNAL_FILE); its rotated
+            predecessor (<path>.1) is read first when it exists
+
+    Returns:
+        list: (received_at epoch seconds, parsed alert) tuples
+    """
+    entries = []
+    for journal_file in journal_files(path):
+        with open(journal_file, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('type') == 'alert':
+                    entries.append((record['received_at'], record['alert']))
+    return entries
+
+
+def parse_alerts(entries, resolver):
+    """
+    Turn raw or journaled alerts into a table of orders
+
+    Args:
+        entries (list): (received_at, alert) tuples
+        resolver (SymbolResolver): TradingView to broker symbol mapping
+
+    Returns:
+        tuple: (DataFrame with one row per BUY/SELL alert, dict of skipped counts)
+    """
+    rows = []
+    skipped = {"invalid": 0, "reverse": 0}
+    for received_at, alert in entries:
+        if not (isinstance(alert, dict) and 'side' in alert and 'symbol' in alert and 'alert_time' in alert):
+            try:
+                alert = parse_tradingview_webhook(alert)
+            except (ValueError, TypeError):
+                skipped["invalid"] += 1
+                continue
+        side = str(alert['side']).upper()
+        if side == 'REVERSE':
+            skipped["reverse"] += 1
+            continue
+        rows.append({
+            "received_at": float(received_at),
+            "symbol": resolver.to_broker(alert['symbol']),
+            "direction": 1 if side in ('BUY', 'LONG') else -1,
+            "volume": float(alert.get('volume') or 0.0),
+            "risk_pct": float(alert.get('risk_pct') or 0.0),
+            "stop_loss": float(alert.get('stop_loss') or 0.0),
+            "take_profit": float(alert.get('take_profit') or 0.0),
+        })
+    columns = ["received_at", "symbol", "direction", "volume", "risk_pct", "stop_loss", "take_profit"]
+    alerts = pd.DataFrame(rows, columns=columns).sort_values("received_at", kind="stable").reset_index(drop=True)
+    return alerts, skipped
+
+
+class TickCache:
+    """
+    Per-symbol, per-day tick files fetched with copy_ticks_range()
+
+    Layout: <cache_dir>/<symbol>/<YYYYMMDD>.npy plus symbol.json with the symbol properties.
+    Days that are not over yet are fetched again on every run.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, online=True):
+        self.cache_dir = cache_dir
+        self.online = online
+        self.downloaded_days = 0
+        self.cached_days = 0
+
+    def _dir(self, symbol):
+        path = os.path.join(self.cache_dir, symbol)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def spec(self, symbol):
+        """
+        Symbol properties used for pricing and P&L
+
+        Returns:
+            dict or None: point, digits, tick value/size and volume limits
+        """
+        path = os.path.join(self._dir(symbol), 'symbol.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        if not self.online:
+            return None
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            return None
+        spec = {name: getattr(info, name) for name in (
+            'point', 'digits', 'trade_tick_value', 'trade_tick_size', 'volume_step', 'volume_min', 'volume_max')}
+        with open(path, 'w') as f:
+            json.dump(spec, f)
+        return spec
+
+    def _day(self, symbol, day):
+        """Ticks of one UTC day (days since 1970-01-01), from the cache or the terminal"""
+        path = os.path.join(self._dir(symbol), datetime.fromtimestamp(day * 86400, timezone.utc).strftime('%Y%m%d') + '.npy')
+        if os.path.exists(path):
+            self.cached_days += 1
+            return np.load(path, mmap_mode='r')
+        if not self.online:
+            return np.zeros(0, dtype=TICK_DTYPE)
+        start = datetime.fromtimestamp(day * 86400, timezone.utc)
+        end = datetime.fromtimestamp((day + 1) * 86400, timezone.utc)
+        raw = mt5.copy_ticks_range(symbol, start, end, mt5.COPY_TICKS_ALL)
+        ticks = np.zeros(0 if raw is None else len(raw), dtype=TICK_DTYPE)
+        if raw is not None and len(raw):
+            for name in TICK_DTYPE.names:
+                ticks[name] = raw[name]
+            # Keep quotes only (bid and ask both set), in time order
+            ticks = ticks[(ticks['bid'] > 0) & (ticks['ask'] > 0)]
+            ticks = ticks[np.argsort(ticks['time_msc'], kind='stable')]
+        self.downloaded_days += 1
+        if (day + 1) * 86400 < time.time() - 60:
+            np.save(path, ticks)
+        return ticks
+
+    def load(self, symbol, start, end):
+        """
+        Ticks of a symbol between two times
+
+        Args:
+            symbol (str): Broker symbol
+            start (float): Epoch seconds
+            end (float): Epoch seconds
+
+        Returns:
+            numpy.ndarray: time_msc, bid, ask records in time order
+        """
+        days = range(int(start * 1000) // DAY_MS, int(end * 1000) // DAY_MS + 1)
+        parts = [self._day(symbol, day) for day in days]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=TICK_DTYPE)
+
+
+class TickHistory:
+    """
+    Ticks of one symbol as contiguous columns, prepared once and shared by all runs
+
+    Per-block min/max of bid and ask let first() skip blocks that cannot contain an SL/TP hit,
+    so an exit is found in O(ticks / _BLOCK + _BLOCK) instead of scanning the whole hold.
+    """
+    def __init__(self, ticks):
+        self.time_msc = np.ascontiguousarray(ticks['time_msc'])
+        self.prices = {'bid': np.ascontiguousarray(ticks['bid']), 'ask': np.ascontiguousarray(ticks['ask'])}
+        starts = np.arange(0, len(ticks), _BLOCK)
+        self.block_min = {k: np.minimum.reduceat(v, starts) for k, v in self.prices.items()} if len(ticks) else {}
+        self.block_max = {k: np.maximum.reduceat(v, starts) for k, v in self.prices.items()} if len(ticks) else {}
+
+    def __len__(self):
+        return len(self.time_msc)
+
+    def first(self, side, below, level, start, stop):
+        """
+        First index in [start, stop) where the price is at or below (or above) a level
+
+        Returns:
+            int: Tick index, or -1 if the level is not reached
+        """
+        if start >= stop:
+            return -1
+        values = self.prices[side]
+        hit = np.less_equal if below else np.greater_equal
+        blocks = self.block_min[side] if below else self.block_max[side]
+
+        block = start // _BLOCK
+        head_end = min((block + 1) * _BLOCK, stop)
+        head = hit(values[start:head_end], level)
+        if head.any():
+            return start + int(np.argmax(head))
+        last_block = (stop - 1) // _BLOCK
+        candidates = hit(blocks[block + 1:last_block + 1], level)
+        if not candidates.any():
+            return -1
+        found = block + 1 + int(np.argmax(candidates))
+        lo, hi = found * _BLOCK, min((found + 1) * _BLOCK, stop)
+        inner = hit(values[lo:hi], level)
+        return lo + int(np.argmax(inner)) if inner.any() else -1
+
+
+def fill_orders(history, received_ms, direction, latency_ms, deviation, point,
+                max_attempts=ORDER_MAX_ATTEMPTS, deadline_ms=ORDER_RETRY_DEADLINE_MS,
+                backoff_ms=ORDER_RETRY_BACKOFF_MS, max_deviation=ORDER_MAX_DEVIATION):
+    """
+    Simulate the retry engine for all alerts of one symbol at once
+
+    Args:
+        history (TickHistory): Ticks of the symbol
+        received_ms (numpy.ndarray): Alert arrival times in epoch milliseconds
+        direction (numpy.ndarray): 1 for buys, -1 for sells
+        latency_ms (float): Time from pricing an order until the server executes it (and
+            again until the result is back)
+        deviation (int): Starting deviation in points
+
+    Returns:
+        dict: Arrays filled, fill_index, requested, attempts and deviation per alert
+    """
+    n = len(received_ms)
+    times = history.time_msc
+    bid, ask = history.prices['bid'], history.prices['ask']
+    filled = np.zeros(n, dtype=bool)
+    fill_index = np.full(n, -1, dtype=np.int64)
+    requested = np.zeros(n)
+    attempts = np.zeros(n, dtype=np.int64)
+    deviations = np.full(n, float(deviation))
+    priced_at = received_ms.astype(np.float64)
+    pending = np.ones(n, dtype=bool)
+    buy = direction > 0
+    max_deviation = max(max_deviation, deviation)
+
+    for attempt in range(max(1, max_attempts)):
+        if attempt:
+            pending &= priced_at - received_ms < deadline_ms
+        if not pending.any():
+            break
+        # Price from the last tick at build time, execute at the last tick after the latency
+        priced = np.searchsorted(times, priced_at, side='right') - 1
+        executed = np.searchsorted(times, priced_at + latency_ms, side='right') - 1
+        priced = np.maximum(priced, 0)
+        quote = np.where(buy, ask[priced], bid[priced])
+        market = np.where(buy, ask[executed], bid[executed])
+        accepted = pending & (np.abs(market - quote) <= deviations * point + 1e-12)
+        requoted = pending & ~accepted
+
+        filled |= accepted
+        fill_index[accepted] = executed[accepted]
+        requested[accepted] = quote[accepted]
+        attempts[pending] = attempt + 1
+
+        # Requotes: widen the deviation and re-price after the result and the backoff
+        deviations[requoted] = np.minimum(max_deviation, np.floor(deviations[requoted] * 1.5) + 1)
+        priced_at[requoted] += 2 * latency_ms + backoff_ms * (attempt + 1)
+        pending = requoted
+
+    return {"filled": filled, "fill_index": fill_index, "requested": requested,
+            "attempts": attempts, "deviation": deviations}
+
+
+def replay_symbol(alerts, history, spec, latency_ms, deviation, max_hold_ms, equity):
+    """
+    Fills and outcomes of the alerts of one symbol
+
+    Returns:
+        DataFrame: One row per alert with status, fill, slippage and P&L
+    """
+    alerts = alerts.reset_index(drop=True)
+    result = alerts.copy()
+    result["latency_ms"] = latency_ms
+    result["start_deviation"] = deviation
+    n = len(alerts)
+    for column, value in (("status", "no_ticks"), ("attempts", 0), ("deviation", np.nan),
+                          ("requested", np.nan), ("fill_price", np.nan), ("fill_time", np.nan),
+                          ("slippage_points", np.nan), ("sl", np.nan), ("tp", np.nan),
+                          ("exit", ""), ("exit_price", np.nan), ("exit_time", np.nan), ("profit", np.nan)):
+        result[column] = value
+    if n == 0 or len(history) == 0 or spec is None:
+        return result
+
+    point = spec['point']
+    times = history.time_msc
+    bid, ask = history.prices['bid'], history.prices['ask']
+    received_ms = alerts['received_at'].to_numpy() * 1000.0
+    direction = alerts['direction'].to_numpy()
+    in_range = (received_ms >= times[0]) & (received_ms + latency_ms <= times[-1])
+
+    # Volumes: alert volume, or sized from equity like MT5Handler.size_trades()
+    volume = alerts['volume'].to_numpy().copy()
+    risk = alerts['risk_pct'].to_numpy() > 0
+    if risk.any():
+        volume[risk] = risk_volumes(equity, alerts['risk_pct'].to_numpy()[risk], alerts['stop_loss'].to_numpy()[risk],
+                                    point, spec['trade_tick_value'], spec['trade_tick_size'],
+                                    spec['volume_step'], spec['volume_min'], spec['volume_max'])
+    result["volume"] = volume
+    unsized = in_range & (volume <= 0)
+
+    fills = fill_orders(history, received_ms[in_range], direction[in_range], latency_ms, deviation, point)
+    status = np.where(in_range, "requoted", "no_ticks").astype(object)
+    index = np.flatnonzero(in_range)
+    filled = np.zeros(n, dtype=bool)
+    filled[index[fills['filled']]] = True
+    filled &= ~unsized
+    status[filled] = "filled"
+    status[unsized] = "unsized"
+    fill_index = np.full(n, -1, dtype=np.int64)
+    fill_index[index] = fills['fill_index']
+    requested = np.full(n, np.nan)
+    requested[index] = fills['requested']
+    result["attempts"] = 0
+    result.loc[index, "attempts"] = fills['attempts']
+    result.loc[index, "deviation"] = fills['deviation']
+
+    # Entry at the ask for buys and the bid for sells; SL/TP in points from the requested price
+    sel = np.flatnonzero(filled)
+    fill_price = np.where(direction[sel] > 0, ask[fill_index[sel]], bid[fill_index[sel]])
+    stop_loss = alerts['stop_loss'].to_numpy()[sel]
+    take_profit = alerts['take_profit'].to_numpy()[sel]
+    sl = np.where(stop_loss > 0, requested[sel] - direction[sel] * stop_loss * point, 0.0)
+    tp = np.where(take_profit > 0, requested[sel] + direction[sel] * take_profit * point, 0.0)
+
+    # Exits: first SL or TP hit (SL first when both are hit by the same tick), else the end of the hold
+    hold_end = np.searchsorted(times, times[fill_index[sel]] + max_hold_ms, side='left') if max_hold_ms > 0 \
+        else np.full(len(sel), len(history))
+    exit_index = np.zeros(len(sel), dtype=np.int64)
+    exit_reason = np.empty(len(sel), dtype=object)
+    for k in range(len(sel)):
+        start, stop = int(fill_index[sel[k]]) + 1, int(hold_end[k])
+        long = direction[sel[k]] > 0
+        side = 'bid' if long else 'ask'  # Longs close at the bid, shorts at the ask
+        sl_hit = history.first(side, long, sl[k], start, stop) if sl[k] else -1
+        tp_hit = history.first(side, not long, tp[k], start, stop) if tp[k] else -1
+        hits = [(i, reason) for i, reason in ((sl_hit, "sl"), (tp_hit, "tp")) if i >= 0]
+        if hits:
+            exit_index[k], exit_reason[k] = min(hits)
+        else:
+            exit_index[k] = max(stop - 1, start - 1)
+            exit_reason[k] = "hold" if stop < len(history) else "open"
+    exit_price = np.where(direction[sel] > 0, bid[exit_index], ask[exit_index])
+    profit = direction[sel] * (exit_price - fill_price) / spec['trade_tick_size'] \
+        * spec['trade_tick_value'] * volume[sel]
+
+    result["status"] = status
+    result.loc[sel, "requested"] = requested[sel]
+    result.loc[sel, "fill_price"] = fill_price
+    result.loc[sel, "fill_time"] = times[fill_index[sel]] / 1000.0
+    result.loc[sel, "slippage_points"] = direction[sel] * (fill_price - requested[sel]) / point
+    result.loc[sel, "sl"] = sl
+    result.loc[sel, "tp"] = tp
+    result.loc[sel, "exit"] = exit_reason
+    result.loc[sel, "exit_price"] = exit_price
+    result.loc[sel, "exit_time"] = times[exit_index] / 1000.0
+    result.loc[sel, "profit"] = profit
+    return result
+
+
+def _distribution(values):
+    """min/p50/p90/p99/max and mean of an array, rounded"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"count": 0, "min": None, "p50": None, "p90": None, "p99": None, "max": None, "mean": None}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"count": int(values.size), "min": round(float(values.min()), 3), "p50": round(float(p50), 3),
+            "p90": round(float(p90), 3), "p99": round(float(p99), 3), "max": round(float(values.max()), 3),
+            "mean": round(float(values.mean()), 3)}
+
+
+def summarize(trades):
+    """Counts, slippage and P&L of one latency/deviation run"""
+    filled = trades[trades["status"] == "filled"]
+    profit = filled["profit"].to_numpy(dtype=float)
+    symbols = {}
+    for symbol, group in filled.groupby("symbol"):
+        symbols[symbol] = {
+            "filled": int(len(group)),
+            "profit": round(float(group["profit"].sum()), 2),
+            "slippage_p50": round(float(group["slippage_points"].median()), 3),
+        }
+    return {
+        "alerts": int(len(trades)),
+        "statuses": {k: int(v) for k, v in trades["status"].value_counts().items()},
+        "fill_rate": round(len(filled) / len(trades), 4) if len(trades) else None,
+        "attempts_mean": round(float(filled["attempts"].mean()), 3) if len(filled) else None,
+        "slippage_points": _distribution(filled["slippage_points"]),
+        "exits": {k: int(v) for k, v in filled["exit"].value_counts().items()},
+        "profit": round(float(profit.sum()), 2),
+        "profit_per_trade": round(float(profit.mean()), 2) if profit.size else None,
+        "win_rate": round(float((profit > 0).mean()), 4) if profit.size else None,
+        "symbols": symbols,
+    }
+
+
+def replay(alerts, cache, latencies, deviations, max_hold_hours=24.0, equity=10000.0):
+    """
+    Replay alerts for every latency/deviation combination
+
+    Args:
+        alerts (DataFrame): Orders from parse_alerts()
+        cache (TickCache): Tick source
+        latencies (list): Latencies in milliseconds
+        deviations (list): Starting deviations in points
+        max_hold_hours (float): Close positions without SL/TP hit after this long (0 = end of data)
+        equity (float): Equity used to size risk_pct alerts
+
+    Returns:
+        tuple: (report dict, DataFrame of all simulated trades)
+    """
+    max_hold_ms = max_hold_hours * 3600 * 1000.0
+    loaded = {}
+    started = time.perf_counter()
+    for symbol, group in alerts.groupby("symbol"):
+        end = group["received_at"].max() + (max_hold_ms / 1000.0 if max_hold_ms > 0 else 0) + 60
+        end = min(end, time.time()) if max_hold_ms > 0 else time.time()
+        loaded[symbol] = (TickHistory(cache.load(symbol, group["received_at"].min() - 60, end)), cache.spec(symbol))
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    runs, frames = [], []
+    for latency_ms in latencies:
+        for deviation in deviations:
+            parts = [replay_symbol(group, *loaded[symbol], latency_ms, deviation, max_hold_ms, equity)
+                     for symbol, group in alerts.groupby("symbol")]
+            trades = pd.concat(parts) if parts else alerts.assign(status=[])
+            runs.append({"latency_ms": latency_ms, "deviation": deviation, **summarize(trades)})
+            frames.append(trades)
+    report = {
+        "alerts": int(len(alerts)),
+        "ticks": {symbol: len(history) for symbol, (history, _) in loaded.items()},
+        "cache": {"downloaded_days": cache.downloaded_days, "cached_days": cache.cached_days},
+        "load_seconds": round(load_seconds, 3),
+        "replay_seconds": round(time.perf_counter() - started, 3),
+        "runs": runs,
+    }
+    return report, pd.concat(frames) if frames else pd.DataFrame()
+
+
+def print_report(report, skipped):
+    """Print a replay report as a table"""
+    print(f"Replayed {report['alerts']} alerts ({skipped['invalid']} invalid, {skipped['reverse']} REVERSE skipped) "
+          f"against {sum(report['ticks'].values())} ticks of {len(report['ticks'])} symbol(s)")
+    print(f"Ticks loaded in {report['load_seconds']}s ({report['cache']['downloaded_days']} day(s) downloaded, "
+          f"{report['cache']['cached_days']} cached), replayed in {report['replay_seconds']}s\n")
+    print(f"{'latency':>8} {'dev':>5} {'filled':>7} {'requote':>8} {'no tick':>8} {'slip p50':>9} "
+          f"{'slip p99':>9} {'att.':>5} {'win %':>6} {'P&L':>12}")
+    for run in report["runs"]:
+        statuses = run["statuses"]
+        slippage = run["slippage_points"]
+        print(f"{run['latency_ms']:>8g} {run['deviation']:>5} {statuses.get('filled', 0):>7} "
+              f"{statuses.get('requoted', 0):>8} {statuses.get('no_ticks', 0):>8} "
+              f"{slippage['p50'] if slippage['p50'] is not None else '-':>9} "
+              f"{slippage['p99'] if slippage['p99'] is not None else '-':>9} "
+              f"{run['attempts_mean'] if run['attempts_mean'] is not None else '-':>5} "
+              f"{run['win_rate'] * 100 if run['win_rate'] is not None else 0:>6.1f} {run['profit']:>12.2f}")
+    print("\nLatency in milliseconds, deviation and slippage in points (positive = worse than requested).")
+
+
+def _connect():
+    """Connect to the terminal for downloading ticks; False means cache-only"""
+    if mt5 is None:
+        print("MetaTrader5 package not found, using cached ticks only")
+        return False
+    if not mt5.initialize(path=MT5_PATH) or not mt5.login(MT5_ACCOUNT, password=MT5_PASSWORD, server=MT5_SERVER):
+        print(f"MT5 connection failed ({mt5.last_error()}), using cached ticks only")
+        return False
+    return True
+
+
+def _numbers(text, cast):
+    return [cast(v) for v in text.split(',') if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay logged or journaled alerts against historical ticks')
+    parser.add_argument('--log', nargs='*', default=[], help='Server log files (globs allowed)')
+    parser.add_argument('--journal', nargs='?', const=ORDER_JOURNAL_FILE, help='Order journal file')
+    parser.add_argument('--latency-ms', default='50', help='Comma-separated latencies to compare')
+    parser.add_argument('--deviation', default=str(ORDER_BASE_DEVIATION), help='Comma-separated starting deviations (points)')
+    parser.add_argument('--max-hold-hours', type=float, default=24.0, help='Close positions after this long (0 = end of data)')
+    parser.add_argument('--equity', type=float, default=10000.0, help='Equity used to size risk_pct alerts')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Tick cache directory')
+    parser.add_argument('--offline', action='store_true', help='Use cached ticks only')
+    parser.add_argument('--trades', help='Write every simulated trade to this CSV file')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    entries = []
+    for pattern in args.log:
+        entries += read_log_alerts(sorted(glob.glob(pattern)))
+    if args.journal:
+        entries += read_journal_alerts(args.journal)
+    if not entries:
+        print("No alerts found; pass --log and/or --journal")
+        sys.exit(1)
+
+    online = not args.offline and _connect()
+    resolver = SymbolResolver.from_file()
+    if online:
+        from app.symbol_catalog import SymbolCatalog
+        resolver.build(SymbolCatalog().get())
+
+    alerts, skipped = parse_alerts(entries, resolver)
+    report, trades = replay(alerts, TickCache(args.cache_dir, online),
+                            _numbers(args.latency_ms, float), _numbers(args.deviation, int),
+                            args.max_hold_hours, args.equity)
+    if args.trades:
+        trades.to_csv(args.trades, index=False)
+    if args.json:
+        print(json.dumps({**report, "skipped": skipped}, indent=2))
+    else:
+        print_report(report, skipped)
+    if online:
+        mt5.shutdown()
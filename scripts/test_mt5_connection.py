@@ -1,16 +1,20 @@
 import sys
 import os
+import argparse
+import json
+import threading
 import pandas as pd
 import time
 
 # Add the parent directory to the path so we can import from app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.utils import setup_logging
-from app.config import MT5_ACCOUNT, MT5_PASSWORD, MT5_SERVER, MT5_PATH
+from app.config import MT5_ACCOUNT, MT5_PASSWORD, MT5_SERVER, MT5_PATH, MT5_DEFAULT_SUFFIX
+from app.metrics import percentile
 
-# Try to import MetaTrader5
+# Try to import MetaTrader5 (or the simulated terminal with MT5_BACKEND=sim)
 try:
-    import MetaTrader5 as mt5
+    from app.backend import mt5
 except ImportError:
     print("ERROR: MetaTrader5 package not found. Please install it using: pip install MetaTrader5")
     sys.exit(1)
@@ -203,5 +207,175 @@ def test_market_order(symbol, volume=0.01):
     print(f"Position closed successfully. Order ID: {close_result.order}")
     return True
 
+def _profile_calls(symbol):
+    """
+    Build the API calls the application depends on, as (name, function) pairs
+    
+    order_check() is used instead of order_send() so profiling never places orders.
+    """
+    info = mt5.symbol_info(symbol)
+    tick = mt5.symbol_info_tick(symbol)
+    if info is None or tick is None:
+        return None
+    check_request = {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "symbol": symbol,
+        "volume": info.volume_min,
+        "type": mt5.ORDER_TYPE_BUY,
+        "price": tick.ask,
+        "deviation": 10,
+        "magic": 123456,
+        "comment": "MT5 Profiler",
+        "type_time": mt5.ORDER_TIME_GTC,
+        "type_filling": mt5.ORDER_FILLING_IOC,
+    }
+    return [
+        ("terminal_info", lambda: mt5.terminal_info()),
+        ("symbol_info", lambda: mt5.symbol_info(symbol)),
+        ("symbol_info_tick", lambda: mt5.symbol_info_tick(symbol)),
+        ("positions_get", lambda: mt5.positions_get()),
+        ("symbols_get", lambda: mt5.symbols_get()),
+        ("copy_rates_from_pos", lambda: mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M1, 0, 100)),
+        ("order_check", lambda: mt5.order_check(check_request)),
+    ]
+
+def _latency_summary(samples_ms):
+    """min/p50/p99/max of a list of latencies in milliseconds"""
+    samples_ms = sorted(samples_ms)
+    return {
+        "min": round(samples_ms[0], 4),
+        "p50": round(percentile(samples_ms, 50), 4),
+        "p99": round(percentile(samples_ms, 99), 4),
+        "max": round(samples_ms[-1], 4),
+    }
+
+def _run_concurrent(fn, threads, iterations):
+    """
+    Call fn from several threads at once
+    
+    Returns:
+        tuple: (calls per second, list of per-call latencies in ms, failed call count)
+    """
+    per_thread = max(1, iterations // threads)
+    samples = [[] for _ in range(threads)]
+    failures = [0] * threads
+    start_barrier = threading.Barrier(threads + 1)
+    
+    def worker(index):
+        start_barrier.wait()
+        for _ in range(per_thread):
+            started = time.perf_counter()
+            if fn() is None:
+                failures[index] += 1
+            samples[index].append((time.perf_counter() - started) * 1000.0)
+    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    
+    latencies = [value for thread_samples in samples for value in thread_samples]
+    return len(latencies) / elapsed if elapsed > 0 else 0.0, latencies, sum(failures)
+
+def profile_mt5_api(symbol="EURUSD", iterations=1000, threads=4, warmup=10):
+    """
+    Measure the latency of every MT5 API call the application uses
+    
+    Each call is first timed sequentially (latency), then from several threads at once
+    (throughput under concurrent callers, e.g. web requests plus background refreshers).
+    
+    Args:
+        symbol (str): Symbol used for symbol, tick, rates and order_check calls
+        iterations (int): Calls per API in each phase
+        threads (int): Concurrent callers in the throughput phase
+        warmup (int): Untimed calls per API before measuring
+        
+    Returns:
+        dict or None: Profiling report, or None if the connection failed
+    """
+    if not mt5.initialize(path=MT5_PATH):
+        print(f"MT5 initialize() failed. Error code: {mt5.last_error()}", file=sys.stderr)
+        return None
+    if not mt5.login(MT5_ACCOUNT, password=MT5_PASSWORD, server=MT5_SERVER):
+        print(f"MT5 login failed. Error code: {mt5.last_error()}", file=sys.stderr)
+        mt5.shutdown()
+        return None
+    
+    try:
+        mt5.symbol_select(symbol, True)
+        calls = _profile_calls(symbol)
+        if calls is None:
+            print(f"Failed to get symbol data for {symbol}", file=sys.stderr)
+            return None
+        
+        report = {
+            "symbol": symbol,
+            "iterations": iterations,
+            "threads": threads,
+            "backend": getattr(mt5, '__name__', 'MetaTrader5'),
+            "calls": {}
+        }
+        for name, fn in calls:
+            for _ in range(warmup):
+                fn()
+            
+            samples = []
+            failures = 0
+            started = time.perf_counter()
+            for _ in range(iterations):
+                call_started = time.perf_counter()
+                if fn() is None:
+                    failures += 1
+                samples.append((time.perf_counter() - call_started) * 1000.0)
+            elapsed = time.perf_counter() - started
+            
+            concurrent_rate, concurrent_samples, concurrent_failures = _run_concurrent(fn, threads, iterations)
+            report["calls"][name] = {
+                "latency_ms": _latency_summary(samples),
+                "calls_per_sec": round(iterations / elapsed, 1) if elapsed > 0 else None,
+                "concurrent_calls_per_sec": round(concurrent_rate, 1),
+                "concurrent_latency_ms": _latency_summary(concurrent_samples),
+                "failures": failures + concurrent_failures,
+            }
+        return report
+    finally:
+        mt5.shutdown()
+
+def print_profile(report):
+    """Print a profiling report as a table"""
+    print(f"MT5 API profile: {report['symbol']}, {report['iterations']} calls per API, "
+          f"{report['threads']} concurrent callers\n")
+    print(f"{'call':<20} {'min':>9} {'p50':>9} {'p99':>9} {'max':>9} {'calls/s':>10} "
+          f"{'conc. calls/s':>14} {'conc. p99':>10} {'fail':>5}")
+    for name, stats in report["calls"].items():
+        latency = stats["latency_ms"]
+        print(f"{name:<20} {latency['min']:>9.3f} {latency['p50']:>9.3f} {latency['p99']:>9.3f} "
+              f"{latency['max']:>9.3f} {stats['calls_per_sec']:>10.1f} "
+              f"{stats['concurrent_calls_per_sec']:>14.1f} {stats['concurrent_latency_ms']['p99']:>10.3f} "
+              f"{stats['failures']:>5}")
+    print("\nLatencies in milliseconds.")
+
 if __name__ == "__main__":
-    test_mt5_connection()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Test the MT5 connection or profile the MT5 API')
+    parser.add_argument('--profile', action='store_true', help='Measure latency and throughput of each API call')
+    parser.add_argument('--symbol', default=f"EURUSD{MT5_DEFAULT_SUFFIX}", help='Symbol used by the profiled calls')
+    parser.add_argument('--iterations', type=int, default=1000, help='Calls per API in each phase')
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent callers for the throughput phase')
+    parser.add_argument('--json', action='store_true', help='Print the profile as JSON')
+    args = parser.parse_args()
+    
+    if not args.profile:
+        test_mt5_connection()
+        sys.exit(0)
+    
+    report = profile_mt5_api(args.symbol, max(1, args.iterations), max(1, args.threads))
+    if report is None:
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_profile(report)
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Test setup: every test runs against the simulated terminal (app/sim_backend.py)
+
+The backend is chosen when app.backend is first imported, so the environment is set here
+before any application module is loaded. Features that write files are left off.
+"""
+
+import os
+
+os.environ['MT5_BACKEND'] = 'sim'
+os.environ['SIM_LATENCY_MS'] = '0'
+os.environ.setdefault('EQUITY_RECORDER_ENABLED', 'False')
+os.environ.setdefault('ORDER_JOURNAL_ENABLED', 'False')
+os.environ.setdefault('FAILOVER_ENABLED', 'False')
+os.environ.setdefault('TRAILING_STATE_FILE', '')
+
+import pytest
+
+from app import sim_backend
+
+
+@pytest.fixture(autouse=True)
+def sim_account(monkeypatch):
+    """Start every test with a connected terminal, no positions and a hedging account"""
+    monkeypatch.setattr(sim_backend, '_MARGIN_MODE', sim_backend.ACCOUNT_MARGIN_MODE_RETAIL_HEDGING)
+    sim_backend.initialize()
+    with sim_backend._lock:
+        sim_backend._state['positions'] = {}
+        sim_backend._state['balance'] = 10000.0
+    yield sim_backend
+
+
+@pytest.fixture
+def handler(sim_account):
+    """MT5Handler connected to the simulated terminal"""
+    from app.mt5_handler import MT5Handler
+    mt5_handler = MT5Handler()
+    yield mt5_handler
+    mt5_handler.close_session()
+
+
+@pytest.fixture
+def client(handler):
+    """Flask test client of the webhook server around the handler"""
+    from app.server import create_app
+    app = create_app(handler)
+    app.testing = True
+    return app.test_client()
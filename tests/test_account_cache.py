@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from app import account as account_module
+from app.account import AccountCache
+from app.sim_backend import Tick
+from app.tick_feed import TickFeed
+
+
+@pytest.fixture
+def cache(sim_account):
+    """Account cache whose background thread never refreshes on its own during a test"""
+    cache = AccountCache(TickFeed(), refresh_seconds=3600)
+    cache.start()
+    return cache
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_snapshot_age_reports_staleness(cache, monkeypatch):
+    fresh = cache.get()
+    assert fresh["snapshot_age_seconds"] < 1
+    assert fresh["estimated"] is False
+
+    now = time.time()
+    monkeypatch.setattr(account_module.time, 'time', lambda: now + 30)
+
+    assert cache.get()["snapshot_age_seconds"] >= 29
+    assert cache.get_stats()["snapshot_age_seconds"] >= 29
+
+
+def test_ticks_update_the_estimate_between_refreshes(handler, cache, sim_account):
+    handler.place_trade('EURUSD', 'BUY', volume=0.1, stop_loss=0, take_profit=0)
+    cache.refresh()
+    before = cache.get()
+    position = sim_account.positions_get(symbol='EURUSD')[0]
+
+    # One pip up on 0.1 lot of EURUSD is worth 1 USD, ten pips 10 USD
+    price = position.price_current + 0.0010
+    cache._on_tick('EURUSD', Tick(int(time.time()), price, price + 0.0001, 0.0, 0, 0, 6, 0.0))
+
+    after = cache.get()
+    assert after["estimated"] is True
+    assert after["tick_age_seconds"] is not None
+    assert after["equity"] == pytest.approx(before["equity"] + 10, abs=0.01)
+    assert after["balance"] == before["balance"]
+
+
+def test_refresh_discards_the_estimate(handler, cache, sim_account):
+    handler.place_trade('EURUSD', 'BUY', volume=0.1, stop_loss=0, take_profit=0)
+    cache.refresh()
+    position = sim_account.positions_get(symbol='EURUSD')[0]
+    price = position.price_current + 0.0010
+    cache._on_tick('EURUSD', Tick(int(time.time()), price, price + 0.0001, 0.0, 0, 0, 6, 0.0))
+
+    cache.refresh()
+
+    assert cache.get()["estimated"] is False
+
+
+def test_successful_order_refreshes_the_snapshot(handler):
+    handler.account.refresh_seconds = 3600
+    handler.account.start()
+    refreshes = handler.account.refreshes
+    assert handler.account.get()["positions"] == 0
+
+    handler.place_trade('EURUSD', 'BUY', volume=0.1, stop_loss=0, take_profit=0)
+
+    assert wait_for(lambda: handler.account.get()["positions"] == 1)
+    assert handler.account.refreshes > refreshes
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from app import server
+from app.admission import AdmissionController
+
+ALERT = {"symbol": "EURUSD", "side": "BUY", "volume": 0.1, "stop_loss": 0, "take_profit": 0}
+
+
+@pytest.fixture
+def admission_app(handler, monkeypatch):
+    """Build an app whose admission controller uses the given limits"""
+    def build(**limits):
+        monkeypatch.setattr(server, 'AdmissionController', lambda: AdmissionController(**limits))
+        app = server.create_app(handler)
+        app.testing = True
+        return app
+    return build
+
+
+def test_requests_over_the_in_flight_limit_get_429(admission_app, handler, monkeypatch, sim_account):
+    app = admission_app(max_in_flight=1)
+    entered, release = threading.Event(), threading.Event()
+    place_trade = handler.place_trade
+
+    def slow_place_trade(*args, **kwargs):
+        entered.set()
+        release.wait(5)
+        return place_trade(*args, **kwargs)
+    monkeypatch.setattr(handler, 'place_trade', slow_place_trade)
+
+    first = {}
+    worker = threading.Thread(target=lambda: first.update(response=app.test_client().post('/trade', json=ALERT)))
+    worker.start()
+    try:
+        assert entered.wait(5)
+        response = app.test_client().post('/trade', json=ALERT)
+    finally:
+        release.set()
+        worker.join(5)
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    assert first['response'].status_code == 200
+    assert len(sim_account.positions_get()) == 1
+    admission = app.test_client().get('/metrics').get_json()['admission']
+    assert (admission['admitted'], admission['shed_overload'], admission['in_flight']) == (1, 1, 0)
+
+
+def test_alert_past_its_deadline_gets_503_unsent(admission_app, sim_account):
+    client = admission_app(deadline_ms=0).test_client()
+
+    response = client.post('/trade', json=ALERT)
+
+    assert response.status_code == 503
+    assert response.get_json()['expired'] is True
+    assert sim_account.positions_get() == ()
+    assert client.get('/metrics').get_json()['admission']['shed_deadline'] == 1
+
+
+def test_standby_instance_rejects_orders_with_503(client, monkeypatch):
+    from app.failover import FailoverManager
+    monkeypatch.setattr(FailoverManager, 'is_active', lambda self: False)
+
+    response = client.post('/trade', json=ALERT)
+
+    assert response.status_code == 503
+    assert response.get_json()['role'] == 'standby'
+    assert client.get('/health').status_code == 200
@@ -0,0 +1,55 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.alert_latency import AlertLatencyTracker, parse_alert_time
+
+
+def alert(**extra):
+    return {"symbol": "EURUSD", "side": "BUY", "volume": 0.1, "stop_loss": 0, "take_profit": 0, **extra}
+
+
+def test_stale_alert_is_rejected_before_the_terminal(client, sim_account):
+    fired = datetime.fromtimestamp(time.time() - 120, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    response = client.post('/trade', json=alert(alert_time=fired))
+
+    assert response.status_code == 400
+    assert "old (max" in response.get_json()['message']
+    assert sim_account.positions_get() == ()
+    latency = client.get('/latency').get_json()
+    assert (latency['checked'], latency['rejected_stale']) == (1, 1)
+    assert latency['stages_ms']['receive_to_fill']['count'] == 0
+
+
+def test_executed_alert_records_every_stage(client):
+    response = client.post('/trade', json=alert(alert_time=int(time.time() * 1000)))
+
+    assert response.status_code == 200, response.get_json()
+    stages = client.get('/latency').get_json()['stages_ms']
+    for stage in ('alert_to_receive', 'receive_to_send', 'send_to_fill', 'receive_to_fill', 'alert_to_fill'):
+        assert stages[stage]['count'] == 1, stage
+        assert stages[stage]['p50'] is not None
+    assert stages['receive_to_fill']['max'] >= stages['send_to_fill']['max']
+
+
+def test_alert_without_time_skips_the_alert_stages(client):
+    assert client.post('/trade', json=alert()).status_code == 200
+
+    latency = client.get('/latency').get_json()
+    assert latency['without_time'] == 1
+    assert latency['stages_ms']['alert_to_fill']['count'] == 0
+    assert latency['stages_ms']['receive_to_fill']['count'] == 1
+
+
+def test_zero_max_age_disables_the_guard():
+    tracker = AlertLatencyTracker(max_age_seconds=0)
+
+    assert tracker.check(time.time() - 3600, time.time()) is None
+    assert tracker.rejected_stale == 0
+
+
+@pytest.mark.parametrize('value', ['2024-05-01T12:30:00Z', '2024-05-01T12:30:00', 1714566600, '1714566600000'])
+def test_alert_time_formats(value):
+    assert parse_alert_time(value) == 1714566600.0
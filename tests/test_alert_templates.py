@@ -0,0 +1,112 @@
+import pytest
+
+from app.alert_templates import AlertTemplateRegistry, compile_template
+from app.config import DEFAULT_VOLUME, DEFAULT_STOP_LOSS, DEFAULT_TAKE_PROFIT
+
+TEMPLATES = {
+    "tv_strategy": {
+        "format": "json",
+        "fields": {"symbol": "ticker", "side": "signal.order.action", "volume": "signal.order.contracts"},
+        "defaults": {"stop_loss": 50, "strategy": "tv"},
+    },
+    "kv": {
+        "format": "kv",
+        "fields": {"stop_loss": "sl", "take_profit": "tp"},
+    },
+    "text": {
+        "format": "regex",
+        "pattern": r"(?P<side>buy|sell) (?P<volume>[\d.]+) (?P<symbol>\w+)",
+        "flags": "i",
+    },
+}
+
+
+@pytest.fixture
+def registry():
+    return AlertTemplateRegistry(TEMPLATES)
+
+
+def test_default_json_alert_gets_defaults(registry):
+    trade = registry.parse({"symbol": "OANDA:EURUSD", "side": "buy"})
+
+    assert trade['symbol'] == 'OANDA:EURUSD'
+    assert trade['side'] == 'BUY'
+    assert trade['volume'] == DEFAULT_VOLUME
+    assert trade['stop_loss'] == DEFAULT_STOP_LOSS
+    assert trade['take_profit'] == DEFAULT_TAKE_PROFIT
+    assert trade['strategy'] == 'default'
+    assert trade['trailing'] is None
+
+
+def test_json_template_reads_nested_fields_and_template_defaults(registry):
+    alert = {"ticker": "EURUSD", "signal": {"order": {"action": "sell", "contracts": "0.3"}}}
+
+    trade = registry.parse(alert, 'tv_strategy')
+
+    assert (trade['symbol'], trade['side'], trade['volume']) == ('EURUSD', 'SELL', 0.3)
+    assert trade['stop_loss'] == 50
+    assert trade['strategy'] == 'tv'
+
+
+def test_template_selected_by_the_template_key(registry):
+    alert = {"template": "tv_strategy", "ticker": "EURUSD", "signal": {"order": {"action": "buy"}}}
+
+    assert registry.parse(alert)['stop_loss'] == 50
+
+
+def test_kv_template(registry):
+    trade = registry.parse('symbol=GBPUSD side: SELL volume=0.2 sl=40, tp="80" trailing_stop=30', 'kv')
+
+    assert (trade['symbol'], trade['side'], trade['volume']) == ('GBPUSD', 'SELL', 0.2)
+    assert (trade['stop_loss'], trade['take_profit']) == (40.0, 80.0)
+    assert trade['trailing'] == {"trailing_stop": 30.0, "trailing_step": 0.0,
+                                 "break_even": 0.0, "break_even_offset": 0.0}
+
+
+def test_regex_template(registry):
+    trade = registry.parse('Signal: BUY 0.5 XAUUSD now', 'text')
+
+    assert (trade['symbol'], trade['side'], trade['volume']) == ('XAUUSD', 'BUY', 0.5)
+
+
+@pytest.mark.parametrize('alert, message', [
+    ({"side": "buy"}, "Missing required field: symbol"),
+    ({"symbol": "EURUSD"}, "Missing required field: side"),
+    ({"symbol": "EURUSD", "side": "hold"}, "Invalid side"),
+    ({"symbol": "EURUSD", "side": "buy", "volume": 0}, "Invalid volume"),
+    ({"symbol": "EURUSD", "side": "buy", "volume": "lots"}, "Invalid volume"),
+    ({"symbol": "EURUSD", "side": "buy", "risk_pct": 150}, "Invalid risk_pct"),
+    ({"symbol": "EURUSD", "side": "buy", "risk_pct": 1, "stop_loss": 0}, "risk_pct needs a stop_loss"),
+    ({"symbol": "EURUSD", "side": "buy", "trailing_stop": -5}, "Invalid trailing_stop"),
+    ({"symbol": "EURUSD", "side": "buy", "template": "missing"}, "Unknown alert template: missing"),
+])
+def test_invalid_alerts_are_rejected(registry, alert, message):
+    with pytest.raises(ValueError, match=message):
+        registry.parse(alert)
+
+
+def test_text_alerts_need_a_template(registry):
+    with pytest.raises(ValueError, match="Text alerts need a template"):
+        registry.parse('buy 1 EURUSD')
+    with pytest.raises(ValueError, match="expects a text body"):
+        registry.parse({"symbol": "EURUSD", "side": "buy"}, 'kv')
+    with pytest.raises(ValueError, match="does not match template text"):
+        registry.parse('close everything', 'text')
+
+
+@pytest.mark.parametrize('spec, message', [
+    ({"format": "xml"}, "unknown format xml"),
+    ({"fields": {"lots": "qty"}}, "unknown field lots"),
+    ({"format": "regex"}, "regex format needs a pattern"),
+    ({"defaults": {"volume": "abc"}}, "could not convert"),
+])
+def test_invalid_templates_are_rejected_at_compile_time(spec, message):
+    with pytest.raises(ValueError, match=message):
+        compile_template('bad', spec)
+
+
+def test_volume_set_tells_a_chosen_volume_from_the_default(registry):
+    assert registry.parse({"symbol": "EURUSD", "side": "reverse"})['volume_set'] is False
+    assert registry.parse({"symbol": "EURUSD", "side": "reverse", "volume": 0.5})['volume_set'] is True
+    parse = compile_template('fixed', {"defaults": {"volume": 1}})
+    assert parse({"symbol": "EURUSD", "side": "reverse"})['volume_set'] is True
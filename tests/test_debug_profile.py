@@ -0,0 +1,60 @@
+import pytest
+
+from app import server
+
+
+@pytest.fixture
+def profile_client(handler, monkeypatch):
+    """Build a test client with the given profiler configuration"""
+    def build(enabled=True, token='secret'):
+        monkeypatch.setattr(server, 'DEBUG_PROFILE_ENABLED', enabled)
+        monkeypatch.setattr(server, 'DEBUG_PROFILE_TOKEN', token)
+        app = server.create_app(handler)
+        app.testing = True
+        return app.test_client()
+    return build
+
+
+def test_disabled_profiler_is_not_found(profile_client):
+    client = profile_client(enabled=False)
+
+    assert client.get('/debug/profile?seconds=0.05', headers={'X-Debug-Token': 'secret'}).status_code == 404
+
+
+def test_profiler_without_token_stays_disabled(profile_client, caplog):
+    client = profile_client(token='')
+
+    assert client.get('/debug/profile?seconds=0.05').status_code == 404
+    assert 'DEBUG_PROFILE_TOKEN' in caplog.text
+
+
+@pytest.mark.parametrize('headers', [{}, {'X-Debug-Token': 'wrong'}])
+def test_missing_or_wrong_token_is_rejected(profile_client, headers):
+    client = profile_client()
+
+    assert client.get('/debug/profile?seconds=0.05', headers=headers).status_code == 403
+
+
+def test_token_in_query_string_is_ignored(profile_client):
+    client = profile_client()
+
+    assert client.get('/debug/profile?seconds=0.05&token=secret').status_code == 403
+
+
+def test_authorized_request_returns_samples(profile_client):
+    client = profile_client()
+
+    response = client.get('/debug/profile?seconds=0.05&format=json', headers={'X-Debug-Token': 'secret'})
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body["success"] is True
+    assert 'collapsed' in body
+
+
+def test_window_length_is_bounded(profile_client):
+    client = profile_client()
+
+    response = client.get('/debug/profile?seconds=100000', headers={'X-Debug-Token': 'secret'})
+
+    assert response.status_code == 400
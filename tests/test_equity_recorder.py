@@ -0,0 +1,71 @@
+import os
+import time
+
+from app.equity_recorder import EquityRecorder, RECORD_DTYPE
+
+
+def record(handler, path, capacity, samples):
+    recorder = EquityRecorder(handler.account, path=str(path), capacity=capacity, sample_seconds=1)
+    recorder._open()
+    for _ in range(samples):
+        assert recorder.sample()
+    recorder.stop()
+    return recorder
+
+
+def test_query_without_a_file_creates_nothing(handler, tmp_path):
+    path = tmp_path / 'equity.ring'
+    recorder = EquityRecorder(handler.account, path=str(path), capacity=10)
+
+    assert recorder.query(0, time.time() + 1)['count'] == 0
+    assert not path.exists()
+
+
+def test_readonly_query_does_not_modify_the_file(handler, tmp_path):
+    path = tmp_path / 'equity.ring'
+    record(handler, path, capacity=10, samples=3)
+    before = path.read_bytes()
+
+    # A standby configured with another capacity only reads the file
+    reader = EquityRecorder(handler.account, path=str(path), capacity=1000, sample_seconds=1)
+    result = reader.query(0, time.time() + 1, resolution=3600)
+
+    assert result['count'] == 1
+    assert result['close'] == [handler.account.get()['equity']]
+    assert path.read_bytes() == before
+    assert reader.get_stats()['records'] == 3 and reader.get_stats()['capacity'] == 10
+
+
+def test_invalid_file_is_not_read_or_rewritten(handler, tmp_path):
+    path = tmp_path / 'equity.ring'
+    path.write_bytes(b'not a ring file' * 10)
+    reader = EquityRecorder(handler.account, path=str(path), capacity=10)
+
+    assert reader.query(0, time.time() + 1)['count'] == 0
+    assert path.read_bytes() == b'not a ring file' * 10
+
+
+def test_reopening_keeps_the_file_capacity(handler, tmp_path):
+    path = tmp_path / 'equity.ring'
+    record(handler, path, capacity=10, samples=12)
+
+    recorder = record(handler, path, capacity=50, samples=1)
+
+    assert recorder.capacity == 10
+    assert os.path.getsize(path) == 64 + 10 * RECORD_DTYPE.itemsize
+    assert recorder.get_stats()['records'] == 10
+    assert recorder.query(0, time.time() + 1, resolution=1)['count'] >= 1
+
+
+def test_start_after_a_readonly_query_reopens_for_writing(handler, tmp_path):
+    path = tmp_path / 'equity.ring'
+    record(handler, path, capacity=10, samples=2)
+    recorder = EquityRecorder(handler.account, path=str(path), capacity=10, sample_seconds=3600)
+    recorder.query(0, time.time() + 1)
+
+    recorder.start()
+    try:
+        assert recorder.sample()
+    finally:
+        recorder.stop()
+    assert recorder.get_stats()['records'] == 3
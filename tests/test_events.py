@@ -0,0 +1,57 @@
+import json
+
+from app.events import EventBroker
+from app.tick_feed import TickFeed
+
+
+def drain(subscriber):
+    frames = []
+    while not subscriber.queue.empty():
+        frames.append(subscriber.queue.get_nowait())
+    return frames
+
+
+def parse(frame):
+    event, data = frame.strip().split('\n')
+    return event[len('event: '):], json.loads(data[len('data: '):])
+
+
+def test_slow_client_is_dropped_when_its_queue_overflows():
+    broker = EventBroker(TickFeed(), queue_size=2)
+    slow = broker.subscribe(topics=('orders',))
+    fast = broker.subscribe(topics=('orders',))
+
+    for n in range(3):
+        broker.publish('orders', 'result', {"n": n})
+        drain(fast)
+
+    assert slow.dropped and not fast.dropped
+    assert broker.get_stats()["clients_dropped"] == 1
+
+    frames = list(broker.stream(slow, keepalive=0.01))
+    assert [parse(f)[0] for f in frames] == ['hello', 'dropped']
+    assert broker.get_stats()["clients"] == 1
+
+
+def test_client_limit_is_enforced():
+    broker = EventBroker(TickFeed(), max_clients=1)
+
+    assert broker.subscribe(topics=('orders',)) is not None
+    assert broker.subscribe(topics=('orders',)) is None
+
+
+def test_position_events_come_from_account_refreshes(handler):
+    subscriber = handler.events.subscribe(topics=('positions',))
+    handler.account.refresh()
+
+    ticket = handler.place_trade('EURUSD', 'BUY', volume=0.1, stop_loss=0, take_profit=0)['details']['order']
+    handler.account.refresh()
+    handler.modify_position(ticket, stop_loss=1.0)
+    handler.account.refresh()
+    handler.close_position(ticket)
+    handler.account.refresh()
+
+    events = [parse(f) for f in drain(subscriber)]
+    assert [(name, data["ticket"]) for name, data in events] == [
+        ('open', ticket), ('modify', ticket), ('close', ticket)]
+    assert events[1][1]["sl"] == 1.0
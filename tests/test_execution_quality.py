@@ -0,0 +1,49 @@
+import pytest
+
+from app import sim_backend as mt5
+from app.execution_quality import ExecutionQualityRecorder
+
+POINT = 1e-5
+
+
+def request(order_type, price):
+    return {"action": mt5.TRADE_ACTION_DEAL, "symbol": "EURUSD", "type": order_type,
+            "price": price, "deviation": 10}
+
+
+def test_slippage_sign_follows_the_order_type():
+    recorder = ExecutionQualityRecorder()
+    buy, sell = request(mt5.ORDER_TYPE_BUY, 1.10000), request(mt5.ORDER_TYPE_SELL, 1.10000)
+
+    # Both fills are 2 points worse than requested: the buy paid more, the sell got less
+    recorder.record('EURUSD', buy, mt5._result(mt5.TRADE_RETCODE_DONE, buy, price=1.10002), 5.0, POINT)
+    recorder.record('EURUSD', sell, mt5._result(mt5.TRADE_RETCODE_DONE, sell, price=1.09998), 5.0, POINT)
+
+    slippage = recorder.summary('EURUSD')['symbols']['EURUSD']['slippage_points']
+    assert slippage['count'] == 2
+    assert slippage['min'] == pytest.approx(2.0) and slippage['max'] == pytest.approx(2.0)
+
+
+def test_fill_rate_counts_success_retcodes_only():
+    recorder = ExecutionQualityRecorder()
+    buy = request(mt5.ORDER_TYPE_BUY, 1.10000)
+
+    recorder.record('EURUSD', buy, mt5._result(mt5.TRADE_RETCODE_DONE, buy, price=1.10001), 5.0, POINT)
+    # Rejected, yet the result carries a price
+    recorder.record('EURUSD', buy, mt5._result(mt5.TRADE_RETCODE_REQUOTE, buy, price=1.10050), 5.0, POINT)
+    recorder.record('EURUSD', buy, None, 5.0, POINT)
+
+    stats = recorder.summary()['symbols']['EURUSD']
+    assert stats['fill_rate'] == pytest.approx(1 / 3, abs=1e-4)
+    assert stats['slippage_points']['count'] == 1
+    assert stats['deviation']['count'] == 1
+    assert stats['retcodes'] == {"0": 1, str(mt5.TRADE_RETCODE_REQUOTE): 1, str(mt5.TRADE_RETCODE_DONE): 1}
+
+
+def test_sim_orders_are_recorded(handler):
+    handler.place_trade('EURUSD', 'BUY', volume=0.1)
+    handler.place_trade('EURUSD', 'SELL', volume=0.1)
+
+    stats = handler.execution_quality.summary('EURUSD')['symbols']['EURUSD']
+    assert stats['orders'] == 2
+    assert stats['fill_rate'] == 1.0
@@ -0,0 +1,169 @@
+import threading
+import time
+
+import pytest
+
+from app.failover import FailoverManager, FileLease, ACTIVE, STANDBY
+from app.journal import OrderJournal, journal_files
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_lease_is_exclusive_until_released(tmp_path):
+    path = str(tmp_path / 'failover.lease')
+    a, b = FileLease('a', path, ttl=5), FileLease('b', path, ttl=5)
+
+    assert a.try_acquire()[0] and a.held()
+    held, previous = b.try_acquire()
+    assert not held and not b.held()
+    assert previous['node'] == 'a' and b.holder == 'a'
+    assert a.try_acquire()[0]  # Renewal
+
+    a.release()
+    assert not a.held()
+    held, previous = b.try_acquire()
+    assert held and previous == {"node": "a", "expires": 0.0}
+    assert not a.try_acquire()[0]
+
+
+def test_lease_expires_without_renewal(tmp_path):
+    path = str(tmp_path / 'failover.lease')
+    a, b = FileLease('a', path, ttl=0.2), FileLease('b', path, ttl=0.2)
+
+    assert a.try_acquire()[0]
+    assert not b.try_acquire()[0]
+    time.sleep(0.25)
+
+    assert not a.held()
+    assert b.try_acquire()[0]
+    assert not a.try_acquire()[0]
+
+
+def test_concurrent_acquisition_has_one_winner(tmp_path):
+    path = str(tmp_path / 'failover.lease')
+    leases = [FileLease(f"node-{i}", path, ttl=5) for i in range(8)]
+    barrier = threading.Barrier(len(leases))
+    winners = []
+
+    def compete(lease):
+        barrier.wait()
+        if lease.try_acquire()[0]:
+            winners.append(lease.node)
+    threads = [threading.Thread(target=compete, args=(lease,)) for lease in leases]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(winners) == 1
+
+
+def test_journal_rotation_is_followed_without_gaps(tmp_path):
+    path = str(tmp_path / 'orders.jsonl')
+    writer = OrderJournal(path, node='a', max_bytes=400)
+    reader = OrderJournal(path, node='b')
+    seen, cursor = [], None
+
+    for i in range(30):
+        writer.append('alert', alert={"i": i})
+        if i % 3 == 0:  # More often than the file rotates
+            records, cursor = reader.read(cursor)
+            seen += [r['seq'] for r in records]
+    records, cursor = reader.read(cursor)
+    seen += [r['seq'] for r in records]
+
+    assert writer.rotations > 0
+    assert seen == list(range(1, 31))
+    assert journal_files(path) == [path + '.1', path]
+    # A restarted writer continues the numbering
+    assert OrderJournal(path, node='a').seq == 30
+
+
+def test_end_cursor_skips_what_was_already_written(tmp_path):
+    path = str(tmp_path / 'orders.jsonl')
+    journal = OrderJournal(path, node='a')
+    assert journal.read(journal.end()) == ([], (None, 0))
+    for i in range(3):
+        journal.append('alert', alert={"i": i})
+
+    cursor = journal.end()
+    journal.append('result', alert_seq=3)
+    records, _ = journal.read(cursor)
+
+    assert [r['seq'] for r in records] == [4]
+
+
+@pytest.fixture
+def second_handler(sim_account):
+    from app.mt5_handler import MT5Handler
+    return MT5Handler()
+
+
+def manager(handler, tmp_path, node):
+    journal = OrderJournal(str(tmp_path / 'orders.jsonl'), node=node)
+    lease = FileLease(node, str(tmp_path / 'failover.lease'), ttl=0.3)
+    return FailoverManager(handler, journal, node, enabled=True, poll_seconds=0.05, lease=lease)
+
+
+def test_standby_takes_over_and_reconciles_in_flight_alerts(handler, second_handler, tmp_path):
+    active = manager(handler, tmp_path, 'a')
+    standby = manager(second_handler, tmp_path, 'b')
+    roles = []
+    standby.add_listener(roles.append)
+    try:
+        active.start()
+        assert wait_for(active.is_active)
+        standby.start()
+        time.sleep(0.2)
+        assert not standby.is_active()
+
+        # An alert reaches the terminal but the active instance dies before journaling the result
+        alert = {"symbol": "EURUSD", "side": "BUY", "volume": 0.1, "strategy": "default", "trailing": None}
+        seq = active.journal.append('alert', received_at=time.time(), alert=alert)
+        assert wait_for(lambda: standby.followed >= 1)
+        ticket = handler.place_trade('EURUSD', 'BUY', volume=0.1)['details']['order']
+        active._stop.set()  # Crash: stops renewing without releasing the lease
+
+        assert wait_for(standby.is_active)
+        assert roles == [True]
+        assert standby.get_status()['role'] == ACTIVE
+        takeover = standby.last_takeover
+        assert takeover['previous_node'] == 'a'
+        assert takeover['reconciled'] == [{"alert_seq": seq, "symbol": "EURUSD", "side": "BUY",
+                                           "status": "filled", "tickets": [ticket]}]
+        # The successor numbers its records after the predecessor's
+        assert standby.journal.append('result', alert_seq=0) > seq + 1
+        assert active.get_status()['role'] == STANDBY
+    finally:
+        active.stop()
+        standby.stop()
+        second_handler.close_session()
+
+
+def test_clean_stop_hands_over_immediately(handler, second_handler, tmp_path):
+    first = manager(handler, tmp_path, 'a')
+    second = manager(second_handler, tmp_path, 'b')
+    second.lease.ttl = 60  # Only a release lets it take over within the test
+    first.lease.ttl = 60
+    try:
+        first.start()
+        assert wait_for(first.is_active)
+        second.start()
+        first.stop()
+        assert wait_for(second.is_active, timeout=2)
+    finally:
+        second.stop()
+        second_handler.close_session()
+
+
+def test_failover_is_not_started_when_disabled(client):
+    assert not [t for t in threading.enumerate() if t.name == 'failover']
+    assert client.get('/failover').get_json()['role'] == ACTIVE
+    assert client.post('/trade', json={"symbol": "EURUSD", "side": "buy", "volume": 0.1}).status_code == 200
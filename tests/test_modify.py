@@ -0,0 +1,38 @@
+from app import sim_backend as mt5
+
+
+def test_sltp_changes_keep_the_position_magic(handler, monkeypatch):
+    result = handler.place_trade('EURUSD', 'BUY', volume=0.1, stop_loss=100, take_profit=200, strategy='swing')
+    ticket = result['details']['order']
+    magic = handler.strategies.magic('swing')
+    sent = []
+    order_send = mt5.order_send
+    monkeypatch.setattr(mt5, 'order_send', lambda request: sent.append(request) or order_send(request))
+
+    assert handler.modify_positions(tickets=[ticket], sl_points=50)['success']
+    assert handler.modify_position(ticket, take_profit=0)['success']
+
+    assert [r['magic'] for r in sent] == [magic, magic]
+    assert magic != handler.strategies.magic('default')
+
+
+def test_unknown_side_is_rejected(handler, client, sim_account):
+    ticket = handler.place_trade('EURUSD', 'SELL', volume=0.1, stop_loss=100)['details']['order']
+    sl = sim_account.positions_get(ticket=ticket)[0].sl
+
+    result = handler.modify_positions(side='BYU', sl_points=50)
+    assert not result['success'] and result['message'].startswith("Invalid side: BYU")
+
+    response = client.post('/positions/modify', json={"side": "BYU", "sl_points": 50})
+    assert response.status_code == 400
+    assert sim_account.positions_get(ticket=ticket)[0].sl == sl
+
+    response = client.post('/positions/modify', json={"side": "short", "sl_points": 50})
+    assert response.status_code == 200
+    assert sim_account.positions_get(ticket=ticket)[0].sl != sl
+
+
+def test_non_object_modify_body_is_rejected(handler, client):
+    for body in ([{"all": True, "sl_points": 50}], 5, "all"):
+        assert client.post('/positions/modify', json=body).status_code == 400
+        assert client.post('/strategies/default/modify', json=body).status_code == 400
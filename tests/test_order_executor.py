@@ -0,0 +1,134 @@
+import time
+
+import pytest
+
+from app import sim_backend as mt5
+from app.order_executor import (
+    OrderRetryEngine, classify_retcode, SUCCESS, REPRICE, REFILL, FATAL
+)
+
+
+def build_market_buy(symbol):
+    """Request builder pricing a 0.1 lot market buy the way place_trade() does"""
+    def build_request(tick, deviation, filling):
+        return {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": symbol,
+            "volume": 0.1,
+            "type": mt5.ORDER_TYPE_BUY,
+            "price": tick.ask,
+            "deviation": deviation,
+            "magic": 1,
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": filling,
+        }
+    return build_request
+
+
+def scripted_order_send(monkeypatch, retcodes):
+    """Answer the next order_send() calls with the given retcodes, then with the simulator"""
+    send = mt5.order_send
+    sent = []
+
+    def order_send(request):
+        sent.append(dict(request))
+        if retcodes:
+            return mt5._result(retcodes.pop(0), request)
+        return send(request)
+
+    monkeypatch.setattr(mt5, 'order_send', order_send)
+    return sent
+
+
+@pytest.mark.parametrize('retcode, outcome', [
+    (mt5.TRADE_RETCODE_DONE, SUCCESS),
+    (mt5.TRADE_RETCODE_DONE_PARTIAL, SUCCESS),
+    (mt5.TRADE_RETCODE_PLACED, SUCCESS),
+    (mt5.TRADE_RETCODE_REQUOTE, REPRICE),
+    (mt5.TRADE_RETCODE_PRICE_CHANGED, REPRICE),
+    (mt5.TRADE_RETCODE_PRICE_OFF, REPRICE),
+    (mt5.TRADE_RETCODE_TOO_MANY_REQUESTS, REPRICE),
+    (mt5.TRADE_RETCODE_INVALID_FILL, REFILL),
+    (mt5.TRADE_RETCODE_TIMEOUT, FATAL),
+    (mt5.TRADE_RETCODE_CONNECTION, FATAL),
+    (mt5.TRADE_RETCODE_NO_MONEY, FATAL),
+    (mt5.TRADE_RETCODE_INVALID_VOLUME, FATAL),
+])
+def test_classify_retcode(retcode, outcome):
+    assert classify_retcode(retcode) == outcome
+
+
+def test_requote_is_repriced_from_a_fresh_tick():
+    engine = OrderRetryEngine(backoff_ms=0)
+    info = mt5.symbol_info('EURUSD')
+    tick = mt5.symbol_info_tick('EURUSD')
+    stale = tick._replace(ask=round(tick.ask + 100 * info.point, info.digits))
+
+    result, execution = engine.execute(info, build_market_buy('EURUSD'), tick=stale)
+
+    assert execution['retcodes'] == [mt5.TRADE_RETCODE_REQUOTE, mt5.TRADE_RETCODE_DONE]
+    assert execution['attempts'] == 2
+    assert result.price != stale.ask
+    assert len(mt5.positions_get(symbol='EURUSD')) == 1
+    assert engine.get_stats()['symbols']['EURUSD']['requotes'] == 1
+
+
+def test_rejected_filling_mode_is_replaced_and_remembered(monkeypatch):
+    engine = OrderRetryEngine(backoff_ms=0)
+    info = mt5.symbol_info('EURUSD')  # Supports IOC and FOK, IOC is tried first
+    sent = scripted_order_send(monkeypatch, [mt5.TRADE_RETCODE_INVALID_FILL])
+
+    result, execution = engine.execute(info, build_market_buy('EURUSD'))
+    assert result.retcode == mt5.TRADE_RETCODE_DONE
+    assert [r['type_filling'] for r in sent] == [mt5.ORDER_FILLING_IOC, mt5.ORDER_FILLING_FOK]
+
+    # The working mode is used straight away for the next order
+    result, execution = engine.execute(info, build_market_buy('EURUSD'))
+    assert execution['attempts'] == 1
+    assert sent[-1]['type_filling'] == mt5.ORDER_FILLING_FOK
+
+
+def test_no_filling_mode_left():
+    engine = OrderRetryEngine(backoff_ms=0)
+    info = mt5.symbol_info('EURUSD')._replace(filling_mode=0)  # Only RETURN, which the simulator rejects
+
+    result, execution = engine.execute(info, build_market_buy('EURUSD'))
+
+    assert result.retcode == mt5.TRADE_RETCODE_INVALID_FILL
+    assert execution['attempts'] == 1
+    assert not mt5.positions_get()
+
+
+@pytest.mark.parametrize('retcode', [mt5.TRADE_RETCODE_TIMEOUT, mt5.TRADE_RETCODE_CONNECTION])
+def test_possibly_executed_orders_are_not_resent(monkeypatch, retcode):
+    engine = OrderRetryEngine(backoff_ms=0)
+    sent = scripted_order_send(monkeypatch, [retcode])
+
+    result, execution = engine.execute(mt5.symbol_info('EURUSD'), build_market_buy('EURUSD'))
+
+    assert result.retcode == retcode
+    assert len(sent) == 1
+    assert execution['attempts'] == 1
+
+
+def test_repricing_stops_at_max_attempts(monkeypatch):
+    engine = OrderRetryEngine(max_attempts=3, backoff_ms=0, base_deviation=30, max_deviation=50)
+    scripted_order_send(monkeypatch, [mt5.TRADE_RETCODE_REQUOTE] * 5)
+
+    result, execution = engine.execute(mt5.symbol_info('EURUSD'), build_market_buy('EURUSD'))
+
+    assert execution['retcodes'] == [mt5.TRADE_RETCODE_REQUOTE] * 3
+    assert execution['deviation'] == 50  # Widened after every requote, capped at max_deviation
+    assert engine.get_stats()['orders_filled'] == 0
+
+
+def test_nothing_is_sent_after_the_deadline(monkeypatch):
+    engine = OrderRetryEngine(backoff_ms=0)
+    sent = scripted_order_send(monkeypatch, [])
+
+    result, execution = engine.execute(mt5.symbol_info('EURUSD'), build_market_buy('EURUSD'),
+                                       deadline=time.monotonic() - 1)
+
+    assert result is None
+    assert execution['expired'] and execution['attempts'] == 0
+    assert sent == []
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from app.order_pipeline import OrderPipeline, BARRIER_KEY
+
+
+def recorder(log, lock):
+    """Job function that logs its start and end around a short sleep"""
+    def job(name, delay=0.01, gate=None):
+        with lock:
+            log.append(('start', name))
+        if gate is not None:
+            assert gate.wait(5)
+        time.sleep(delay)
+        with lock:
+            log.append(('end', name))
+        return name
+    return job
+
+
+def test_same_symbol_runs_in_arrival_order_one_at_a_time():
+    pipeline = OrderPipeline(workers=4)
+    log, lock = [], threading.Lock()
+    job = recorder(log, lock)
+
+    jobs = [pipeline.submit(lane, 'EURUSD', job, f"eur-{i}")
+            for i, lane in enumerate(('open', 'open', 'close', 'modify', 'open'))]
+    assert [j.wait(5) for j in jobs] == [f"eur-{i}" for i in range(5)]
+
+    # Strictly sequential despite four workers and mixed lanes
+    expected = []
+    for i in range(5):
+        expected += [('start', f"eur-{i}"), ('end', f"eur-{i}")]
+    assert log == expected
+
+
+def test_other_symbols_run_in_parallel():
+    pipeline = OrderPipeline(workers=2)
+    gate = threading.Event()
+    log, lock = [], threading.Lock()
+    job = recorder(log, lock)
+
+    slow = pipeline.submit('open', 'EURUSD', job, 'eur', gate=gate)
+    assert pipeline.run('open', 'GBPUSD', job, 'gbp') == 'gbp'
+    gate.set()
+    slow.wait(5)
+
+    assert log.index(('end', 'gbp')) < log.index(('end', 'eur'))
+
+
+def test_barrier_waits_for_earlier_jobs_and_holds_back_later_ones():
+    pipeline = OrderPipeline(workers=4)
+    gate = threading.Event()
+    log, lock = [], threading.Lock()
+    job = recorder(log, lock)
+
+    before = pipeline.submit('open', 'EURUSD', job, 'before', gate=gate)
+    barrier = pipeline.submit('modify', BARRIER_KEY, job, 'barrier')
+    after = [pipeline.submit('close', symbol, job, f"after-{symbol}") for symbol in ('GBPUSD', 'EURUSD')]
+
+    time.sleep(0.1)
+    # Neither the barrier nor the later (more urgent) closes overtook the running entry
+    assert log == [('start', 'before')]
+
+    gate.set()
+    for j in [before, barrier] + after:
+        j.wait(5)
+
+    assert log[:4] == [('start', 'before'), ('end', 'before'), ('start', 'barrier'), ('end', 'barrier')]
+    assert sorted(log[4:]) == sorted([('start', 'after-GBPUSD'), ('end', 'after-GBPUSD'),
+                                      ('start', 'after-EURUSD'), ('end', 'after-EURUSD')])
+
+
+def test_consecutive_barriers_run_in_order():
+    pipeline = OrderPipeline(workers=3)
+    log, lock = [], threading.Lock()
+    job = recorder(log, lock)
+
+    jobs = [pipeline.submit('open', 'EURUSD', job, 'a'),
+            pipeline.submit('modify', BARRIER_KEY, job, 'b1'),
+            pipeline.submit('modify', BARRIER_KEY, job, 'b2'),
+            pipeline.submit('open', 'GBPUSD', job, 'c')]
+    for j in jobs:
+        j.wait(5)
+
+    assert [name for event, name in log if event == 'start'] == ['a', 'b1', 'b2', 'c']
+    assert pipeline.get_stats()['lanes']['modify']['processed'] == 2
@@ -0,0 +1,94 @@
+import importlib.util
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'scripts', 'replay_alerts.py')
+spec = importlib.util.spec_from_file_location('replay_alerts', SCRIPT)
+replay_alerts = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(replay_alerts)
+
+DAY = 19845  # 2024-05-02, a past UTC day so the cache is used as it is
+START_MS = DAY * replay_alerts.DAY_MS + 12 * 3600 * 1000
+
+
+@pytest.fixture
+def tick_cache(tmp_path):
+    """Offline cache with 200 s of EURUSD ticks every 100 ms, bid rising one point per tick"""
+    folder = tmp_path / 'ticks' / 'EURUSD'
+    folder.mkdir(parents=True)
+    ticks = np.zeros(2000, dtype=replay_alerts.TICK_DTYPE)
+    ticks['time_msc'] = START_MS + np.arange(2000) * 100
+    ticks['bid'] = np.round(1.1 + np.arange(2000) * 0.00001, 5)
+    ticks['ask'] = np.round(ticks['bid'] + 0.0001, 5)
+    np.save(folder / '20240502.npy', ticks)
+    (folder / 'symbol.json').write_text(json.dumps({
+        "point": 0.00001, "digits": 5, "trade_tick_value": 1.0, "trade_tick_size": 0.00001,
+        "volume_step": 0.01, "volume_min": 0.01, "volume_max": 100.0}))
+    return replay_alerts.TickCache(str(tmp_path / 'ticks'), online=False)
+
+
+def journaled(tmp_path, *alerts):
+    path = tmp_path / 'orders.jsonl'
+    with open(path, 'w') as f:
+        for seq, (received_at, alert) in enumerate(alerts, 1):
+            f.write(json.dumps({"seq": seq, "type": "alert", "received_at": received_at, "alert": alert}) + '\n')
+    return replay_alerts.read_journal_alerts(str(path))
+
+
+def canonical(side, take_profit=50, stop_loss=100):
+    return {"symbol": "EURUSD", "side": side, "volume": 0.1, "stop_loss": stop_loss,
+            "take_profit": take_profit, "risk_pct": 0.0, "alert_time": 0.0}
+
+
+def test_replay_fills_and_exits_at_take_profit(tmp_path, tick_cache):
+    received_at = START_MS / 1000.0 + 10
+    entries = journaled(tmp_path, (received_at, canonical('BUY')), (received_at, canonical('REVERSE')),
+                        (START_MS / 1000.0 + 3600, canonical('BUY')))
+    alerts, skipped = replay_alerts.parse_alerts(entries, replay_alerts.SymbolResolver())
+
+    report, trades = replay_alerts.replay(alerts, tick_cache, [0, 250], [10], max_hold_hours=1)
+
+    assert skipped == {"invalid": 0, "reverse": 1}
+    assert report["ticks"] == {"EURUSD": 2000}
+    assert report["cache"] == {"downloaded_days": 0, "cached_days": 1}
+    instant, delayed = report["runs"]
+    assert instant["statuses"] == {"filled": 1, "no_ticks": 1}
+    assert instant["exits"] == {"tp": 1}
+    # 50 points of take profit from the requested ask, 0.1 lot at 1 USD per point and lot
+    assert instant["profit"] == pytest.approx(5.0)
+    assert instant["slippage_points"]["max"] == 0
+    # 250 ms later the ask is 2 points higher, inside the deviation
+    assert delayed["slippage_points"]["max"] == pytest.approx(2)
+    assert len(trades) == 4
+
+
+def test_moves_beyond_the_deviation_are_requoted(tmp_path, tick_cache):
+    entries = journaled(tmp_path, (START_MS / 1000.0 + 10, canonical('SELL')))
+    alerts, _ = replay_alerts.parse_alerts(entries, replay_alerts.SymbolResolver())
+
+    report, _ = replay_alerts.replay(alerts, tick_cache, [250], [1], max_hold_hours=1)
+
+    run = report["runs"][0]
+    assert run["statuses"] == {"filled": 1}
+    assert run["attempts_mean"] > 1
+
+
+def test_log_lines_are_read_as_alerts(tmp_path):
+    received_at = START_MS / 1000.0 + 10
+    stamp = datetime.fromtimestamp(received_at).strftime('%Y-%m-%d %H:%M:%S')
+    log = tmp_path / 'server.log'
+    log.write_text(f"{stamp},250 - app.server - INFO - Received webhook data: "
+                   f"{{'symbol': 'EURUSD', 'side': 'buy', 'volume': 0.1}}\n"
+                   f"{stamp},300 - app.server - INFO - Trade executed successfully\n")
+
+    entries = replay_alerts.read_log_alerts([str(log)])
+    alerts, skipped = replay_alerts.parse_alerts(entries, replay_alerts.SymbolResolver())
+
+    assert len(entries) == 1
+    assert entries[0][0] == pytest.approx(received_at + 0.25)
+    assert list(alerts["direction"]) == [1]
+    assert skipped == {"invalid": 0, "reverse": 0}
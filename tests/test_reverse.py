@@ -0,0 +1,89 @@
+import pytest
+
+from app import sim_backend as mt5
+
+
+def open_long(handler, volume=0.1):
+    return handler.place_trade('EURUSD', 'BUY', volume=volume, stop_loss=0, take_profit=0)['details']['order']
+
+
+def net_volume(sim):
+    return round(sum(p.volume if p.type == sim.POSITION_TYPE_BUY else -p.volume
+                     for p in sim.positions_get(symbol='EURUSD')), 8)
+
+
+@pytest.mark.parametrize('margin_mode', [mt5.ACCOUNT_MARGIN_MODE_RETAIL_HEDGING,
+                                         mt5.ACCOUNT_MARGIN_MODE_RETAIL_NETTING])
+def test_reverse_honours_the_alert_volume(handler, client, sim_account, monkeypatch, margin_mode):
+    monkeypatch.setattr(sim_account, '_MARGIN_MODE', margin_mode)
+    handler.account.refresh()
+    open_long(handler)
+
+    response = client.post('/trade', json={"symbol": "EURUSD", "side": "reverse", "volume": 0.5})
+
+    assert response.status_code == 200, response.get_json()
+    positions = sim_account.positions_get(symbol='EURUSD')
+    assert len(positions) == 1
+    assert (positions[0].type, positions[0].volume) == (mt5.POSITION_TYPE_SELL, 0.5)
+
+
+def test_reverse_without_volume_mirrors_the_open_volume(handler, client, sim_account):
+    open_long(handler, volume=0.3)
+
+    response = client.post('/trade', json={"symbol": "EURUSD", "side": "reverse"})
+
+    assert response.status_code == 200, response.get_json()
+    assert net_volume(sim_account) == -0.3
+
+
+def test_reverse_reports_the_new_position_and_exposure(handler, sim_account):
+    old = open_long(handler)
+
+    result = handler.reverse_position('EURUSD', volume=0.2)
+
+    assert result['success']
+    assert result['settled'] == [old]
+    assert result['exposure'] == {"volume": -0.2, "tickets": [result['position']]}
+
+
+def test_failed_close_by_closes_the_new_leg(handler, sim_account, monkeypatch):
+    old = open_long(handler)
+    order_send = sim_account.order_send
+
+    def reject_close_by(request):
+        if request['action'] == mt5.TRADE_ACTION_CLOSE_BY:
+            return mt5._result(mt5.TRADE_RETCODE_REJECT, request)
+        return order_send(request)
+    monkeypatch.setattr(sim_account, 'order_send', reject_close_by)
+
+    result = handler.reverse_position('EURUSD', volume=0.2)
+
+    assert not result['success']
+    assert result['rolled_back']
+    assert "closed again" in result['message']
+    # Only the original long is left, and the response says so
+    assert [p.ticket for p in sim_account.positions_get(symbol='EURUSD')] == [old]
+    assert result['exposure'] == {"volume": 0.1, "tickets": [old]}
+
+
+def test_reverse_refuses_when_the_margin_mode_is_unknown(handler, sim_account, monkeypatch):
+    old = open_long(handler)
+    monkeypatch.setattr(handler.account, 'get', lambda: None)
+    monkeypatch.setattr(sim_account, 'account_info', lambda: None)
+
+    result = handler.reverse_position('EURUSD', volume=0.2)
+
+    assert not result['success']
+    assert result['message'] == "Account margin mode unknown, not reversing"
+    assert [(p.ticket, p.volume) for p in sim_account.positions_get(symbol='EURUSD')] == [(old, 0.1)]
+
+
+def test_reverse_reads_the_margin_mode_without_a_snapshot(handler, sim_account, monkeypatch):
+    monkeypatch.setattr(sim_account, '_MARGIN_MODE', mt5.ACCOUNT_MARGIN_MODE_RETAIL_NETTING)
+    open_long(handler)
+    monkeypatch.setattr(handler.account, 'get', lambda: None)
+
+    result = handler.reverse_position('EURUSD', volume=0.2)
+
+    assert result['success'], result['message']
+    assert net_volume(sim_account) == -0.2
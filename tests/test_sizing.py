@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from app.sizing import risk_volumes
+
+# EURUSD-like contract: 1e-5 point, 1.0 per point per lot, 0.01 lot steps between 0.01 and 100
+FX = dict(point=1e-5, tick_value=1.0, tick_size=1e-5, volume_step=0.01, volume_min=0.01, volume_max=100.0)
+
+
+def size(equity, risk_pct, stop_points, **overrides):
+    spec = dict(FX, **overrides)
+    return risk_volumes(equity, risk_pct, stop_points, spec['point'], spec['tick_value'], spec['tick_size'],
+                        spec['volume_step'], spec['volume_min'], spec['volume_max'])
+
+
+def test_exact_multiple_of_the_step_is_kept():
+    # 1% of 10000 over a 500 point stop at 1.0 per point
+    assert size(10000, 1, 500).tolist() == 0.2
+
+
+def test_rounds_down_to_the_volume_step():
+    # 100 / 300 = 0.3333 lots; rounding up would risk more than 1%
+    assert size(10000, 1, 300).tolist() == 0.33
+    assert size(10000, 1, 300, volume_step=0.1).tolist() == 0.3
+
+
+def test_float_noise_is_trimmed():
+    # 0.3 / 0.1 is 2.9999999999999996 in floating point; the result must still be exactly 0.3
+    volume = size(10000, 3, 1000, volume_step=0.1).tolist()
+    assert volume == 0.3
+    assert repr(volume) == '0.3'
+
+
+def test_capped_at_volume_max():
+    assert size(1_000_000, 10, 10, volume_max=50.0).tolist() == 50.0
+
+
+def test_below_volume_min_gives_zero():
+    assert size(100, 0.5, 500).tolist() == 0.0
+    assert size(10000, 1, 500, volume_min=0.5).tolist() == 0.0
+
+
+@pytest.mark.parametrize('overrides, stop_points', [
+    ({}, 0),
+    ({'tick_size': 0.0}, 500),
+    ({'tick_value': 0.0}, 500),
+    ({'tick_value': float('nan')}, 500),
+])
+def test_invalid_inputs_give_zero(overrides, stop_points):
+    assert size(10000, 1, stop_points, **overrides).tolist() == 0.0
+
+
+def test_basket_is_sized_element_wise():
+    volumes = risk_volumes(10000, [1, 2, 0.01], [500, 300, 500],
+                           [1e-5, 0.01, 1e-5], [1.0, 1.0, 1.0], [1e-5, 0.01, 1e-5],
+                           [0.01, 0.1, 0.01], [0.01, 0.1, 0.01], [100.0, 100.0, 100.0])
+    assert isinstance(volumes, np.ndarray)
+    assert volumes.tolist() == [0.2, 0.6, 0.0]
+
+
+def test_size_trades_uses_the_sim_symbol_specs(handler):
+    trades = [
+        {"symbol": "EURUSD", "side": "BUY", "volume": 0.01, "risk_pct": 1, "stop_loss": 500},
+        {"symbol": "EURUSD", "side": "BUY", "volume": 0.01, "risk_pct": 0.001, "stop_loss": 500},
+        {"symbol": "EURUSD", "side": "BUY", "volume": 0.07},
+    ]
+
+    errors = handler.size_trades(trades)
+
+    assert errors[0] is None and trades[0]['volume'] == 0.2
+    assert "below the minimum volume" in errors[1]
+    assert errors[2] is None and trades[2]['volume'] == 0.07
@@ -0,0 +1,67 @@
+from app.strategies import StrategyIndex
+
+
+def restart_index(handler):
+    """Forget every registered strategy and indexed ticket, then reconcile as at startup"""
+    handler.strategies = StrategyIndex()
+    handler.account.add_listener(handler.strategies.sync)
+    handler.account.refresh()
+
+
+def test_positions_are_found_after_a_restart(handler, client):
+    ticket = handler.place_trade('EURUSD', 'BUY', volume=0.1, strategy='swing')['details']['order']
+    handler.place_trade('GBPUSD', 'SELL', volume=0.2, strategy='other')
+    restart_index(handler)
+
+    response = client.get('/strategies/swing/positions')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [p['ticket'] for p in body['positions']] == [ticket]
+    assert body['magic'] == handler.strategies.lookup('swing')
+    assert handler.strategies.tickets('swing') == {ticket: 'EURUSD'}
+
+
+def test_close_after_a_restart_closes_the_open_positions(handler, client, sim_account):
+    for symbol in ('EURUSD', 'GBPUSD'):
+        handler.place_trade(symbol, 'BUY', volume=0.1, strategy='swing')
+    handler.place_trade('EURUSD', 'BUY', volume=0.1, strategy='other')
+    restart_index(handler)
+
+    response = client.post('/strategies/swing/close')
+
+    assert response.status_code == 200
+    assert response.get_json()['message'] == "Closed 2 of 2 positions"
+    assert [p.magic for p in sim_account.positions_get()] == [handler.strategies.lookup('other')]
+
+
+def test_modify_after_a_restart(handler, client, sim_account):
+    ticket = handler.place_trade('EURUSD', 'BUY', volume=0.1, stop_loss=0, strategy='swing')['details']['order']
+    restart_index(handler)
+
+    response = client.post('/strategies/swing/modify', json={"sl_points": 50})
+
+    assert response.status_code == 200
+    assert sim_account.positions_get(ticket=ticket)[0].sl > 0
+
+
+def test_unknown_strategy_is_404_and_not_registered(handler, client):
+    for method, path in (('get', 'positions'), ('post', 'close'), ('post', 'modify')):
+        kwargs = {'json': {"sl_points": 50}} if path == 'modify' else {}
+        response = getattr(client, method)(f'/strategies/nope/{path}', **kwargs)
+        assert response.status_code == 404
+        assert response.get_json()['message'] == "Unknown strategy: nope"
+
+    assert not handler.strategies.known('nope')
+    assert 'nope' not in [s['strategy'] for s in handler.strategies.get_status()]
+
+
+def test_lookup_does_not_register():
+    index = StrategyIndex({'trend': 310001})
+
+    assert index.known('trend') and index.known('default')
+    assert index.lookup('trend') == 310001
+    derived = index.lookup('swing')
+    assert not index.known('swing')
+    assert index.magic('swing') == derived
+    assert index.known('swing')
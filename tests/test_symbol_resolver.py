@@ -0,0 +1,57 @@
+from app.symbol_resolver import SymbolResolver
+
+
+def test_exact_alias_and_normalized_names_resolve(handler):
+    resolver = SymbolResolver({'GOLD': 'XAUUSD'})
+    resolver.build(handler.symbol_catalog.get())
+
+    assert resolver.to_broker('EURUSD') == 'EURUSD'
+    assert resolver.to_broker('OANDA:EURUSD') == 'EURUSD'
+    assert resolver.to_broker('EUR/USD') == 'EURUSD'
+    assert resolver.to_broker('GOLD') == 'XAUUSD'
+
+
+def test_near_miss_is_not_resolved_but_suggested(handler):
+    assert handler.broker_symbol('BINANCE:BTCUSDT') == 'BTCUSDT'
+    assert handler.symbols.suggest('BINANCE:BTCUSDT')[0] == 'BTCUSD'
+    assert handler.symbols.get_stats()['unresolved'] == 1
+
+
+def test_order_paths_reject_near_misses_with_a_suggestion(handler, sim_account):
+    result = handler.place_trade('BTCUSDT', 'BUY', volume=0.1)
+
+    assert not result['success']
+    assert result['message'].startswith("Symbol BTCUSDT not found. Did you mean BTCUSD")
+    assert sim_account.positions_get() == ()
+
+    trades = [{"symbol": "BTCUSDT", "side": "BUY", "volume": 0.1, "risk_pct": 1, "stop_loss": 500}]
+    assert "Did you mean BTCUSD" in handler.size_trades(trades)[0]
+
+    result = handler.reverse_position('BTCUSDT')
+    assert not result['success'] and "Did you mean BTCUSD" in result['message']
+
+
+def test_no_suggestion_without_a_close_name(handler):
+    assert handler.symbols.suggest('ZZZZZZ') == []
+    assert handler.place_trade('ZZZZZZ', 'BUY', volume=0.1)['message'] == "Symbol ZZZZZZ not found"
+
+
+def test_without_a_symbol_list_the_default_suffix_is_appended():
+    resolver = SymbolResolver(default_suffix='.r')
+
+    assert resolver.to_broker('EURUSD') == 'EURUSD.r'
+    assert resolver.suggest('EURUSD') == []
+
+
+def test_ambiguous_separator_base_is_suggested_not_guessed(sim_account):
+    from app.symbol_catalog import SymbolCatalogSnapshot
+    template = sim_account.symbol_info('US500')
+    symbols = [template._replace(name=name) for name in ('GER40.cash', 'GER40.roll', 'UK100.cash')]
+    resolver = SymbolResolver()
+    resolver.build(SymbolCatalogSnapshot(symbols))
+
+    assert resolver.to_broker('GER40') == 'GER40'
+    assert resolver.get_stats()['unresolved'] == 1
+    assert sorted(resolver.suggest('GER40')) == ['GER40.cash', 'GER40.roll']
+    assert resolver.to_broker('UK100') == 'UK100.cash'
+    assert resolver.to_broker('GER40.roll') == 'GER40.roll'
@@ -0,0 +1,60 @@
+import gzip
+import json
+
+import pytest
+
+
+def test_unfiltered_list_is_served_with_an_etag(client):
+    response = client.get('/symbols')
+
+    assert response.status_code == 200
+    assert 'EURUSD' in response.get_json()["symbols"]
+    etag = response.headers['ETag']
+
+    cached = client.get('/symbols', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+
+def test_unfiltered_list_is_gzipped_when_accepted(client):
+    plain = client.get('/symbols')
+    response = client.get('/symbols', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+
+def test_cursor_paging_returns_every_symbol_once(client):
+    everything = client.get('/symbols').get_json()["symbols"]
+
+    names, cursor = [], None
+    while True:
+        url = '/symbols?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url).get_json()
+        assert len(body["symbols"]) <= 3
+        names += body["symbols"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert names == everything
+
+
+def test_fields_are_projected(client):
+    body = client.get('/symbols?q=usd&fields=digits&limit=2').get_json()
+
+    assert len(body["symbols"]) == 2
+    assert all(set(s) == {"name", "digits"} and 'USD' in s["name"] for s in body["symbols"])
+
+
+@pytest.mark.parametrize('limit', ['0', '-5', 'ten'])
+def test_non_positive_limit_is_rejected(client, limit):
+    response = client.get(f'/symbols?limit={limit}')
+
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get('/symbols?cursor=bogus').status_code == 400
@@ -0,0 +1,69 @@
+from app import sim_backend as mt5
+from app.trailing import TrailingStopEngine
+
+TRAILING = {"trailing_stop": 100.0, "trailing_step": 10.0, "break_even": 0.0, "break_even_offset": 0.0}
+
+
+def open_position(side=mt5.ORDER_TYPE_BUY, symbol='EURUSD', volume=0.1):
+    tick = mt5.symbol_info_tick(symbol)
+    result = mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": symbol, "volume": volume,
+                             "type": side, "price": tick.ask if side == mt5.ORDER_TYPE_BUY else tick.bid,
+                             "deviation": 50, "magic": 1, "type_filling": mt5.ORDER_FILLING_IOC})
+    assert result.retcode == mt5.TRADE_RETCODE_DONE
+    return result.order
+
+
+def test_netting_trade_trails_the_position_ticket(monkeypatch, sim_account):
+    monkeypatch.setattr(mt5, '_MARGIN_MODE', mt5.ACCOUNT_MARGIN_MODE_RETAIL_NETTING)
+    from app.mt5_handler import MT5Handler
+    handler = MT5Handler()
+    try:
+        existing = open_position()
+        result = handler.place_trade('EURUSD', 'BUY', volume=0.1, trailing=TRAILING)
+
+        assert result['success']
+        assert result['details']['order'] != existing
+        assert result['position'] == existing
+        assert [p['ticket'] for p in handler.trailing.get_status()['positions']] == [existing]
+    finally:
+        handler.close_session()
+
+
+def test_untrack_removes_heap_items(handler):
+    engine = handler.trailing
+    ticket = open_position()
+    assert engine.track(ticket, TRAILING)
+    assert engine._long_heaps['EURUSD']
+
+    engine.untrack(ticket)
+
+    assert 'EURUSD' not in engine._long_heaps
+    assert engine.get_status()['tracked'] == 0
+
+
+def test_closed_positions_are_dropped_on_sync(handler):
+    engine = handler.trailing
+    kept, closed = open_position(), open_position()
+    engine.track(kept, TRAILING)
+    engine.track(closed, TRAILING)
+    assert handler.close_position(closed)['success']
+
+    engine.sync(mt5.positions_get())
+
+    assert [p['ticket'] for p in engine.get_status()['positions']] == [kept]
+    assert len(engine._long_heaps['EURUSD']) == 1
+
+
+def test_saved_positions_are_resumed_after_a_restart(handler, tmp_path):
+    state_file = str(tmp_path / 'trailing.json')
+    handler.trailing.state_file = state_file
+    kept, closed = open_position(), open_position(mt5.ORDER_TYPE_SELL)
+    handler.trailing.track(kept, TRAILING)
+    handler.trailing.track(closed, TRAILING)
+    handler.trailing.clear()  # Nothing tracked in memory, the state file is kept
+    assert handler.close_position(closed)['success']
+
+    restarted = TrailingStopEngine(handler, handler.tick_feed, state_file=state_file)
+    assert restarted.resume() == [kept]
+    assert restarted.get_status()['positions'][0]['ticket'] == kept
+    assert TrailingStopEngine(handler, handler.tick_feed, state_file=state_file)._load() == {kept: TRAILING}